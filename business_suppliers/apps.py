@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BusinessSuppliersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "business_suppliers"
+
+    def ready(self):
+        from business_suppliers import signals  # noqa: F401
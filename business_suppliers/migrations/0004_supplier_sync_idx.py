@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("business_suppliers", "0003_alter_suppliertransaction_owner"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(
+                fields=["owner", "updated_at"], name="supplier_sync_idx"
+            ),
+        ),
+    ]
@@ -1,9 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from core.base_model import BaseModel
-from finances.models import Transaction
+from finances.models import OutboxMixin, Transaction
 
-class Supplier(BaseModel):
+class Supplier(OutboxMixin, BaseModel):
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255)
     description = models.TextField(blank=True)
@@ -14,6 +14,9 @@ class Supplier(BaseModel):
     class Meta:
         ordering = ['name']
         unique_together = ['owner', 'slug']
+        indexes = [
+            models.Index(fields=['owner', 'updated_at'], name='supplier_sync_idx'),
+        ]
 
     def __str__(self):
         return f"{self.pk} - {self.name}"
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from business_suppliers.models import Supplier, SupplierTransaction
 from finances.transactions.transaction_serializers import TransactionSerializer
 from django.utils.text import slugify
-from finances.models import Transaction
+from finances.transactions.transaction_ingest import ingest_transactions
 
 class SupplierSerializer(serializers.ModelSerializer):
     class Meta:
@@ -37,30 +37,33 @@ class SupplierTransactionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'supplier', 'created_at', 'updated_at']
     
     def validate(self, data):
-        """Validate that the transaction belongs to the same owner as the supplier."""
+        """Require the request, whose user owns the nested transaction's category and account."""
         request = self.context.get('request')
         if not request or not request.user:
             raise serializers.ValidationError("User context is required")
-            
-        supplier = data.get('supplier')
-        if supplier and supplier.owner != request.user:
-            raise serializers.ValidationError("Supplier does not belong to the current user")
-            
         return data
     
     def create(self, validated_data):
-        """Create a new supplier transaction with nested transaction."""
+        """Create a new supplier transaction with nested transaction.
+
+        A transaction that was already stored is reused, and if it is already
+        linked to a supplier that link is returned; ``self.created`` tells the
+        view which case happened.
+        """
         transaction_data = validated_data.pop('transaction')
         supplier = validated_data.get('supplier')
-        # Create the transaction first
-        transaction = Transaction.objects.create(
-            **transaction_data,
-            owner=supplier.owner
-        )
+        # The view only hands over the request user's suppliers
+        owner = self.context['request'].user
+        # Create the transaction first, unless it is a duplicate
+        [(transaction, created)] = ingest_transactions(owner, [transaction_data])
+        existing = None if created else SupplierTransaction.objects.filter(transaction=transaction).first()
+        self.created = existing is None
+        if existing:
+            return existing
         # Create the supplier transaction
         supplier_transaction = SupplierTransaction.objects.create(
             transaction=transaction,
             supplier=supplier,
-            owner=supplier.owner
+            owner=owner
         )
         return supplier_transaction
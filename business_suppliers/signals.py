@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from business_suppliers.models import Supplier
+from finances.models import OutboxEvent
+from finances.outbox.outbox_events import record_event
+from finances.signals import hooks_suspended
+from finances.sync.sync_tombstones import record_tombstone
+
+
+@receiver(post_save, sender=Supplier)
+def record_supplier_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or hooks_suspended():
+        return
+    record_event(instance, OutboxEvent.Action.CREATED if created else OutboxEvent.Action.UPDATED)
+
+
+@receiver(post_delete, sender=Supplier)
+def record_supplier_deleted(sender, instance, **kwargs):
+    if hooks_suspended():
+        return
+    record_event(instance, OutboxEvent.Action.DELETED)
+    record_tombstone(instance)
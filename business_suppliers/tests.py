@@ -153,6 +153,23 @@ class SupplierTransactionViewSetTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['transaction']['amount'], '150.00')
         self.assertEqual(response.data['transaction']['description'], 'New test transaction')
+
+    def test_create_for_another_owners_supplier(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        Supplier.objects.create(name='Their Supplier', slug='their-supplier', owner=other)
+        url = reverse('supplier-transaction-list', kwargs={'supplier_slug': 'their-supplier'})
+        data = {
+            'transaction': {
+                'kind_of_transaction': 'INCOME',
+                'amount': '150.00',
+                'date': timezone.now().date().isoformat(),
+                'description': 'New test transaction',
+                'category': self.category.id,
+                'account': self.account.id,
+            }
+        }
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
     
     # def test_delete_supplier_transaction(self):
     #     kwargs={'supplier_slug': self.supplier.slug, 'pk': self.supplier_transaction.id}
@@ -1,9 +1,14 @@
 from rest_framework.permissions import IsAuthenticated
 from business_suppliers.models import Supplier, SupplierTransaction
 from business_suppliers.serializers import SupplierSerializer, SupplierTransactionSerializer
-from rest_framework import viewsets, mixins
+from rest_framework import viewsets, mixins, status
+from django.shortcuts import get_object_or_404
+from rest_framework.response import Response
+from core.db_routers import ReadReplicaMixin
+from finances.sharding.owner_shards import OwnerShardMixin
+from core.idempotency import IdempotencyMixin
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(OwnerShardMixin, ReadReplicaMixin, viewsets.ModelViewSet):
     serializer_class = SupplierSerializer
     permission_classes = [IsAuthenticated]
     lookup_field = 'slug'
@@ -14,7 +19,7 @@ class SupplierViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
-class SupplierTransactionViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
+class SupplierTransactionViewSet(IdempotencyMixin, OwnerShardMixin, ReadReplicaMixin, viewsets.GenericViewSet, mixins.CreateModelMixin):
     serializer_class = SupplierTransactionSerializer
     permission_classes = [IsAuthenticated]
     queryset = SupplierTransaction.objects.none()
@@ -26,6 +31,16 @@ class SupplierTransactionViewSet(viewsets.GenericViewSet, mixins.CreateModelMixi
         #     )
         return SupplierTransaction.objects.filter(supplier__owner=self.request.user, supplier__slug=self.kwargs['supplier_slug'])
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        # A duplicate transaction is answered with its existing supplier link
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK
+        )
+
     def perform_create(self, serializer):
-        supplier = Supplier.objects.get(slug=self.kwargs['supplier_slug'])
+        supplier = get_object_or_404(Supplier, owner_id=self.request.user.pk, slug=self.kwargs['supplier_slug'])
         serializer.save(supplier=supplier)
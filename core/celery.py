@@ -0,0 +1,16 @@
+"""
+Celery config for core project.
+
+Tasks are discovered from the ``tasks.py`` module of every installed app and
+periodic tasks are scheduled by django-celery-beat.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+app = Celery("core")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
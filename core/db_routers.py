@@ -0,0 +1,63 @@
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def _last_write_key(user_id):
+    return f'replica:last-write:{user_id}'
+
+
+def record_write(user_id):
+    """Pin ``user_id``'s reads to the primary for ``READ_YOUR_WRITES_SECONDS``."""
+    cache.set(_last_write_key(user_id), True, settings.READ_YOUR_WRITES_SECONDS)
+
+
+def wrote_recently(user_id):
+    return cache.get(_last_write_key(user_id), False)
+
+
+class ReadReplicaRouter:
+    """Send reads to the alias chosen for the current request, writes to ``default``.
+
+    Outside a ``ReadReplicaMixin`` request no read alias is set, so everything
+    (admin, tasks, management commands) keeps using the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so rows from either may be related
+        return True
+
+
+class ReadReplicaMixin:
+    """Serve safe requests from ``READ_REPLICA_ALIAS`` unless the user wrote recently.
+
+    Unsafe requests stay on the primary and start the user's read-your-writes
+    window, so a client never reads a replica that has not caught up with its
+    own changes yet.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        alias = settings.READ_REPLICA_ALIAS
+        if not alias:
+            return
+        if request.method not in SAFE_METHODS:
+            record_write(request.user.pk)
+        elif not wrote_recently(request.user.pk):
+            _read_alias.set(alias)
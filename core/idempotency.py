@@ -0,0 +1,110 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+IN_FLIGHT = 'in-flight'
+# A claim outlives a slow request but not a crashed worker
+CLAIM_TIMEOUT = 60
+REPLAYED_HEADERS = ('Location',)
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is still being processed.'
+    default_code = 'idempotency_conflict'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used with a different request body.'
+    default_code = 'idempotency_key_reused'
+
+
+class _Replay(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+def _request_digest(request):
+    """Hash of the request body, with uploaded files hashed by content rather than by name."""
+    digest = hashlib.sha256()
+    data, files = request.data, request.FILES
+    if files:
+        data = {key: data.getlist(key) for key in data if key not in files}
+    digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    for name in sorted(files):
+        for upload in files.getlist(name):
+            digest.update(f'\0{name}\0{upload.name}\0{upload.size}\0'.encode())
+            for chunk in upload.chunks():
+                digest.update(chunk)
+            upload.seek(0)
+    return digest.hexdigest()
+
+
+class IdempotencyMixin:
+    """Replay the stored response of a POST retried with the same ``Idempotency-Key`` header.
+
+    The first request claims the key in the shared default cache, so only
+    one worker accepts it, and its response is then stored there for
+    ``IDEMPOTENCY_KEY_TTL`` seconds. Retries get that
+    response back before any serializer or write runs. Keys are scoped to
+    the user and path. Server errors release the key so the client can
+    retry for real.
+    """
+
+    def _idempotency_cache_key(self, request, key):
+        scope = f'{request.user.pk}:{request.path}:{key}'
+        return f'idempotency:{hashlib.sha256(scope.encode()).hexdigest()}'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.idempotency_key = None
+        key = request.headers.get('Idempotency-Key')
+        if request.method != 'POST' or not key:
+            return
+        cache_key = self._idempotency_cache_key(request, key)
+        digest = _request_digest(request)
+        if cache.add(cache_key, IN_FLIGHT, CLAIM_TIMEOUT):
+            self.idempotency_key = (cache_key, digest)
+            return
+        stored = cache.get(cache_key)
+        if stored is None or stored == IN_FLIGHT:
+            raise IdempotencyConflict()
+        if stored['digest'] != digest:
+            raise IdempotencyKeyReused()
+        response = Response(stored['data'], status=stored['status'], headers=stored['headers'])
+        response['Idempotent-Replayed'] = 'true'
+        raise _Replay(response)
+
+    def _release_idempotency_key(self):
+        if getattr(self, 'idempotency_key', None):
+            cache.delete(self.idempotency_key[0])
+            self.idempotency_key = None
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _Replay):
+            return exc.response
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            self._release_idempotency_key()
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'idempotency_key', None):
+            cache_key, digest = self.idempotency_key
+            if response.status_code >= 500:
+                self._release_idempotency_key()
+            else:
+                cache.set(cache_key, {
+                    'digest': digest,
+                    'status': response.status_code,
+                    'data': response.data,
+                    'headers': {name: response[name] for name in REPLAYED_HEADERS if name in response},
+                }, settings.IDEMPOTENCY_KEY_TTL)
+        return response
@@ -0,0 +1,76 @@
+"""Related fields limited to the rows of the requesting user.
+
+``OwnedPrimaryKeyRelatedField`` looks primary keys up among the rows whose
+``owner_id`` is the request user's, so another owner's category, account or
+supplier is reported as missing without loading any ``User`` row. Rows are
+kept in an identity map on the request: a category or account named by many
+rows of a bulk payload, or by a nested serializer, is read once.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+
+def owned_objects(request):
+    """Identity map of ``(model, pk) -> row or None`` read for ``request``.
+
+    It lives on the Django request, so serializers handed the DRF request or
+    the underlying one share it.
+    """
+    request = getattr(request, '_request', request)
+    if not hasattr(request, 'owned_objects'):
+        request.owned_objects = {}
+    return request.owned_objects
+
+
+def load_owned(request, queryset, pks):
+    """Return the identity map after reading the rows of ``pks`` it misses with one query.
+
+    ``queryset`` must already be limited to the request user's rows.
+    """
+    objects = owned_objects(request)
+    model = queryset.model
+    missing = {pk for pk in pks if (model, pk) not in objects}
+    if missing:
+        found = queryset.in_bulk(missing)
+        for pk in missing:
+            objects[model, pk] = found.get(pk)
+    return objects
+
+
+class OwnedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field accepting only rows owned by the request user, read through the identity map.
+
+    ModelSerializers pick it up for every relation with
+    ``serializer_related_field = OwnedPrimaryKeyRelatedField``.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner_id=self.context['request'].user.pk)
+
+    def _to_pk(self, data):
+        if isinstance(data, bool):
+            raise TypeError
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def prefetch(self, values):
+        """Read the rows of all well-formed ``values`` at once, ahead of validating them one by one."""
+        pks = []
+        for data in values:
+            try:
+                pks.append(self._to_pk(data))
+            except (TypeError, ValueError, DjangoValidationError):
+                continue
+        load_owned(self.context['request'], self.get_queryset(), pks)
+
+    def to_internal_value(self, data):
+        try:
+            pk = self._to_pk(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        queryset = self.get_queryset()
+        instance = load_owned(self.context['request'], queryset, [pk])[queryset.model, pk]
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
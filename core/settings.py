@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+import environ
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -40,6 +44,8 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework.authtoken",
     "django_filters",
+    "django_celery_beat",
+    "django_celery_results",
     "finances",
     "identity",
     "business_suppliers",
@@ -83,7 +89,42 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get("DATABASE_REPLICA_NAME", BASE_DIR / "db.replica.sqlite3"),
+        # Tests build an independent in-memory replica rather than a file next to the code
+        "TEST": {"NAME": ":memory:"},
+    },
+}
+
+# Owner sharding: each owner's finances and business_suppliers rows live on one of
+# SHARD_ALIASES, chosen by hash and recorded in OwnerShard. Sharding is off while the
+# list is empty; SHARD_DATABASES local SQLite shards are declared either way.
+SHARD_DATABASES = int(os.environ.get("SHARD_DATABASES", 2))
+for index in range(SHARD_DATABASES):
+    DATABASES[f"shard_{index}"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get(f"DATABASE_SHARD_{index}_NAME", BASE_DIR / f"db.shard_{index}.sqlite3"),
+        "TEST": {"NAME": ":memory:"},
     }
+SHARD_ALIASES = [alias for alias in os.environ.get("SHARD_ALIASES", "").split(",") if alias]
+
+# Safe requests on ReadReplicaMixin views read from READ_REPLICA_ALIAS when it is set;
+# a user's reads stay on the primary for READ_YOUR_WRITES_SECONDS after they write.
+DATABASE_ROUTERS = ["finances.sharding.owner_shards.OwnerShardRouter", "core.db_routers.ReadReplicaRouter"]
+READ_REPLICA_ALIAS = os.environ.get("READ_REPLICA_ALIAS") or None
+READ_YOUR_WRITES_SECONDS = 5
+
+
+# Cache
+# Ledger versions, idempotency claims, read-your-writes marks and throttle spending are shared
+# between web and Celery processes through the default cache. Point CACHE_URL at a shared
+# cache (e.g. redis://localhost:6379/1) when running more than one process; without it each
+# process keeps a private in-memory cache.
+
+CACHES = {
+    "default": environ.Env.cache_url_config(os.environ.get("CACHE_URL", "locmemcache://")),
 }
 
 
@@ -140,4 +181,180 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttles.CostThrottle',
+    ],
+}
+
+# Cost-aware throttling
+# Each client has THROTTLE_BUCKET_SIZE tokens, refilled at THROTTLE_REFILL_RATE per second;
+# a request spends its endpoint's cost. With THROTTLE_SYNC_SECONDS set, processes share
+# spending through the default cache that often. Each process keeps at most
+# THROTTLE_MAX_BUCKETS buckets and drops those of idle clients.
+
+THROTTLE_BUCKET_SIZE = 600
+THROTTLE_REFILL_RATE = 5
+THROTTLE_SYNC_SECONDS = int(os.environ.get("THROTTLE_SYNC_SECONDS", 0))
+THROTTLE_MAX_BUCKETS = 100_000
+
+# POST retries carrying the same Idempotency-Key replay the stored first response this long
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+
+
+# Transactional outbox
+# Changes to transactions, accounts, categories and suppliers are recorded as OutboxEvent
+# rows in the same database transaction, then handed to OUTBOX_CONSUMERS by the
+# dispatch_outbox task. Events failing OUTBOX_MAX_ATTEMPTS times are kept for inspection.
+# One dispatcher runs per database: a PostgreSQL advisory lock, or on other databases a
+# cache lease of OUTBOX_LOCK_TIMEOUT seconds renewed before every event.
+
+OUTBOX_CONSUMERS = [
+    "finances.outbox.outbox_consumers.invalidate_owner_caches",
+    "finances.outbox.outbox_consumers.deliver_webhooks",
+]
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_LOCK_TIMEOUT = 60 * 5
+OUTBOX_WEBHOOK_URLS = [url for url in os.environ.get("OUTBOX_WEBHOOK_URLS", "").split(",") if url]
+OUTBOX_WEBHOOK_TIMEOUT = 5
+
+
+# Delta sync
+# /api/finances/sync/ pages through changes in batches of at most SYNC_BATCH_SIZE rows. A sync
+# window ends SYNC_SETTLE_SECONDS before now so rows still being committed land in the next one.
+# Tombstones, and with them sync tokens, last SYNC_TOMBSTONE_DAYS.
+
+SYNC_BATCH_SIZE = 500
+SYNC_SETTLE_SECONDS = 2
+SYNC_TOMBSTONE_DAYS = 90
+
+
+# Live updates
+# /api/finances/live/ streams changes as Server-Sent Events from the ASGI application. Without
+# LIVE_REDIS_URL, updates only reach clients connected to the process that made the write.
+
+LIVE_REDIS_URL = os.environ.get("LIVE_REDIS_URL")
+LIVE_QUEUE_SIZE = 100
+LIVE_KEEPALIVE_SECONDS = 15
+LIVE_STREAM_SECONDS = 60 * 5
+LIVE_RETRY_MILLISECONDS = 1000
+
+
+# Currency conversion
+# Exchange rates are stored as the value of one unit of each currency in the pivot currency.
+# A day without its own rate borrows the latest one from the last FX_RATE_LOOKBACK_DAYS; such
+# borrowed rates are cached per process for FX_FALLBACK_RATE_SECONDS only.
+
+FX_PIVOT_CURRENCY = "USD"
+FX_RATE_LOOKBACK_DAYS = 7
+FX_RATE_CACHE_SIZE = 10000
+FX_FALLBACK_RATE_SECONDS = 60
+
+
+# Auto-categorization
+# Transactions created without a category get one predicted from their description by a
+# per-owner naive Bayes model, once the owner has CATEGORIZER_MIN_EXAMPLES categorized
+# transactions and the prediction reaches CATEGORIZER_MIN_CONFIDENCE. Each process caches
+# CATEGORIZER_CACHE_SIZE owner models and rebuilds them every CATEGORIZER_REBUILD_SECONDS.
+
+CATEGORIZER_MIN_EXAMPLES = 5
+CATEGORIZER_MIN_CONFIDENCE = 0.6
+CATEGORIZER_CACHE_SIZE = 1000
+CATEGORIZER_REBUILD_SECONDS = 60 * 60
+
+
+# Cash-flow forecasting
+
+FORECAST_HISTORY_DAYS = 730
+FORECAST_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+# Asynchronous reports
+# Report jobs aggregate REPORT_CHUNK_DAYS per query and merge the partial totals. A running job
+# records progress after every chunk; pending or running jobs without progress for
+# REPORT_JOB_STALE_SECONDS were lost by the broker or their worker, and are failed and
+# submitted again by the next identical request.
+
+REPORT_CHUNK_DAYS = 92
+REPORT_JOB_STALE_SECONDS = 60 * 15
+
+
+# Receipts
+# Receipt uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to a temporary file and copied
+# to MEDIA_ROOT in chunks, then answered at once. The process_receipt task makes the thumbnail,
+# reads size and EXIF metadata and fills original_text with RECEIPT_TEXT_EXTRACTOR. It runs on
+# the "receipts" queue, so the concurrency of its dedicated worker bounds how many run at once:
+#   celery -A core worker -Q receipts --concurrency 2
+# Receipts left pending or processing for RECEIPT_PROCESSING_TIMEOUT seconds, by a lost message
+# or a dead worker, are queued again by the requeue_stale_receipts task.
+
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", BASE_DIR / "media")
+MEDIA_URL = "media/"
+RECEIPT_MAX_BYTES = 10 * 1024 * 1024
+RECEIPT_MAX_PIXELS = 50_000_000
+RECEIPT_THUMBNAIL_SIZE = (320, 320)
+RECEIPT_TEXT_EXTRACTOR = "finances.receipts.receipt_extractors.no_text"
+RECEIPT_PROCESSING_TIMEOUT = 60 * 10
+
+
+# Spending anomalies
+# Expenses of the last ANOMALY_RECENT_DAYS scoring ANOMALY_THRESHOLD robust standard deviations
+# above their category or supplier median over ANOMALY_LOOKBACK_DAYS are flagged. Groups need
+# ANOMALY_MIN_SAMPLES expenses; a month of the year with ANOMALY_SEASONAL_SAMPLES of them is
+# compared with its own median. The detect_anomalies command spreads owners over
+# ANOMALY_WORKERS processes.
+
+ANOMALY_LOOKBACK_DAYS = 730
+ANOMALY_RECENT_DAYS = 30
+ANOMALY_THRESHOLD = 3.5
+ANOMALY_MIN_SAMPLES = 8
+ANOMALY_SEASONAL_SAMPLES = 4
+ANOMALY_WORKERS = int(os.environ.get("ANOMALY_WORKERS", os.cpu_count() or 1))
+
+# Hot/cold archival
+# Transactions dated before the first day of the month ARCHIVE_HORIZON_DAYS ago are
+# moved to the archive table. Keep it longer than FORECAST_HISTORY_DAYS, and do not
+# raise it once rows have been archived.
+
+ARCHIVE_HORIZON_DAYS = 3 * 365
+
+
+# Celery
+# https://docs.celeryq.dev/en/stable/django/first-steps-with-django.html
+
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = "django-db"
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_ROUTES = {
+    "finances.tasks.process_receipt": {"queue": "receipts"},
+}
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "materialize-recurring-transactions": {
+        "task": "finances.tasks.materialize_recurring_transactions",
+        "schedule": crontab(minute=5),
+    },
+    "reconcile-accounts": {
+        "task": "finances.tasks.reconcile_accounts",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "archive-transactions": {
+        "task": "finances.tasks.archive_transactions",
+        "schedule": crontab(hour=2, minute=0, day_of_month=1),
+    },
+    "prune-tombstones": {
+        "task": "finances.tasks.prune_tombstones",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "detect-anomalies": {
+        "task": "finances.tasks.detect_anomalies",
+        "schedule": crontab(hour=5, minute=0),
+    },
+    "requeue-stale-receipts": {
+        "task": "finances.tasks.requeue_stale_receipts",
+        "schedule": crontab(minute="*/15"),
+    },
+    "dispatch-outbox": {
+        "task": "finances.tasks.dispatch_outbox",
+        "schedule": 10.0,
+    },
 }
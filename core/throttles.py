@@ -0,0 +1,156 @@
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+
+
+# How often idle buckets are looked for
+SWEEP_SECONDS = 60
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated', 'unsynced', 'seen', 'synced')
+
+    def __init__(self, capacity, now, seen=0):
+        self.tokens = capacity
+        self.updated = now
+        self.unsynced = 0
+        self.seen = seen
+        self.synced = now
+
+
+class BucketRegistry:
+    """In-process token buckets keyed by client, optionally shared through the cache.
+
+    Every decision is made against the local bucket. When
+    ``THROTTLE_SYNC_SECONDS`` is set, each bucket periodically adds what it
+    spent to a shared counter and subtracts what other processes spent since
+    its last sync, so all processes converge on one budget per client
+    without a cache round trip per request.
+
+    Buckets that have refilled to capacity are dropped every
+    ``SWEEP_SECONDS``, since a new bucket is just as full, and at most
+    ``THROTTLE_MAX_BUCKETS`` are kept, least recently used first out.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._buckets = OrderedDict()
+        self._swept = None
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _sweep(self, now, capacity, rate):
+        self._swept = now
+        for key in [
+            key for key, bucket in self._buckets.items()
+            if bucket.tokens + (now - bucket.updated) * rate >= capacity
+        ]:
+            del self._buckets[key]
+
+    def spend(self, key, cost, now=None):
+        """Take ``cost`` tokens for ``key`` and return 0, or the seconds until they are available."""
+        capacity = settings.THROTTLE_BUCKET_SIZE
+        rate = settings.THROTTLE_REFILL_RATE
+        cost = min(cost, capacity)
+        now = time.monotonic() if now is None else now
+        # A bucket created after an eviction must not be charged for spending from before it
+        seen = cache.get(self._cache_key(key), 0) if settings.THROTTLE_SYNC_SECONDS and key not in self._buckets else 0
+        with self._lock:
+            if self._swept is None:
+                self._swept = now
+            elif now - self._swept >= SWEEP_SECONDS:
+                self._sweep(now, capacity, rate)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(capacity, now, seen)
+                while len(self._buckets) > settings.THROTTLE_MAX_BUCKETS:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+            needs_sync = settings.THROTTLE_SYNC_SECONDS and now - bucket.synced >= settings.THROTTLE_SYNC_SECONDS
+            if needs_sync:
+                spent, bucket.unsynced, bucket.synced = bucket.unsynced, 0, now
+        if needs_sync:
+            self._sync(key, bucket, spent)
+
+        with self._lock:
+            if bucket.tokens < cost:
+                return (cost - bucket.tokens) / rate
+            bucket.tokens -= cost
+            bucket.unsynced += cost
+            return 0
+
+    def _cache_key(self, key):
+        return f'throttle:spent:{key}'
+
+    def _sync(self, key, bucket, spent):
+        cache_key = self._cache_key(key)
+        cache.add(cache_key, 0, timeout=None)
+        total = cache.incr(cache_key, spent)
+        with self._lock:
+            if total >= bucket.seen + spent:
+                bucket.tokens -= total - bucket.seen - spent
+            bucket.seen = total
+
+
+buckets = BucketRegistry()
+
+
+def full_history_cost(per_year=4, unbounded_years=5):
+    """Flat cost of a report that always covers the whole history, priced as ``unbounded_years``."""
+    return per_year * unbounded_years
+
+
+def report_cost(per_year=4, unbounded_years=5):
+    """Cost that grows with the ``start_date``..``end_date`` span of a report request.
+
+    A request without ``start_date`` covers the whole history and is charged
+    as ``unbounded_years``.
+    """
+    def cost(request):
+        try:
+            start = datetime.strptime(request.query_params['start_date'], '%Y-%m-%d').date()
+        except (KeyError, ValueError):
+            return full_history_cost(per_year, unbounded_years)
+        try:
+            end = datetime.strptime(request.query_params['end_date'], '%Y-%m-%d').date()
+        except (KeyError, ValueError):
+            end = timezone.localdate()
+        return max(1, math.ceil((end - start).days / 365 * per_year))
+    return cost
+
+
+class CostThrottle(BaseThrottle):
+    """Per-user token bucket where every request spends its endpoint's cost.
+
+    Views declare ``throttle_costs``, a mapping of action name to a number or
+    to a callable taking the request; anything not listed costs 1.
+    Anonymous clients are bucketed by address.
+    """
+
+    def get_cost(self, request, view):
+        cost = getattr(view, 'throttle_costs', {}).get(getattr(view, 'action', None), 1)
+        return cost(request) if callable(cost) else cost
+
+    def allow_request(self, request, view):
+        if request.user and request.user.is_authenticated:
+            key = request.user.pk
+        else:
+            key = f'anon:{self.get_ident(request)}'
+        self.wait_seconds = buckets.spend(key, self.get_cost(request, view))
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
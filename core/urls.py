@@ -15,6 +15,8 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.documentation import include_docs_urls
@@ -27,3 +29,6 @@ urlpatterns = [
     path("api/auth/", include("identity.urls")),
     path("api/suppliers/", include("business_suppliers.urls")),
 ]
+
+# Receipt images and thumbnails; served by the web server in production
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
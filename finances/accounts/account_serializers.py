@@ -5,9 +5,15 @@ from django.utils.text import slugify
 class AccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = Account
-        fields = ['id', 'name', 'description', 'slug', 'balance', 'is_active']
+        fields = ['id', 'name', 'description', 'slug', 'balance', 'currency', 'is_active']
         read_only_fields = ['slug', 'balance']
 
+    def validate_currency(self, value):
+        value = value.upper()
+        if len(value) != 3 or not value.isalpha():
+            raise serializers.ValidationError("Use a 3-letter ISO 4217 code")
+        return value
+
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
         validated_data['slug'] = slugify(validated_data['name'])
@@ -1,16 +1,27 @@
 from rest_framework import viewsets
 from finances.accounts.account_serializers import AccountSerializer
-from finances.models import Account
+from finances.currencies.currency_rates import MixedCurrencies, single_currency
+from finances.forecasts.forecast_engine import forecast_balance
+from finances.ledger_versions import get_ledger_version
+from finances.models import Account, Transaction
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from decimal import Decimal, InvalidOperation
 from rest_framework import status
+from core.db_routers import ReadReplicaMixin
+from finances.sharding.owner_shards import OwnerShardMixin
+from core.idempotency import IdempotencyMixin
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(IdempotencyMixin, OwnerShardMixin, ReadReplicaMixin, viewsets.ModelViewSet):
     queryset = Account.objects.all()
     serializer_class = AccountSerializer
     permission_classes = [IsAuthenticated]
+    throttle_costs = {'forecast': 10, 'owner_forecast': 10}
     lookup_field = 'slug'
 
     def get_queryset(self):
@@ -33,4 +44,54 @@ class AccountViewSet(viewsets.ModelViewSet):
         return Response({
             'message': 'Balance adjusted successfully',
             'new_balance': account.balance
-        }) 
\ No newline at end of file
+        })
+
+    def get_forecast_months(self, request):
+        try:
+            months = int(request.query_params.get('months', 3))
+        except ValueError:
+            months = 0
+        return months if 1 <= months <= 12 else None
+
+    def cached_forecast(self, request, account=None):
+        months = self.get_forecast_months(request)
+        if months is None:
+            return Response(
+                {'error': 'months must be an integer between 1 and 12'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        today = timezone.localdate()
+        version = get_ledger_version(request.user.pk)
+        key = f"forecast:{request.user.pk}:{account.pk if account else '*'}:{months}:{today}:{version}"
+        result = cache.get(key)
+        if result is None:
+            transactions = Transaction.objects.filter(owner=request.user)
+            if account:
+                transactions = transactions.filter(account=account)
+                starting_balance = account.balance
+                currency = account.currency
+            else:
+                accounts = self.get_queryset().filter(is_active=True)
+                # Balances and flows in different currencies cannot be added up
+                try:
+                    currency = single_currency(accounts)
+                except MixedCurrencies as error:
+                    return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+                transactions = transactions.filter(account__in=accounts)
+                starting_balance = accounts.aggregate(total=Sum('balance'))['total'] or 0
+            result = forecast_balance(
+                transactions, starting_balance, months, settings.FORECAST_HISTORY_DAYS, today=today
+            )
+            result['account'] = account.slug if account else None
+            result['currency'] = currency
+            cache.set(key, result, settings.FORECAST_CACHE_TIMEOUT)
+        return Response(result)
+
+    @action(detail=True, methods=['get'])
+    def forecast(self, request, slug=None):
+        return self.cached_forecast(request, self.get_object())
+
+    @action(detail=False, methods=['get'], url_path='forecast', url_name='owner-forecast')
+    def owner_forecast(self, request):
+        return self.cached_forecast(request)
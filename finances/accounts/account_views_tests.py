@@ -1,10 +1,13 @@
 from django.test import TestCase
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
-from finances.models import Account
+from finances.models import Account, Category, Transaction
 from django.urls import reverse
 from rest_framework import status
 from decimal import Decimal
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.utils import timezone
 class AccountViewSetTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -76,4 +79,84 @@ class AccountViewSetTest(TestCase):
         # Test invalid amount
         data = {'amount': 'invalid'}
         response = self.client.post(url, data)
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST) 
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST) 
+
+class AccountForecastTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        self.category = Category.objects.create(name='General', slug='general', owner=self.user)
+        self.account = Account.objects.create(
+            name='Checking',
+            slug='checking',
+            balance=Decimal('1000.00'),
+            owner=self.user
+        )
+        today = timezone.localdate()
+        # Six months of a salary on the 5th and rent on the 10th
+        month = today.replace(day=1)
+        for _ in range(6):
+            if month.replace(day=5) <= today:
+                self.add('INCOME', '3000.00', month.replace(day=5))
+            if month.replace(day=10) <= today:
+                self.add('EXPENSE', '1200.00', month.replace(day=10))
+            month = (month - timedelta(days=1)).replace(day=1)
+
+    def add(self, kind, amount, day, account=None):
+        Transaction.objects.create(
+            kind_of_transaction=kind,
+            amount=Decimal(amount),
+            date=timezone.make_aware(datetime.combine(day, time(12))),
+            description='Entry',
+            category=self.category,
+            account=account or self.account,
+            owner=self.user
+        )
+
+    def test_account_forecast(self):
+        url = reverse('account-forecast', kwargs={'slug': self.account.slug})
+        response = self.client.get(url, {'months': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['account'], 'checking')
+        # The rest of the current month plus two full months
+        today = timezone.localdate()
+        month_ends_today = (today + timedelta(days=1)).day == 1
+        self.assertEqual(len(response.data['projection']), 2 if month_ends_today else 3)
+
+        recurring = {(item['kind_of_transaction'], item['day_of_month']): item['amount'] for item in response.data['recurring']}
+        self.assertEqual(recurring[('INCOME', 5)], 3000.0)
+        self.assertEqual(recurring[('EXPENSE', 10)], 1200.0)
+
+        last_month = response.data['projection'][-1]
+        self.assertGreaterEqual(last_month['income'], 3000.0)
+        self.assertGreater(last_month['balance'], 1000.0)
+
+    def test_forecast_is_cached_until_next_write(self):
+        url = reverse('account-owner-forecast')
+        first = self.client.get(url).data
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data, first)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.add('EXPENSE', '5000.00', timezone.localdate())
+            # Until the write commits, readers keep the cached forecast
+            self.assertEqual(self.client.get(url).data, first)
+        self.assertTrue(callbacks)
+        second = self.client.get(url).data
+        self.assertNotEqual(second['projection'], first['projection'])
+
+    def test_owner_forecast_refuses_mixed_currencies(self):
+        url = reverse('account-owner-forecast')
+        self.assertEqual(self.client.get(url).data['currency'], 'USD')
+        with self.captureOnCommitCallbacks(execute=True):
+            Account.objects.create(name='Euro', slug='euro', currency='EUR', balance=500, owner=self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('EUR, USD', response.data['error'])
+
+    def test_invalid_months(self):
+        response = self.client.get(reverse('account-owner-forecast'), {'months': 13})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
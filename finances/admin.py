@@ -1,6 +1,11 @@
 from django.contrib import admin
 
-from finances.models import Transaction, Category, Account
+from core.paginators import EstimatedCountPaginator
+from finances.models import (
+    Transaction, Category, Account, Budget, ExchangeRate, RecurringTransaction,
+    ReconciliationReport, AccountReconciliation, ArchivedTransaction, TransactionRollup, OwnerShard, OutboxEvent,
+    Tombstone, Tag, TransactionTag, SpendingAnomaly, Receipt
+)
 
 class CategoryInline(admin.TabularInline):
     model = Category
@@ -10,11 +15,48 @@ class AccountInline(admin.TabularInline):
 
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ('id', 'date', 'description', 'amount', 'category', 'account', 'kind_of_transaction')
-    list_filter = ('category', 'account', 'kind_of_transaction')
+    list_select_related = ('category', 'account')
+    # Category and account filters would list every row of those tables; use autocomplete on the form instead
+    list_filter = ('kind_of_transaction',)
+    autocomplete_fields = ('category', 'account', 'owner', 'recurring_transaction')
+    date_hierarchy = 'date'
     search_fields = ('description',)
     list_per_page = 10
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     # inlines = [CategoryInline, AccountInline]
 
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'slug', 'owner')
+    list_select_related = ('owner',)
+    search_fields = ('name', 'slug')
+    autocomplete_fields = ('owner', 'parent')
+
+class AccountAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'slug', 'balance', 'currency', 'owner')
+    list_select_related = ('owner',)
+    search_fields = ('name', 'slug')
+    autocomplete_fields = ('owner',)
+
+class RecurringTransactionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'description', 'amount', 'frequency', 'next_occurrence', 'is_active')
+    search_fields = ('description',)
+    autocomplete_fields = ('category', 'account', 'owner')
+
 admin.site.register(Transaction, TransactionAdmin)
-admin.site.register(Category)
-admin.site.register(Account)
+admin.site.register(Category, CategoryAdmin)
+admin.site.register(Account, AccountAdmin)
+admin.site.register(Budget)
+admin.site.register(RecurringTransaction, RecurringTransactionAdmin)
+admin.site.register(ExchangeRate)
+admin.site.register(ReconciliationReport)
+admin.site.register(AccountReconciliation)
+admin.site.register(ArchivedTransaction)
+admin.site.register(TransactionRollup)
+admin.site.register(OwnerShard)
+admin.site.register(OutboxEvent)
+admin.site.register(Tombstone)
+admin.site.register(Tag)
+admin.site.register(TransactionTag)
+admin.site.register(SpendingAnomaly)
+admin.site.register(Receipt)
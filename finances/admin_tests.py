@@ -0,0 +1,35 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
+from finances.models import Transaction, Category, Account
+from decimal import Decimal
+
+class TransactionAdminTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.client.force_login(self.admin)
+        account = Account.objects.create(name='Checking', slug='checking', owner=self.admin)
+        for index in range(10):
+            category = Category.objects.create(name=f'Category {index}', slug=f'category-{index}', owner=self.admin)
+            Transaction.objects.create(
+                amount=Decimal('10.00'),
+                description=f'Entry {index}',
+                category=category,
+                account=account,
+                owner=self.admin
+            )
+
+    def test_changelist_joins_related_rows(self):
+        url = reverse('admin:finances_transaction_changelist')
+        self.client.get(url)
+        with self.assertNumQueries(6):
+            # Session, user, page count, page rows joined with category and account, and two date hierarchy queries
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Category 9')
+
+    def test_change_form_uses_autocomplete(self):
+        transaction = Transaction.objects.first()
+        response = self.client.get(reverse('admin:finances_transaction_change', args=[transaction.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'admin-autocomplete')
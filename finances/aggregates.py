@@ -0,0 +1,25 @@
+from decimal import Decimal
+from django.db.models import DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def kind_total(kind, relation='transactions'):
+    """Sum of ``amount`` over related transactions of one kind, 0 when there are none."""
+    return Coalesce(
+        Sum(f'{relation}__amount', filter=Q(**{f'{relation}__kind_of_transaction': kind})),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=15, decimal_places=2)
+    )
+
+
+def rollup_total(kind, field):
+    """Archived total of one kind for the outer row, read from the monthly rollups keyed by ``field``."""
+    from finances.models import TransactionRollup
+
+    totals = TransactionRollup.objects.filter(**{field: OuterRef('pk'), 'kind_of_transaction': kind})\
+        .order_by().values(field).annotate(total=Sum('total')).values('total')
+    return Coalesce(
+        Subquery(totals, output_field=DecimalField(max_digits=15, decimal_places=2)),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=15, decimal_places=2)
+    )
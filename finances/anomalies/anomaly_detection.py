@@ -0,0 +1,167 @@
+"""Unusually large expenses per category and supplier.
+
+Each owner's expenses over ``ANOMALY_LOOKBACK_DAYS`` are loaded with one
+query into NumPy arrays. Per group, and per group and month of the year when
+that month has enough history, the median and the median absolute deviation
+(MAD) give a baseline and spread that a few outliers cannot drag along; an
+expense scoring ``ANOMALY_THRESHOLD`` spreads above its baseline is flagged.
+All groups are scored at once with sorted segment arithmetic, never with a
+Python loop or query per group.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+import numpy as np
+from django.conf import settings
+from django.db import connections, router, transaction as db_transaction
+from django.utils import timezone
+from finances.models import SpendingAnomaly, Transaction, local_date
+from finances.sharding.owner_shards import each_shard, using_shard
+
+BATCH_SIZE = 200
+# Scales the MAD to a standard deviation for normally distributed amounts
+MAD_SCALE = 1.4826
+# Groups of identical amounts have no spread; deviations below this share of the baseline are noise
+MIN_SPREAD_SHARE = 0.05
+CENT = Decimal('0.01')
+
+
+def _group_medians(keys, values, size):
+    """Median of ``values`` for each of ``size`` integer ``keys``, NaN for empty ones, and the counts."""
+    ordered = values[np.lexsort((values, keys))]
+    counts = np.bincount(keys, minlength=size)
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+    medians = np.full(size, np.nan)
+    medians[present] = (
+        ordered[(starts + (counts - 1) // 2)[present]] + ordered[(starts + counts // 2)[present]]
+    ) / 2
+    return medians, counts
+
+
+def _robust_stats(keys, values, size):
+    medians, counts = _group_medians(keys, values, size)
+    deviations, _ = _group_medians(keys, np.abs(values - medians[keys]), size)
+    return medians, deviations * MAD_SCALE, counts
+
+
+def score_expenses(groups, months, amounts, min_samples=None, seasonal_samples=None):
+    """Return per-expense ``(baseline, spread, score)`` arrays.
+
+    ``groups`` are dense integer codes, ``months`` the month of the year
+    (0-11) of each expense. Expenses of groups with fewer than
+    ``min_samples`` rows score 0.
+    """
+    min_samples = settings.ANOMALY_MIN_SAMPLES if min_samples is None else min_samples
+    seasonal_samples = settings.ANOMALY_SEASONAL_SAMPLES if seasonal_samples is None else seasonal_samples
+    size = int(groups.max()) + 1 if groups.size else 0
+    medians, spreads, counts = _robust_stats(groups, amounts, size)
+    seasons = groups * 12 + months
+    seasonal_medians, seasonal_spreads, seasonal_counts = _robust_stats(seasons, amounts, size * 12)
+
+    seasonal = seasonal_counts[seasons] >= seasonal_samples
+    baseline = np.where(seasonal, seasonal_medians[seasons], medians[groups])
+    spread = np.where(seasonal, seasonal_spreads[seasons], spreads[groups])
+    spread = np.maximum(spread, np.maximum(baseline * MIN_SPREAD_SHARE, float(CENT)))
+    score = (amounts - baseline) / spread
+    score[counts[groups] < min_samples] = 0
+    return baseline, spread, score
+
+
+def load_expenses(owner_id, since):
+    return list(Transaction.objects.filter(
+        owner_id=owner_id,
+        kind_of_transaction=Transaction.KindOfTransaction.EXPENSE,
+        date__gte=since,
+    ).values_list(
+        'id', 'date', 'amount', 'category_id', 'category__name',
+        'supplier_transaction__supplier_id', 'supplier_transaction__supplier__name',
+    ).order_by())
+
+
+def find_anomalies(owner_id, now=None):
+    """Return the owner's unsaved ``SpendingAnomaly`` rows for expenses of the recent window."""
+    now = now or timezone.now()
+    rows = load_expenses(owner_id, now - timedelta(days=settings.ANOMALY_LOOKBACK_DAYS))
+    if not rows:
+        return []
+    count = len(rows)
+    amounts = np.fromiter((amount for _, _, amount, _, _, _, _ in rows), dtype=np.float64, count=count)
+    months = np.fromiter((local_date(day).month - 1 for _, day, _, _, _, _, _ in rows), dtype=np.int64, count=count)
+    recent = np.fromiter(
+        (day >= now - timedelta(days=settings.ANOMALY_RECENT_DAYS) for _, day, _, _, _, _, _ in rows),
+        dtype=bool, count=count
+    )
+
+    anomalies = []
+    for dimension, key, name in (
+        (SpendingAnomaly.Dimension.CATEGORY, 3, 4),
+        (SpendingAnomaly.Dimension.SUPPLIER, 5, 6),
+    ):
+        keys = np.fromiter((row[key] or 0 for row in rows), dtype=np.int64, count=count)
+        grouped = keys != 0
+        if not grouped.any():
+            continue
+        group_ids, groups = np.unique(keys[grouped], return_inverse=True)
+        baseline, spread, score = score_expenses(groups, months[grouped], amounts[grouped])
+        positions = np.flatnonzero(grouped)
+        flagged = np.flatnonzero((score >= settings.ANOMALY_THRESHOLD) & recent[grouped])
+        for index in flagged:
+            row = rows[positions[index]]
+            anomalies.append(SpendingAnomaly(
+                transaction_id=row[0],
+                dimension=dimension,
+                group_id=int(group_ids[groups[index]]),
+                group_name=row[name][:100],
+                amount=row[2],
+                baseline=Decimal(baseline[index]).quantize(CENT),
+                spread=Decimal(spread[index]).quantize(CENT),
+                score=float(score[index]),
+                date=row[1],
+                owner_id=owner_id,
+            ))
+    return anomalies
+
+
+def refresh_owner_anomalies(owner_id, now=None):
+    """Replace the owner's flagged expenses with a fresh detection; return how many were flagged."""
+    anomalies = find_anomalies(owner_id, now)
+    with db_transaction.atomic(using=router.db_for_write(SpendingAnomaly)):
+        SpendingAnomaly.objects.filter(owner_id=owner_id).delete()
+        SpendingAnomaly.objects.bulk_create(anomalies)
+    return len(anomalies)
+
+
+def anomaly_batches(batch_size=BATCH_SIZE, now=None):
+    """Return ``(alias, owner_ids)`` batches of the owners with recent expenses on every shard.
+
+    Anomalies that aged out of the recent window are dropped on the way;
+    the owners they belong to may not be in any batch.
+    """
+    since = (now or timezone.now()) - timedelta(days=settings.ANOMALY_RECENT_DAYS)
+    batches = []
+    for alias in each_shard():
+        owners = list(Transaction.objects.filter(
+            kind_of_transaction=Transaction.KindOfTransaction.EXPENSE, date__gte=since
+        ).values_list('owner_id', flat=True).distinct().order_by('owner_id'))
+        SpendingAnomaly.objects.filter(date__lt=since).delete()
+        batches += [(alias, owners[start:start + batch_size]) for start in range(0, len(owners), batch_size)]
+    return batches
+
+
+def detect_batch(alias, owner_ids, now=None):
+    with using_shard(alias):
+        return sum(refresh_owner_anomalies(owner_id, now) for owner_id in owner_ids)
+
+
+def run_anomaly_detection(workers=None, batch_size=BATCH_SIZE):
+    """Refresh the anomalies of every owner, spreading the batches over ``workers`` processes."""
+    workers = settings.ANOMALY_WORKERS if workers is None else workers
+    batches = anomaly_batches(batch_size)
+    if workers <= 1 or len(batches) <= 1:
+        return sum(detect_batch(alias, owner_ids) for alias, owner_ids in batches)
+    # Forked workers would otherwise share the parent's database connections
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        return sum(pool.map(detect_batch, *zip(*batches)))
@@ -0,0 +1,114 @@
+import numpy as np
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from business_suppliers.models import Supplier, SupplierTransaction
+from core.throttles import buckets
+from finances.anomalies.anomaly_detection import anomaly_batches, find_anomalies, score_expenses
+from finances.models import Account, Category, SpendingAnomaly, Transaction
+from finances.tasks import detect_anomalies
+from django.urls import reverse
+from rest_framework import status
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+
+class ScoreExpensesTest(TestCase):
+    def test_matches_per_group_median_and_mad(self):
+        rng = np.random.default_rng(7)
+        groups = rng.integers(0, 5, 500)
+        months = rng.integers(0, 12, 500)
+        amounts = rng.gamma(2.0, 30.0, 500).round(2)
+        baseline, spread, score = score_expenses(groups, months, amounts, min_samples=1, seasonal_samples=1000)
+        for group in range(5):
+            values = amounts[groups == group]
+            median = np.median(values)
+            mad = np.median(np.abs(values - median)) * 1.4826
+            np.testing.assert_allclose(baseline[groups == group], median)
+            np.testing.assert_allclose(spread[groups == group], max(mad, median * 0.05))
+            np.testing.assert_allclose(score[groups == group], (values - median) / max(mad, median * 0.05))
+
+    def test_seasonal_months_use_their_own_baseline(self):
+        # Heating costs 20 most of the year but 200 in January
+        groups = np.zeros(24, dtype=np.int64)
+        months = np.array([0] * 6 + [6] * 18)
+        amounts = np.array([200.0] * 5 + [215.0] + [20.0] * 17 + [21.0])
+        baseline, _, score = score_expenses(groups, months, amounts, min_samples=8, seasonal_samples=4)
+        self.assertEqual(baseline[0], 200)
+        self.assertEqual(baseline[-1], 20)
+        self.assertTrue(np.all(score < 3.5))
+
+    def test_small_groups_are_not_scored(self):
+        _, _, score = score_expenses(np.zeros(3, dtype=np.int64), np.zeros(3, dtype=np.int64), np.array([1.0, 1.0, 90.0]))
+        self.assertEqual(score.tolist(), [0, 0, 0])
+
+
+class SpendingAnomalyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+        self.supplier = Supplier.objects.create(name='Bakery', slug='bakery', owner=self.user)
+        self.now = timezone.now()
+        for week in range(1, 20):
+            bread = self.create_transaction(Decimal('4.00') + Decimal(week % 3) / 10, self.now - timedelta(weeks=week))
+            SupplierTransaction.objects.create(supplier=self.supplier, transaction=bread, owner=self.user)
+        self.cake = self.create_transaction('60.00', self.now - timedelta(days=2))
+        SupplierTransaction.objects.create(supplier=self.supplier, transaction=self.cake, owner=self.user)
+        self.usual = self.create_transaction('4.10', self.now - timedelta(days=1))
+
+    def create_transaction(self, amount, date):
+        return Transaction.objects.create(
+            kind_of_transaction='EXPENSE',
+            amount=Decimal(amount),
+            description='Bakery',
+            date=date,
+            category=self.food,
+            account=self.account,
+            owner=self.user
+        )
+
+    def test_flags_outliers_per_category_and_supplier(self):
+        with self.assertNumQueries(1):
+            anomalies = find_anomalies(self.user.pk, self.now)
+        self.assertEqual(
+            sorted((anomaly.transaction_id, anomaly.dimension, anomaly.group_name) for anomaly in anomalies),
+            [(self.cake.pk, 'CATEGORY', 'Food'), (self.cake.pk, 'SUPPLIER', 'Bakery')]
+        )
+        self.assertTrue(all(Decimal('4') < anomaly.baseline < Decimal('4.3') for anomaly in anomalies))
+
+    @override_settings(ANOMALY_RECENT_DAYS=1)
+    def test_only_recent_expenses_are_flagged(self):
+        self.assertEqual(find_anomalies(self.user.pk, self.now), [])
+
+    def test_endpoint_lists_detected_anomalies(self):
+        response = self.client.post(reverse('spendinganomaly-detect'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get(reverse('spendinganomaly-list'), {'dimension': 'SUPPLIER'})
+        self.assertEqual([row['transaction'] for row in response.data['results']], [self.cake.pk])
+        self.assertEqual(response.data['results'][0]['group_name'], 'Bakery')
+
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(reverse('spendinganomaly-list')).data['count'], 0)
+
+    def test_nightly_task_fans_out_batches(self):
+        with mock.patch('finances.tasks.detect_anomaly_batch.delay') as delay:
+            self.assertEqual(detect_anomalies(), 1)
+        delay.assert_called_once_with(None, [self.user.pk])
+
+    def test_batches_drop_stale_anomalies(self):
+        call_command('detect_anomalies', workers=1, stdout=StringIO())
+        self.assertEqual(SpendingAnomaly.objects.count(), 2)
+        self.assertEqual(anomaly_batches(now=self.now + timedelta(days=60)), [])
+        self.assertFalse(SpendingAnomaly.objects.exists())
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from finances.models import SpendingAnomaly
+
+class SpendingAnomalySerializer(serializers.ModelSerializer):
+    description = serializers.CharField(source='transaction.description', read_only=True)
+
+    class Meta:
+        model = SpendingAnomaly
+        fields = [
+            'id',
+            'transaction',
+            'description',
+            'date',
+            'dimension',
+            'group_id',
+            'group_name',
+            'amount',
+            'baseline',
+            'spread',
+            'score',
+            'detected_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,24 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from finances.anomalies.anomaly_detection import refresh_owner_anomalies
+from finances.anomalies.anomaly_serializers import SpendingAnomalySerializer
+from finances.models import SpendingAnomaly
+from finances.sharding.owner_shards import OwnerShardMixin
+
+class SpendingAnomalyViewSet(OwnerShardMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = SpendingAnomaly.objects.all()
+    serializer_class = SpendingAnomalySerializer
+    permission_classes = [IsAuthenticated]
+    # Detection reads the whole lookback window of the owner's expenses
+    throttle_costs = {'detect': 10}
+    filterset_fields = ['dimension', 'group_id']
+
+    def get_queryset(self):
+        return self.queryset.filter(owner=self.request.user).select_related('transaction')
+
+    @action(detail=False, methods=['post'])
+    def detect(self, request):
+        """Run the nightly detection for the current owner now."""
+        refresh_owner_anomalies(request.user.pk)
+        return self.list(request)
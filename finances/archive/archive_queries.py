@@ -0,0 +1,90 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import BooleanField, Count, Sum, Value
+from django.utils import timezone
+from finances.models import ArchivedTransaction, TransactionRollup
+
+
+def archive_cutoff(today=None):
+    """First day still kept in the hot table; older transactions may be archived."""
+    today = today or timezone.localdate()
+    return (today - timedelta(days=settings.ARCHIVE_HORIZON_DAYS)).replace(day=1)
+
+
+def aware_cutoff(today=None):
+    return timezone.make_aware(datetime.combine(archive_cutoff(today), time.min))
+
+
+def needs_archive(start_date):
+    """Whether a range starting at ``start_date`` (``None`` for all time) reaches archived rows."""
+    return start_date is None or start_date < archive_cutoff()
+
+
+def archived_totals(owner, fields, start_date=None, end_date=None):
+    """Archived totals grouped by ``fields``, each row with ``total`` and ``count``.
+
+    All-time ranges are answered from the monthly rollups; bounded ranges
+    read the archive table itself.
+    """
+    if start_date is None and (end_date is None or end_date >= archive_cutoff()):
+        return TransactionRollup.objects.filter(owner=owner).values(*fields)\
+            .annotate(total=Sum('total'), count=Sum('count')).order_by()
+    queryset = ArchivedTransaction.objects.filter(owner=owner)
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    return queryset.values(*fields).annotate(total=Sum('amount'), count=Count('id')).order_by()
+
+
+def merge_totals(fields, *row_sets):
+    """Add up ``total`` across row sets that share the grouping ``fields``."""
+    totals = defaultdict(Decimal)
+    for rows in row_sets:
+        for row in rows:
+            totals[tuple(row[field] for field in fields)] += row['total']
+    return [
+        {**dict(zip(fields, key)), 'total': total}
+        for key, total in sorted(totals.items(), key=lambda item: tuple(str(value) for value in item[0]))
+    ]
+
+
+class ArchiveUnion:
+    """Hot and archived transactions as one countable, sliceable list in ``ordering``, newest first by default.
+
+    Slicing runs a ``UNION ALL`` of the ordering fields and ids to pick the
+    page, then loads the page's rows from each table, so the paginator never
+    materializes more than one page of instances. ``ordering`` may only name
+    fields both tables have.
+    """
+
+    def __init__(self, hot, archived, ordering=('-date',)):
+        self.hot = hot.select_related('category', 'account')
+        self.archived = archived.select_related('category', 'account')
+        self.fields = [field.lstrip('-') for field in ordering if field.lstrip('-') != 'id']
+        # Ties fall back to the id in the direction of the first field
+        self.ordering = [*ordering, '-id' if not ordering or ordering[0].startswith('-') else 'id']
+
+    def count(self):
+        return self.hot.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        keys = self.hot.order_by().annotate(archived=Value(False, output_field=BooleanField()))\
+            .values_list(*self.fields, 'id', 'archived')\
+            .union(
+                self.archived.order_by().annotate(archived=Value(True, output_field=BooleanField()))
+                .values_list(*self.fields, 'id', 'archived'),
+                all=True
+            ).order_by(*self.ordering)[index]
+        if not isinstance(index, slice):
+            keys = [keys]
+        keys = [(pk, bool(archived)) for *_, pk, archived in keys]
+        rows = {(row.pk, False): row for row in self.hot.filter(pk__in=[pk for pk, archived in keys if not archived])}
+        rows.update({(row.pk, True): row for row in self.archived.filter(pk__in=[pk for pk, archived in keys if archived])})
+        page = [rows[key] for key in keys]
+        return page if isinstance(index, slice) else page[0]
@@ -0,0 +1,58 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import router, transaction as db_transaction
+from django.db.models import F
+from finances.archive.archive_queries import aware_cutoff
+from finances.models import ArchivedTransaction, Transaction, TransactionRollup, local_date
+from finances.signals import ledger_hooks_suspended
+
+BATCH_SIZE = 2000
+ARCHIVED_FIELDS = (
+    'id', 'owner_id', 'created_at', 'updated_at', 'kind_of_transaction', 'amount', 'date',
+    'description', 'category_id', 'account_id', 'receipt_image',
+)
+
+
+def archive_transactions(cutoff=None, batch_size=BATCH_SIZE):
+    """Move transactions dated before ``cutoff`` into the archive, one batch per database transaction.
+
+    Each batch copies rows into ``ArchivedTransaction``, folds them into the
+    monthly ``TransactionRollup`` rows and deletes them from the hot table, so
+    totals stay the same whichever table a row lives in.
+    """
+    cutoff = cutoff or aware_cutoff()
+    moved = 0
+    while True:
+        with db_transaction.atomic(using=router.db_for_write(Transaction)):
+            rows = list(
+                Transaction.objects.filter(date__lt=cutoff).order_by('id')
+                .values(*ARCHIVED_FIELDS, supplier=F('supplier_transaction__supplier_id'))[:batch_size]
+            )
+            if not rows:
+                return moved
+
+            ArchivedTransaction.objects.bulk_create([
+                ArchivedTransaction(supplier_id=row.pop('supplier'), **row) for row in rows
+            ])
+
+            rollups = defaultdict(lambda: [Decimal('0'), 0])
+            for row in rows:
+                month = local_date(row['date']).replace(day=1)
+                key = (row['owner_id'], row['account_id'], row['category_id'], row['kind_of_transaction'], month)
+                rollups[key][0] += row['amount']
+                rollups[key][1] += 1
+            for (owner_id, account_id, category_id, kind, month), (total, count) in rollups.items():
+                updated = TransactionRollup.objects.filter(
+                    owner_id=owner_id, account_id=account_id, category_id=category_id,
+                    kind_of_transaction=kind, month=month
+                ).update(total=F('total') + total, count=F('count') + count)
+                if not updated:
+                    TransactionRollup.objects.create(
+                        owner_id=owner_id, account_id=account_id, category_id=category_id,
+                        kind_of_transaction=kind, month=month, total=total, count=count
+                    )
+
+            # Budget periods and cached reports already account for these rows
+            with ledger_hooks_suspended():
+                Transaction.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
@@ -0,0 +1,105 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from finances.archive.archive_queries import aware_cutoff
+from finances.archive.archive_runner import archive_transactions
+from finances.models import (
+    Account, ArchivedTransaction, Budget, BudgetPeriod, Category, Transaction, TransactionRollup
+)
+from finances.reconciliation.reconciliation_runner import run_reconciliation
+from django.urls import reverse
+from rest_framework import status
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+
+class ArchiveTransactionsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(
+            name='Checking', slug='checking', balance=Decimal('170.00'), owner=self.user
+        )
+        self.budget = Budget.objects.create(
+            category=self.category, period=Budget.Period.MONTHLY, limit=Decimal('500.00'), owner=self.user
+        )
+        self.old = aware_cutoff() - timedelta(days=40)
+        self.create_transaction('INCOME', '300.00', self.old)
+        self.create_transaction('EXPENSE', '80.00', self.old)
+        self.create_transaction('EXPENSE', '50.00', timezone.now())
+
+    def create_transaction(self, kind, amount, date):
+        return Transaction.objects.create(
+            kind_of_transaction=kind,
+            amount=Decimal(amount),
+            description='Entry',
+            date=date,
+            category=self.category,
+            account=self.account,
+            owner=self.user
+        )
+
+    def test_archive_moves_rows_and_rolls_them_up(self):
+        out = StringIO()
+        call_command('archive_transactions', '--batch-size', '1', stdout=out)
+        self.assertIn('Archived 2 transactions', out.getvalue())
+
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(ArchivedTransaction.objects.count(), 2)
+        rollups = {row.kind_of_transaction: (row.total, row.count) for row in TransactionRollup.objects.all()}
+        self.assertEqual(rollups, {'INCOME': (Decimal('300.00'), 1), 'EXPENSE': (Decimal('80.00'), 1)})
+        # Budget periods keep the archived spending
+        self.assertEqual(BudgetPeriod.objects.get(period_start=self.old.date().replace(day=1)).spent, Decimal('80.00'))
+        self.assertEqual(archive_transactions(), 0)
+
+    def test_reports_include_archived_rows(self):
+        before = self.client.get(reverse('transaction-summary'), {'start_date': '2000-01-01'}).data
+        by_category = self.client.get(reverse('transaction-by-category')).data
+        archive_transactions()
+
+        after = self.client.get(reverse('transaction-summary'), {'start_date': '2000-01-01'}).data
+        self.assertEqual(after['total_income'], before['total_income'])
+        self.assertEqual(after['total_expenses'], before['total_expenses'])
+        self.assertEqual(after['transaction_count'], before['transaction_count'])
+        self.assertEqual(self.client.get(reverse('transaction-by-category')).data, by_category)
+
+        tree = self.client.get(reverse('category-tree')).data
+        self.assertEqual(tree[0]['total_expenses'], '130.00')
+        self.assertEqual(run_reconciliation().mismatches, 0)
+
+    def test_list_reads_archive_only_for_old_ranges(self):
+        archive_transactions()
+        response = self.client.get(reverse('transaction-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.get(reverse('transaction-list'), {'start_date': '2000-01-01'})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            sorted(row['amount'] for row in response.data['results']), ['300.00', '50.00', '80.00']
+        )
+
+        response = self.client.get(reverse('transaction-list'), {'start_date': 'bad'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_upper_bounds_reach_the_archive(self):
+        archive_transactions()
+        old_day = self.old.date().isoformat()
+        for params in ({'end_date': old_day}, {'date_before': old_day}):
+            response = self.client.get(reverse('transaction-list'), params)
+            # The whole end day is included
+            self.assertEqual(
+                sorted(row['amount'] for row in response.data['results']), ['300.00', '80.00'], params
+            )
+
+    def test_list_orders_archived_rows(self):
+        archive_transactions()
+        response = self.client.get(reverse('transaction-list'), {'start_date': '2000-01-01', 'ordering': 'amount'})
+        self.assertEqual([row['amount'] for row in response.data['results']], ['50.00', '80.00', '300.00'])
+        response = self.client.get(reverse('transaction-list'), {'start_date': '2000-01-01', 'ordering': '-amount'})
+        self.assertEqual([row['amount'] for row in response.data['results']], ['300.00', '80.00', '50.00'])
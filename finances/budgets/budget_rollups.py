@@ -0,0 +1,99 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import router, transaction as db_transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+from finances.models import ArchivedTransaction, Budget, BudgetPeriod, Transaction, local_date
+
+PERIOD_TRUNCS = {
+    Budget.Period.WEEKLY: TruncWeek,
+    Budget.Period.MONTHLY: TruncMonth,
+    Budget.Period.YEARLY: TruncYear,
+}
+CONTRIBUTION_FIELDS = ('owner_id', 'category_id', 'kind_of_transaction', 'amount', 'date')
+
+
+def rebuild_budget_periods(budget):
+    """Recompute every period total of a budget with one grouped query."""
+    trunc = PERIOD_TRUNCS[budget.period]
+    spent = defaultdict(Decimal)
+    # Archived expenses still count towards the periods they fall in
+    for model in (Transaction, ArchivedTransaction):
+        totals = model.objects.filter(
+            owner_id=budget.owner_id,
+            category_id=budget.category_id,
+            kind_of_transaction=Transaction.KindOfTransaction.EXPENSE,
+        ).annotate(bucket=trunc('date')).values('bucket').annotate(total=Sum('amount')).order_by()
+        for row in totals:
+            spent[local_date(row['bucket'])] += row['total']
+
+    with db_transaction.atomic(using=router.db_for_write(BudgetPeriod)):
+        BudgetPeriod.objects.filter(budget=budget).delete()
+        BudgetPeriod.objects.bulk_create([
+            BudgetPeriod(budget=budget, period_start=period_start, spent=total)
+            for period_start, total in spent.items()
+        ])
+
+
+def _add_to_period(budget_id, period_start, delta):
+    period = BudgetPeriod.objects.filter(budget_id=budget_id, period_start=period_start)
+    if period.update(spent=F('spent') + delta):
+        return
+    # A concurrent writer may create the period between the update and the
+    # insert: insert an empty row, letting the unique constraint swallow the
+    # duplicate, and add the delta on top of whichever row won.
+    BudgetPeriod.objects.bulk_create(
+        [BudgetPeriod(budget_id=budget_id, period_start=period_start, spent=0)], ignore_conflicts=True,
+    )
+    period.update(spent=F('spent') + delta)
+
+
+def apply_expense_delta(owner_id, category_id, day, delta):
+    """Add ``delta`` to the period totals of every budget tracking the category."""
+    if not delta:
+        return
+    budgets = Budget.objects.filter(owner_id=owner_id, category_id=category_id)\
+        .values_list('id', 'period').order_by()
+    for budget_id, period in budgets:
+        _add_to_period(budget_id, Budget.period_bounds(period, day)[0], delta)
+
+
+def apply_bulk_expenses(transactions):
+    """Fold many new transactions into budget periods with one update per touched period.
+
+    Used after ``bulk_create``, which bypasses the model signals.
+    """
+    per_day = defaultdict(Decimal)
+    for transaction in transactions:
+        contribution = expense_contribution({field: getattr(transaction, field) for field in CONTRIBUTION_FIELDS})
+        if contribution:
+            _, category_id, day, amount = contribution
+            per_day[(category_id, day)] += amount
+    if not per_day:
+        return
+
+    budgets = defaultdict(list)
+    category_ids = {category_id for category_id, _ in per_day}
+    for budget_id, category_id, period in Budget.objects.filter(category_id__in=category_ids)\
+            .values_list('id', 'category_id', 'period').order_by():
+        budgets[category_id].append((budget_id, period))
+
+    per_period = defaultdict(Decimal)
+    for (category_id, day), amount in per_day.items():
+        for budget_id, period in budgets[category_id]:
+            per_period[(budget_id, Budget.period_bounds(period, day)[0])] += amount
+
+    for (budget_id, period_start), delta in per_period.items():
+        _add_to_period(budget_id, period_start, delta)
+
+
+def expense_contribution(values):
+    """Return ``(owner_id, category_id, day, amount)`` for an expense, ``None`` otherwise."""
+    if values.get('kind_of_transaction') != Transaction.KindOfTransaction.EXPENSE:
+        return None
+    return (
+        values['owner_id'],
+        values['category_id'],
+        local_date(values['date']),
+        Decimal(str(values['amount'])),
+    )
@@ -0,0 +1,68 @@
+from rest_framework import serializers
+from core.owner_fields import OwnedPrimaryKeyRelatedField
+from finances.models import Budget
+from finances.categories.category_serializers import CategorySerializer
+from finances.budgets.budget_rollups import rebuild_budget_periods
+
+class BudgetSerializer(serializers.ModelSerializer):
+    category_details = CategorySerializer(source='category', read_only=True)
+    serializer_related_field = OwnedPrimaryKeyRelatedField
+
+    class Meta:
+        model = Budget
+        fields = [
+            'id',
+            'category',
+            'category_details',
+            'period',
+            'limit',
+            'created_at',
+            'updated_at'
+        ]
+        read_only_fields = ['owner']
+
+    def validate(self, data):
+        # Categories of other owners are rejected by OwnedPrimaryKeyRelatedField
+        category = data.get('category', getattr(self.instance, 'category', None))
+        period = data.get('period', getattr(self.instance, 'period', Budget.Period.MONTHLY))
+        duplicates = Budget.objects.filter(
+            owner_id=self.context['request'].user.pk,
+            category=category,
+            period=period
+        )
+        if self.instance:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError({"category": "A budget for this category and period already exists"})
+
+        return data
+
+    def create(self, validated_data):
+        validated_data['owner'] = self.context['request'].user
+        budget = super().create(validated_data)
+        rebuild_budget_periods(budget)
+        return budget
+
+    def update(self, instance, validated_data):
+        rebuild = any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in ('category', 'period')
+        )
+        budget = super().update(instance, validated_data)
+        if rebuild:
+            rebuild_budget_periods(budget)
+        return budget
+
+class BudgetStatusSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    category = serializers.IntegerField(source='category_id')
+    category_name = serializers.CharField(source='category.name')
+    period = serializers.CharField()
+    period_start = serializers.DateField()
+    period_end = serializers.DateField()
+    limit = serializers.DecimalField(max_digits=15, decimal_places=2)
+    spent = serializers.DecimalField(max_digits=15, decimal_places=2)
+    remaining = serializers.DecimalField(max_digits=15, decimal_places=2)
+    utilization = serializers.FloatField()
+    burn_rate = serializers.DecimalField(max_digits=15, decimal_places=2)
+    projected_spent = serializers.DecimalField(max_digits=15, decimal_places=2)
@@ -0,0 +1,49 @@
+from decimal import Decimal
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from finances.budgets.budget_serializers import BudgetSerializer, BudgetStatusSerializer
+from finances.models import Budget
+from finances.sharding.owner_shards import OwnerShardMixin
+
+class BudgetViewSet(OwnerShardMixin, viewsets.ModelViewSet):
+    queryset = Budget.objects.all()
+    serializer_class = BudgetSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_costs = {'status': 2}
+
+    def get_queryset(self):
+        return self.queryset.filter(owner=self.request.user).select_related('category')
+
+    @action(detail=False, methods=['get'])
+    def status(self, request):
+        today = timezone.localdate()
+        current_period = Q()
+        for period in Budget.Period.values:
+            period_start, _ = Budget.period_bounds(period, today)
+            current_period |= Q(period=period, periods__period_start=period_start)
+
+        # Period totals are maintained on every transaction write, so this is
+        # a single query over the owner's budgets regardless of ledger size
+        budgets = self.get_queryset().annotate(
+            spent=Coalesce(
+                Sum('periods__spent', filter=current_period),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=15, decimal_places=2)
+            )
+        )
+
+        for budget in budgets:
+            budget.period_start, budget.period_end = Budget.period_bounds(budget.period, today)
+            elapsed_days = (today - budget.period_start).days + 1
+            total_days = (budget.period_end - budget.period_start).days + 1
+            budget.remaining = budget.limit - budget.spent
+            budget.utilization = float(budget.spent / budget.limit)
+            budget.burn_rate = budget.spent / elapsed_days
+            budget.projected_spent = budget.burn_rate * total_days
+
+        return Response(BudgetStatusSerializer(budgets, many=True).data)
@@ -0,0 +1,139 @@
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from finances.models import Budget, BudgetPeriod, Transaction, Category, Account
+from django.urls import reverse
+from rest_framework import status
+from decimal import Decimal
+from django.utils import timezone
+
+class BudgetViewSetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.category = Category.objects.create(
+            name='Groceries',
+            slug='groceries',
+            owner=self.user
+        )
+        self.account = Account.objects.create(
+            name='Test Account',
+            slug='test-account',
+            balance=1000.00,
+            owner=self.user
+        )
+        self.budget = Budget.objects.create(
+            category=self.category,
+            period=Budget.Period.MONTHLY,
+            limit=Decimal('500.00'),
+            owner=self.user
+        )
+
+    def create_transaction(self, amount, kind='EXPENSE', **kwargs):
+        return Transaction.objects.create(
+            kind_of_transaction=kind,
+            amount=Decimal(amount),
+            date=kwargs.pop('date', timezone.now()),
+            description='Test transaction',
+            category=kwargs.pop('category', self.category),
+            account=self.account,
+            owner=self.user
+        )
+
+    def current_spent(self):
+        period_start, _ = Budget.period_bounds(self.budget.period, timezone.localdate())
+        return BudgetPeriod.objects.get(budget=self.budget, period_start=period_start).spent
+
+    def test_create_budget_backfills_current_period(self):
+        category = Category.objects.create(name='Rent', slug='rent', owner=self.user)
+        self.create_transaction('120.00', category=category)
+        self.create_transaction('30.00', category=category)
+
+        response = self.client.post(reverse('budget-list'), {
+            'category': category.id,
+            'period': 'MONTHLY',
+            'limit': '1000.00'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        budget = Budget.objects.get(pk=response.data['id'])
+        self.assertEqual(budget.periods.get().spent, Decimal('150.00'))
+
+    def test_create_duplicate_budget(self):
+        response = self.client.post(reverse('budget-list'), {
+            'category': self.category.id,
+            'period': 'MONTHLY',
+            'limit': '100.00'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('category', response.data)
+
+    def test_invalid_category(self):
+        other_user = User.objects.create_user(username='other', password='pass123')
+        other_category = Category.objects.create(name='Other Category', owner=other_user)
+        response = self.client.post(reverse('budget-list'), {
+            'category': other_category.id,
+            'period': 'WEEKLY',
+            'limit': '100.00'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('category', response.data)
+
+    def test_spending_follows_transaction_writes(self):
+        transaction = self.create_transaction('100.00')
+        self.create_transaction('50.00')
+        self.create_transaction('999.00', kind='INCOME')
+        self.assertEqual(self.current_spent(), Decimal('150.00'))
+
+        transaction = Transaction.objects.get(pk=transaction.pk)
+        transaction.amount = Decimal('40.00')
+        transaction.save()
+        self.assertEqual(self.current_spent(), Decimal('90.00'))
+
+        transaction.kind_of_transaction = 'INCOME'
+        transaction.save()
+        self.assertEqual(self.current_spent(), Decimal('50.00'))
+
+        Transaction.objects.filter(amount=Decimal('50.00')).get().delete()
+        self.assertEqual(self.current_spent(), Decimal('0.00'))
+
+    def test_period_created_concurrently_keeps_both_amounts(self):
+        period_start, _ = Budget.period_bounds(self.budget.period, timezone.localdate())
+        bulk_create = BudgetPeriod.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # Another writer inserts the period between the miss and the insert.
+            BudgetPeriod.objects.create(budget=self.budget, period_start=period_start, spent=Decimal('70.00'))
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(BudgetPeriod.objects, 'bulk_create', racing_bulk_create):
+            self.create_transaction('30.00')
+        self.assertEqual(self.current_spent(), Decimal('100.00'))
+
+    def test_status_endpoint(self):
+        self.create_transaction('200.00')
+        self.create_transaction('100.00')
+        other = Category.objects.create(name='Fun', slug='fun', owner=self.user)
+        Budget.objects.create(category=other, period=Budget.Period.WEEKLY, limit=Decimal('50.00'), owner=self.user)
+
+        url = reverse('budget-status')
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+        groceries = next(item for item in response.data if item['id'] == self.budget.id)
+        self.assertEqual(groceries['spent'], '300.00')
+        self.assertEqual(groceries['remaining'], '200.00')
+        self.assertAlmostEqual(groceries['utilization'], 0.6)
+        elapsed_days = timezone.localdate().day
+        self.assertEqual(Decimal(groceries['burn_rate']), (Decimal('300.00') / elapsed_days).quantize(Decimal('0.01')))
+
+        fun = next(item for item in response.data if item['category_name'] == 'Fun')
+        self.assertEqual(fun['spent'], '0.00')
+        self.assertEqual(fun['period'], 'WEEKLY')
@@ -1,12 +1,23 @@
 from rest_framework import serializers
+from core.owner_fields import OwnedPrimaryKeyRelatedField
 from finances.models import Category
 from django.utils.text import slugify
 
 class CategorySerializer(serializers.ModelSerializer):
+    serializer_related_field = OwnedPrimaryKeyRelatedField
+
     class Meta:
         model = Category
-        fields = ['id', 'name', 'description', 'slug']
-        read_only_fields = ['slug']
+        fields = ['id', 'name', 'description', 'slug', 'parent', 'path']
+        read_only_fields = ['slug', 'path']
+
+    def validate_parent(self, parent):
+        # Parents of other owners are rejected by OwnedPrimaryKeyRelatedField
+        if parent is None:
+            return parent
+        if self.instance and parent.path.startswith(self.instance.path):
+            raise serializers.ValidationError("A category cannot be moved under itself or its subcategories")
+        return parent
 
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
@@ -17,3 +28,16 @@ class CategorySerializer(serializers.ModelSerializer):
         validated_data['owner'] = self.context['request'].user
         validated_data['slug'] = slugify(validated_data['name'])
         return super().update(instance, validated_data)
+
+class CategoryTreeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    slug = serializers.CharField()
+    income = serializers.DecimalField(max_digits=15, decimal_places=2)
+    expenses = serializers.DecimalField(max_digits=15, decimal_places=2)
+    total_income = serializers.DecimalField(max_digits=15, decimal_places=2)
+    total_expenses = serializers.DecimalField(max_digits=15, decimal_places=2)
+    children = serializers.SerializerMethodField()
+
+    def get_children(self, row):
+        return CategoryTreeSerializer(row['children'], many=True).data
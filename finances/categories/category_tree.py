@@ -0,0 +1,45 @@
+from collections import defaultdict
+from decimal import Decimal
+from finances.aggregates import kind_total, rollup_total
+from finances.models import Transaction
+
+
+def category_totals(categories):
+    """Return one row per category with its own and its whole subtree's totals.
+
+    The per-category sums, archived rollups included, come from a single
+    grouped query; subtree totals are then rolled up along each row's
+    materialized path, so the cost is O(categories * depth) no matter how
+    deep the hierarchy is.
+    """
+    rows = list(
+        categories.order_by('name')
+        .values('id', 'name', 'slug', 'parent_id', 'path')
+        .annotate(
+            income=kind_total(Transaction.KindOfTransaction.INCOME)
+            + rollup_total(Transaction.KindOfTransaction.INCOME, 'category'),
+            expenses=kind_total(Transaction.KindOfTransaction.EXPENSE)
+            + rollup_total(Transaction.KindOfTransaction.EXPENSE, 'category'),
+        )
+    )
+    by_id = {row['id']: row for row in rows}
+    for row in rows:
+        row['total_income'] = Decimal('0')
+        row['total_expenses'] = Decimal('0')
+    for row in rows:
+        for pk in row['path'].split('/'):
+            ancestor = by_id.get(int(pk)) if pk else None
+            if ancestor:
+                ancestor['total_income'] += row['income']
+                ancestor['total_expenses'] += row['expenses']
+    return rows
+
+
+def build_tree(rows):
+    """Nest ``category_totals`` rows under their parents and return the roots."""
+    children = defaultdict(list)
+    for row in rows:
+        children[row['parent_id']].append(row)
+    for row in rows:
+        row['children'] = children[row['id']]
+    return children[None]
@@ -1,13 +1,29 @@
-from rest_framework import viewsets
-from finances.categories.category_serializers import CategorySerializer
-from finances.models import Category
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from finances.categories.category_serializers import CategorySerializer, CategoryTreeSerializer
+from finances.categories.category_tree import build_tree, category_totals
+from finances.currencies.currency_rates import MixedCurrencies, single_currency
+from finances.models import Account, Category
 from rest_framework.permissions import IsAuthenticated
+from core.db_routers import ReadReplicaMixin
+from finances.sharding.owner_shards import OwnerShardMixin
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(OwnerShardMixin, ReadReplicaMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
+    throttle_costs = {'tree': 5}
     lookup_field = 'slug'
 
     def get_queryset(self):
         return self.queryset.filter(owner=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        try:
+            single_currency(Account.objects.filter(owner=request.user))
+        except MixedCurrencies as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        roots = build_tree(category_totals(self.get_queryset()))
+        return Response(CategoryTreeSerializer(roots, many=True).data)
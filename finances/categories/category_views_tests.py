@@ -1,8 +1,9 @@
 from rest_framework.test import APIClient
 from rest_framework.test import APITestCase
-from finances.models import Category
+from finances.models import Account, Category, Transaction
 from django.contrib.auth.models import User
 from django.urls import reverse
+from decimal import Decimal
 
 
 class CategoryViewSetTests(APITestCase):
@@ -47,3 +48,71 @@ class CategoryViewSetTests(APITestCase):
         assert response.json()['name'] == 'Test Category'
         assert response.json()['slug'] == 'test-category'
 
+
+
+class CategoryTreeTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.client.force_authenticate(user=self.user)
+        self.account = Account.objects.create(name="Wallet", slug="wallet", owner=self.user)
+        self.housing = Category.objects.create(name="Housing", slug="housing", owner=self.user)
+        self.utilities = Category.objects.create(name="Utilities", slug="utilities", parent=self.housing, owner=self.user)
+        self.electricity = Category.objects.create(name="Electricity", slug="electricity", parent=self.utilities, owner=self.user)
+        self.food = Category.objects.create(name="Food", slug="food", owner=self.user)
+
+    def spend(self, category, amount):
+        Transaction.objects.create(
+            amount=Decimal(amount),
+            description="Bill",
+            category=category,
+            account=self.account,
+            owner=self.user
+        )
+
+    def test_paths(self):
+        self.electricity.refresh_from_db()
+        assert self.electricity.path == f"{self.housing.pk}/{self.utilities.pk}/{self.electricity.pk}/"
+
+    def test_move_subtree(self):
+        response = self.client.patch(reverse('category-detail', args=[self.utilities.slug]), data={'name': 'Utilities', 'parent': self.food.pk})
+        assert response.status_code == 200
+        self.electricity.refresh_from_db()
+        assert self.electricity.path == f"{self.food.pk}/{self.utilities.pk}/{self.electricity.pk}/"
+
+    def test_cannot_move_under_descendant(self):
+        response = self.client.patch(reverse('category-detail', args=[self.housing.slug]), data={'name': 'Housing', 'parent': self.electricity.pk})
+        assert response.status_code == 400
+        assert 'parent' in response.data
+
+    def test_tree(self):
+        self.spend(self.electricity, '80.00')
+        self.spend(self.utilities, '20.00')
+        self.spend(self.food, '15.00')
+
+        # The account currencies, then the totals
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('category-tree'))
+        assert response.status_code == 200
+        food, housing = response.data
+        assert housing['name'] == 'Housing'
+        assert housing['expenses'] == '0.00'
+        assert housing['total_expenses'] == '100.00'
+        utilities = housing['children'][0]
+        assert utilities['total_expenses'] == '100.00'
+        assert utilities['children'][0]['total_expenses'] == '80.00'
+        assert food['total_expenses'] == '15.00'
+        assert food['children'] == []
+
+    def test_by_category_rollup(self):
+        self.spend(self.electricity, '80.00')
+        self.spend(self.utilities, '20.00')
+
+        response = self.client.get(reverse('transaction-by-category'), {'rollup': 'true'})
+        assert response.status_code == 200
+        totals = {row['category__name']: row['total'] for row in response.data}
+        assert totals == {
+            'Housing': Decimal('100.00'),
+            'Utilities': Decimal('100.00'),
+            'Electricity': Decimal('80.00'),
+        }
@@ -0,0 +1,140 @@
+"""Per-owner category prediction from transaction descriptions.
+
+A multinomial naive Bayes model is trained from the owner's own
+categorized transactions and kept in a bounded per-process cache. Each use
+first learns the transactions added since the model's watermark with one
+query, so the cache stays current without retraining; models are rebuilt
+from scratch every ``CATEGORIZER_REBUILD_SECONDS`` to forget deleted rows.
+Predictions for a batch of descriptions are one NumPy gather and sum.
+"""
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+import numpy as np
+from django.conf import settings
+from django.db import router
+from finances.models import Transaction
+
+TOKEN = re.compile(r'[^\W\d_]{2,}')
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+class CategoryModel:
+    """Naive Bayes counts of one owner, updated incrementally and compiled to arrays on demand."""
+
+    def __init__(self):
+        self.documents = Counter()
+        self.tokens = defaultdict(Counter)
+        # Highest transaction id learned so far
+        self.watermark = 0
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+        self._compiled = None
+
+    @property
+    def examples(self):
+        return sum(self.documents.values())
+
+    def learn(self, category_id, text):
+        self.documents[category_id] += 1
+        self.tokens[category_id].update(tokenize(text))
+        self._compiled = None
+
+    def _compile(self):
+        categories = sorted(self.documents)
+        vocabulary = {token: index for index, token in enumerate(
+            sorted({token for counts in self.tokens.values() for token in counts})
+        )}
+        counts = np.ones((len(vocabulary), len(categories)))  # Laplace smoothing
+        for column, category_id in enumerate(categories):
+            for token, count in self.tokens[category_id].items():
+                counts[vocabulary[token], column] += count
+        log_likelihood = np.log(counts / counts.sum(axis=0))
+        documents = np.array([self.documents[category_id] for category_id in categories], dtype=np.float64)
+        log_prior = np.log(documents / documents.sum())
+        self._compiled = categories, vocabulary, log_likelihood, log_prior
+        return self._compiled
+
+    def predict(self, texts):
+        """Return ``(category_id, confidence)`` for each of ``texts``."""
+        categories, vocabulary, log_likelihood, log_prior = self._compiled or self._compile()
+        documents, rows = [], []
+        for document, text in enumerate(texts):
+            for token in tokenize(text):
+                if token in vocabulary:
+                    documents.append(document)
+                    rows.append(vocabulary[token])
+        scores = np.tile(log_prior, (len(texts), 1))
+        np.add.at(scores, np.array(documents, dtype=np.int64), log_likelihood[np.array(rows, dtype=np.int64)])
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        # Without a single known word the prior alone would pick the most used category
+        known = np.bincount(np.array(documents, dtype=np.int64), minlength=len(texts)) > 0
+        return [
+            (categories[column], float(probabilities[document, column]) if known[document] else 0.0)
+            for document, column in enumerate(best)
+        ]
+
+
+class ModelCache:
+    """Bounded, thread-safe LRU of ``(alias, owner_id) -> CategoryModel`` kept per process."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key):
+        with self._lock:
+            model = self._data.get(key)
+            if model is None or time.monotonic() - model.built_at > settings.CATEGORIZER_REBUILD_SECONDS:
+                model = self._data[key] = CategoryModel()
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return model
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+model_cache = ModelCache(settings.CATEGORIZER_CACHE_SIZE)
+
+
+def owner_model(owner_id):
+    """Return the owner's model after learning their categorized transactions past its watermark."""
+    alias = router.db_for_read(Transaction)
+    model = model_cache.get_or_create((alias, owner_id))
+    with model.lock:
+        # Predicted categories are not training labels, or the model would feed on its own guesses
+        for transaction_id, category_id, description in Transaction.objects.using(alias).filter(
+            owner_id=owner_id, ai_confidence_score__isnull=True, id__gt=model.watermark
+        ).values_list('id', 'category_id', 'description').order_by('id').iterator():
+            model.learn(category_id, description)
+            model.watermark = transaction_id
+    return model
+
+
+def predict_categories(owner_id, descriptions):
+    """Return a ``(category_id, confidence)`` prediction per description, or ``None`` where unsure.
+
+    Owners with fewer than ``CATEGORIZER_MIN_EXAMPLES`` categorized
+    transactions, and predictions under ``CATEGORIZER_MIN_CONFIDENCE``,
+    get ``None``.
+    """
+    model = owner_model(owner_id)
+    if model.examples < settings.CATEGORIZER_MIN_EXAMPLES or not descriptions:
+        return [None] * len(descriptions)
+    with model.lock:
+        predictions = model.predict(descriptions)
+    return [
+        prediction if prediction[1] >= settings.CATEGORIZER_MIN_CONFIDENCE else None
+        for prediction in predictions
+    ]
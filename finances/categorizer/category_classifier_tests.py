@@ -0,0 +1,123 @@
+import time
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.throttles import buckets
+from finances.categorizer.category_classifier import model_cache, owner_model, predict_categories, tokenize
+from finances.models import Account, Category, Transaction
+from django.urls import reverse
+from rest_framework import status
+from decimal import Decimal
+
+HISTORY = [
+    ('food', 'Padaria Pão Quente'),
+    ('food', 'Bakery bread and coffee'),
+    ('food', 'Supermarket groceries'),
+    ('food', 'Supermarket weekly groceries'),
+    ('transport', 'Uber trip downtown'),
+    ('transport', 'Taxi to the airport'),
+    ('transport', 'Uber trip home'),
+]
+
+
+class CategoryClassifierTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        model_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.transport = Category.objects.create(name='Transport', slug='transport', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+        for slug, description in HISTORY:
+            self.create_transaction(description, self.food if slug == 'food' else self.transport)
+
+    def create_transaction(self, description, category, **fields):
+        return Transaction.objects.create(
+            kind_of_transaction='EXPENSE',
+            amount=Decimal('10.00'),
+            description=description,
+            date=timezone.now(),
+            category=category,
+            account=self.account,
+            owner=self.user,
+            **fields
+        )
+
+    def payload(self, description):
+        return {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': '15.00',
+            'description': description,
+            'date': timezone.now().isoformat(),
+            'account': self.account.pk,
+        }
+
+    def test_tokenize_keeps_words_only(self):
+        self.assertEqual(tokenize('UBER *TRIP 4432 São Paulo'), ['uber', 'trip', 'são', 'paulo'])
+
+    def test_create_without_category_predicts_it(self):
+        response = self.client.post(reverse('transaction-list'), self.payload('UBER *TRIP 1234'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['category'], self.transport.pk)
+        self.assertTrue(response.data['ai_processed'])
+        self.assertGreater(response.data['ai_confidence_score'], 0.6)
+
+    def test_bulk_create_predicts_in_one_batch(self):
+        rows = [self.payload('Uber trip'), self.payload('Groceries at the supermarket')]
+        rows.append({**self.payload('Rent'), 'category': self.food.pk})
+        response = self.client.post(reverse('transaction-list'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual([row['category'] for row in response.data], [self.transport.pk, self.food.pk, self.food.pk])
+        self.assertEqual([row['ai_processed'] for row in response.data], [True, True, False])
+
+    def test_unpredictable_rows_are_rejected(self):
+        response = self.client.post(reverse('transaction-list'), self.payload('Wire 0042'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('category', response.data)
+
+        rows = [self.payload('Uber trip'), self.payload('Wire 0042')]
+        response = self.client.post(reverse('transaction-list'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['category']), 1)
+
+    def test_owners_without_history_get_no_prediction(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.assertEqual(predict_categories(other.pk, ['Uber trip']), [None])
+
+    def test_model_learns_incrementally(self):
+        model = owner_model(self.user.pk)
+        self.assertEqual(model.examples, len(HISTORY))
+        self.create_transaction('Metro card top-up', self.transport)
+        self.create_transaction('Metro ticket', self.food, ai_processed=True, ai_confidence_score=0.7)
+        with self.assertNumQueries(1):
+            # Only the new categorized row is read; predicted ones are not training labels
+            self.assertIs(owner_model(self.user.pk), model)
+        self.assertEqual(model.examples, len(HISTORY) + 1)
+        self.assertEqual(predict_categories(self.user.pk, ['metro'])[0][0], self.transport.pk)
+
+    def test_import_statement_without_categories(self):
+        statement = (
+            "date,description,amount,account\n"
+            "2024-03-05,Uber trip,-12.50,checking\n"
+        ).encode()
+        response = self.client.post(
+            reverse('transaction-import-transactions'),
+            {'file': SimpleUploadedFile('statement.csv', statement)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['transactions'][0]['category'], self.transport.pk)
+
+    def test_batched_prediction_is_fast(self):
+        model = owner_model(self.user.pk)
+        descriptions = [description for _, description in HISTORY] * 300
+        started = time.perf_counter()
+        predictions = model.predict(descriptions)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(len(predictions), len(descriptions))
+        self.assertLess(elapsed / len(descriptions), 0.001)
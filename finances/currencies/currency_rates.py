@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from finances.models import ExchangeRate
+
+ONE = Decimal('1')
+CENTS = Decimal('0.01')
+
+
+class RateNotFound(Exception):
+    def __init__(self, currency, day):
+        super().__init__(f"No exchange rate for {currency} on or before {day.isoformat()}")
+        self.currency = currency
+        self.day = day
+
+
+class MixedCurrencies(Exception):
+    def __init__(self, currencies):
+        super().__init__(
+            f"Accounts use several currencies ({', '.join(sorted(currencies))}); pass currency to convert them"
+        )
+        self.currencies = currencies
+
+
+def single_currency(accounts):
+    """Return the currency shared by the ``accounts`` queryset, ``None`` when it is empty.
+
+    Raises ``MixedCurrencies`` when they use several, since their amounts
+    cannot be added up without a target currency.
+    """
+    currencies = set(accounts.values_list('currency', flat=True).order_by().distinct())
+    if len(currencies) > 1:
+        raise MixedCurrencies(currencies)
+    return currencies.pop() if currencies else None
+
+
+class RateCache:
+    """Bounded, thread-safe LRU of ``(currency, day) -> rate`` kept per process.
+
+    Entries set with a ``timeout`` expire after that many seconds.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            value, expires = self._data[key]
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        with self._lock:
+            self._data[key] = (value, None if timeout is None else time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+rate_cache = RateCache(settings.FX_RATE_CACHE_SIZE)
+
+
+def get_rates(keys):
+    """Return the pivot rate of every ``(currency, day)`` in ``keys``.
+
+    Cache misses are loaded with one query covering all missing currencies and
+    days; each day uses the latest rate published on or before it, looking back
+    at most ``settings.FX_RATE_LOOKBACK_DAYS``. A rate published for an earlier
+    day is only cached for ``settings.FX_FALLBACK_RATE_SECONDS``, so workers
+    that did not see the day's own rate being saved pick it up soon after.
+    """
+    pivot = settings.FX_PIVOT_CURRENCY
+    rates = {}
+    missing = set()
+    for currency, day in keys:
+        rate = ONE if currency == pivot else rate_cache.get((currency, day))
+        if rate is None:
+            missing.add((currency, day))
+        else:
+            rates[(currency, day)] = rate
+    if not missing:
+        return rates
+
+    days = [day for _, day in missing]
+    published = defaultdict(list)
+    for currency, date, rate in ExchangeRate.objects.filter(
+        currency__in={currency for currency, _ in missing},
+        date__gte=min(days) - timedelta(days=settings.FX_RATE_LOOKBACK_DAYS),
+        date__lte=max(days),
+    ).order_by('currency', 'date').values_list('currency', 'date', 'rate'):
+        published[currency].append((date, rate))
+
+    for currency, day in sorted(missing):
+        rate = None
+        for date, value in reversed(published[currency]):
+            if date <= day:
+                if (day - date).days <= settings.FX_RATE_LOOKBACK_DAYS:
+                    rate = value
+                break
+        if rate is None:
+            raise RateNotFound(currency, day)
+        rate_cache.set((currency, day), rate, None if date == day else settings.FX_FALLBACK_RATE_SECONDS)
+        rates[(currency, day)] = rate
+    return rates
+
+
+def conversion_factors(keys, currency):
+    """Return the factor converting each ``(source currency, day)`` of ``keys`` into ``currency``.
+
+    Rates are only looked up for sources other than ``currency``, so
+    amounts already in it never need a published rate.
+    """
+    foreign = {(source, day) for source, day in keys if source != currency}
+    rates = get_rates(foreign | {(currency, day) for _, day in foreign})
+    return {
+        (source, day): rates[(source, day)] / rates[(currency, day)] if (source, day) in foreign else ONE
+        for source, day in keys
+    }
+
+
+def convert_grouped(queryset, fields, currency):
+    """Sum ``amount`` per ``fields`` in ``currency`` from one grouped query.
+
+    Transactions are grouped by account currency and day in SQL; conversion is
+    then applied once per group rather than once per transaction.
+    """
+    groups = list(
+        queryset.annotate(day=TruncDate('date'))
+        .values('account__currency', 'day', *fields)
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+    factors = conversion_factors({(group['account__currency'], group['day']) for group in groups}, currency)
+    totals = defaultdict(Decimal)
+    for group in groups:
+        factor = factors[(group['account__currency'], group['day'])]
+        totals[tuple(group[field] for field in fields)] += group['total'] * factor
+    return [
+        {**dict(zip(fields, key)), 'total': total.quantize(CENTS)}
+        for key, total in sorted(totals.items(), key=lambda item: tuple(str(value) for value in item[0]))
+    ]
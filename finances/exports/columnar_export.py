@@ -0,0 +1,78 @@
+import io
+from itertools import islice
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.fields import BooleanField
+from business_suppliers.models import Supplier
+from finances.models import ArchivedTransaction, Transaction
+
+CHUNK_SIZE = 10000
+FORMATS = {'arrow': 'application/vnd.apache.arrow.stream', 'parquet': 'application/vnd.apache.parquet'}
+
+# Column name, queryset expression and Arrow type, in file order
+COLUMNS = [
+    ('id', 'id', pa.int64()),
+    ('date', 'date', pa.timestamp('us', tz='UTC')),
+    ('kind', 'kind_of_transaction', pa.string()),
+    ('amount', 'amount', pa.decimal128(15, 2)),
+    ('description', 'description', pa.string()),
+    ('category', 'category__name', pa.string()),
+    ('account', 'account__name', pa.string()),
+    ('currency', 'account__currency', pa.string()),
+    ('supplier', 'supplier_name', pa.string()),
+    ('archived', 'archived', pa.bool_()),
+]
+SCHEMA = pa.schema([(name, arrow_type) for name, _, arrow_type in COLUMNS])
+
+
+def export_querysets(owner, using=None):
+    """Hot and archived transactions of ``owner`` as rows in ``COLUMNS`` order, joined to their names."""
+    fields = [expression for _, expression, _ in COLUMNS]
+    hot = Transaction.objects.using(using).filter(owner=owner).annotate(
+        supplier_name=F('supplier_transaction__supplier__name'),
+        archived=Value(False, output_field=BooleanField()),
+    )
+    archived = ArchivedTransaction.objects.using(using).filter(owner=owner).annotate(
+        supplier_name=Subquery(Supplier.objects.filter(pk=OuterRef('supplier_id')).values('name')[:1]),
+        archived=Value(True, output_field=BooleanField()),
+    )
+    return [queryset.values_list(*fields).order_by('id') for queryset in (hot, archived)]
+
+
+def record_batches(querysets, chunk_size=CHUNK_SIZE):
+    """Yield one ``RecordBatch`` per ``chunk_size`` rows, reading each queryset through a chunked cursor.
+
+    Rows arrive as the cursor's tuples and are transposed straight into
+    column arrays; no model instances or dicts are built.
+    """
+    for queryset in querysets:
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            columns = zip(*chunk)
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(values, type=arrow_type) for values, arrow_type in zip(columns, SCHEMA.types)],
+                schema=SCHEMA,
+            )
+
+
+def _writer(export_format, sink):
+    if export_format == 'parquet':
+        return pq.ParquetWriter(sink, SCHEMA, compression='zstd')
+    return pa.ipc.new_stream(sink, SCHEMA)
+
+
+def stream_export(batches, export_format):
+    """Serialize ``batches`` as an Arrow IPC stream or a Parquet file, yielding bytes as each batch is written."""
+    sink = io.BytesIO()
+    with _writer(export_format, sink) as writer:
+        for batch in batches:
+            # For Parquet every batch becomes a row group, so memory stays bounded while the file is written
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
@@ -0,0 +1,74 @@
+import io
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+from business_suppliers.models import Supplier, SupplierTransaction
+from core.throttles import buckets
+from finances.archive.archive_queries import aware_cutoff
+from finances.archive.archive_runner import archive_transactions
+from finances.exports.columnar_export import SCHEMA, export_querysets, record_batches
+from finances.models import Account, Category, Transaction
+from django.urls import reverse
+from rest_framework import status
+from datetime import timedelta
+from decimal import Decimal
+
+
+class ColumnarExportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', currency='EUR', owner=self.user)
+        self.supplier = Supplier.objects.create(name='Bakery', slug='bakery', owner=self.user)
+        old = self.create_transaction('8.10', aware_cutoff() - timedelta(days=10))
+        SupplierTransaction.objects.create(supplier=self.supplier, transaction=old, owner=self.user)
+        self.create_transaction('12.50', timezone.now())
+        archive_transactions()
+        self.create_transaction('0.29', timezone.now())
+
+    def create_transaction(self, amount, date):
+        return Transaction.objects.create(
+            kind_of_transaction='EXPENSE',
+            amount=Decimal(amount),
+            description='Entry',
+            date=date,
+            category=self.category,
+            account=self.account,
+            owner=self.user
+        )
+
+    def export(self, export_format):
+        response = self.client.get(reverse('transaction-export'), {'export_format': export_format})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content)
+
+    def test_parquet_export(self):
+        table = pq.read_table(io.BytesIO(self.export('parquet')))
+        self.assertEqual(table.schema, SCHEMA)
+        rows = sorted(table.to_pylist(), key=lambda row: row['amount'])
+        self.assertEqual([row['amount'] for row in rows], [Decimal('0.29'), Decimal('8.10'), Decimal('12.50')])
+        self.assertEqual([row['supplier'] for row in rows], [None, 'Bakery', None])
+        self.assertEqual([row['archived'] for row in rows], [False, True, False])
+        self.assertEqual({(row['category'], row['account'], row['currency']) for row in rows}, {('Food', 'Checking', 'EUR')})
+
+    def test_arrow_stream_export(self):
+        table = pa.ipc.open_stream(self.export('arrow')).read_all()
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column('kind').to_pylist(), ['EXPENSE'] * 3)
+
+    def test_batches_follow_cursor_chunks(self):
+        batches = list(record_batches(export_querysets(self.user), chunk_size=1))
+        # Two hot rows and one archived row, each chunk becoming its own batch
+        self.assertEqual([batch.num_rows for batch in batches], [1, 1, 1])
+
+    def test_rejects_unknown_format(self):
+        response = self.client.get(reverse('transaction-export'), {'export_format': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,151 @@
+"""Cash-flow projection over daily income and expense series.
+
+Each series is decomposed additively into recurring day-of-month flows,
+weekday and month-of-year seasonality and a moving-average level, all with
+vectorized NumPy operations over one array slot per day.
+"""
+from datetime import datetime, time, timedelta
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from finances.models import Transaction
+
+MOVING_AVERAGE_DAYS = 30
+RECURRING_MIN_MONTHS = 3
+RECURRING_MIN_SHARE = 0.75
+
+
+def load_daily_flows(transactions, start, end):
+    """Return ``(income, expenses)`` arrays with one slot per day from ``start`` to ``end``.
+
+    History is read with one query grouped by day and kind, so only a few
+    hundred tuples ever cross into Python, never model instances.
+    """
+    rows = transactions.filter(
+        date__gte=timezone.make_aware(datetime.combine(start, time.min)),
+        date__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+    ).annotate(day=TruncDate('date')).values_list('day', 'kind_of_transaction')\
+        .annotate(total=Sum('amount')).order_by()
+    rows = list(rows)
+
+    days = (end - start).days + 1
+    income = np.zeros(days)
+    expenses = np.zeros(days)
+    if rows:
+        offsets = np.fromiter(((day - start).days for day, _, _ in rows), dtype=np.int64, count=len(rows))
+        is_income = np.fromiter(
+            (kind == Transaction.KindOfTransaction.INCOME for _, kind, _ in rows), dtype=bool, count=len(rows)
+        )
+        totals = np.fromiter((total for _, _, total in rows), dtype=np.float64, count=len(rows))
+        np.add.at(income, offsets[is_income], totals[is_income])
+        np.add.at(expenses, offsets[~is_income], totals[~is_income])
+    return income, expenses
+
+
+def _calendar(dates):
+    months = dates.astype('datetime64[M]')
+    weekday = (dates.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    month_of_year = months.astype(np.int64) % 12
+    day_of_month = (dates - months).astype(np.int64)
+    return weekday, month_of_year, months.astype(np.int64), day_of_month
+
+
+def _group_effect(values, groups, size, min_count=1):
+    counts = np.bincount(groups, minlength=size)
+    sums = np.bincount(groups, weights=values, minlength=size)
+    effect = np.zeros(size)
+    seen = counts >= min_count
+    effect[seen] = sums[seen] / counts[seen] - values.mean()
+    return effect
+
+
+def detect_recurring(history, month_index, day_of_month):
+    """Return the typical amount per day of month for flows seen in most months."""
+    amounts = np.zeros(31)
+    observed_months = np.unique(month_index)
+    if observed_months.size < RECURRING_MIN_MONTHS:
+        return amounts
+    grid = np.full((observed_months.size, 31), np.nan)
+    grid[np.searchsorted(observed_months, month_index), day_of_month] = history
+    # Partial months at the edges of the history only count for the days they cover
+    available = np.sum(~np.isnan(grid), axis=0)
+    grid[grid == 0] = np.nan
+    hits = np.sum(~np.isnan(grid), axis=0)
+    recurring = hits >= np.maximum(RECURRING_MIN_MONTHS, RECURRING_MIN_SHARE * available)
+    if recurring.any():
+        amounts[recurring] = np.nanmedian(grid[:, recurring], axis=0)
+    return amounts
+
+
+def project_series(history, history_dates, future_dates):
+    """Project one daily series onto ``future_dates``; returns ``(forecast, recurring)``."""
+    weekday, month_of_year, month_index, day_of_month = _calendar(history_dates)
+    recurring = detect_recurring(history, month_index, day_of_month)
+
+    residual = history - recurring[day_of_month]
+    weekday_effect = _group_effect(residual, weekday, 7)
+    # A month needs most of its days observed before its seasonal offset is trusted
+    month_effect = _group_effect(residual, month_of_year, 12, min_count=28)
+    deseasonalized = residual - weekday_effect[weekday] - month_effect[month_of_year]
+    level = deseasonalized[-MOVING_AVERAGE_DAYS:].mean()
+
+    f_weekday, f_month_of_year, _, f_day_of_month = _calendar(future_dates)
+    forecast = level + weekday_effect[f_weekday] + month_effect[f_month_of_year] + recurring[f_day_of_month]
+    return np.clip(forecast, 0, None), recurring
+
+
+def add_months(day, months):
+    year, month = divmod(day.month - 1 + months, 12)
+    return day.replace(year=day.year + year, month=month + 1, day=1)
+
+
+def forecast_balance(transactions, starting_balance, months, history_days, today=None):
+    """Project month-end balances ``months`` ahead from ``history_days`` of history."""
+    today = today or timezone.localdate()
+    history_start = today - timedelta(days=history_days - 1)
+    income, expenses = load_daily_flows(transactions, history_start, today)
+
+    history_dates = np.arange(
+        np.datetime64(history_start), np.datetime64(today + timedelta(days=1)), dtype='datetime64[D]'
+    )
+    # Days before the first recorded flow would only dilute the averages and recurrence shares
+    active = np.flatnonzero(income + expenses)
+    if active.size:
+        first = max(0, min(active[0], len(history_dates) - MOVING_AVERAGE_DAYS))
+        income, expenses, history_dates = income[first:], expenses[first:], history_dates[first:]
+    horizon_end = add_months(today, months + 1) - timedelta(days=1)
+    future_dates = np.arange(
+        np.datetime64(today + timedelta(days=1)), np.datetime64(horizon_end + timedelta(days=1)),
+        dtype='datetime64[D]'
+    )
+    future_income, recurring_income = project_series(income, history_dates, future_dates)
+    future_expenses, recurring_expenses = project_series(expenses, history_dates, future_dates)
+
+    month_labels, month_slot = np.unique(future_dates.astype('datetime64[M]'), return_inverse=True)
+    income_by_month = np.bincount(month_slot, weights=future_income)
+    expenses_by_month = np.bincount(month_slot, weights=future_expenses)
+    balances = float(starting_balance) + np.cumsum(income_by_month - expenses_by_month)
+
+    projection = [
+        {
+            'month': str(month_labels[slot]),
+            'income': round(float(income_by_month[slot]), 2),
+            'expenses': round(float(expenses_by_month[slot]), 2),
+            'net': round(float(income_by_month[slot] - expenses_by_month[slot]), 2),
+            'balance': round(float(balances[slot]), 2),
+        }
+        for slot in range(len(balances))
+    ]
+    recurring = [
+        {'kind_of_transaction': kind, 'day_of_month': int(day) + 1, 'amount': round(float(amounts[day]), 2)}
+        for kind, amounts in (('INCOME', recurring_income), ('EXPENSE', recurring_expenses))
+        for day in np.flatnonzero(amounts)
+    ]
+    return {
+        'as_of': today.isoformat(),
+        'starting_balance': round(float(starting_balance), 2),
+        'months': months,
+        'projection': projection,
+        'recurring': recurring,
+    }
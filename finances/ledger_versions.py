@@ -0,0 +1,36 @@
+"""Per-owner version stamps for caches derived from an owner's ledger.
+
+Cached results include the owner's current version in their key; any write to
+the owner's transactions or accounts bumps the version, so stale entries are
+simply never read again and expire on their own.
+"""
+import time
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+
+def _key(owner_id):
+    return f"ledger-version:{owner_id}"
+
+
+def bump_ledger_version(owner_id):
+    version = time.time_ns()
+    cache.set(_key(owner_id), version, None)
+    return version
+
+
+def bump_ledger_version_on_commit(owner_id, using):
+    """Bump the owner's version once the write on ``using`` commits.
+
+    Bumping earlier would let a concurrent reader cache the not yet committed
+    state under the new version.
+    """
+    db_transaction.on_commit(lambda: bump_ledger_version(owner_id), using=using)
+
+
+def get_ledger_version(owner_id):
+    version = cache.get(_key(owner_id))
+    if version is None:
+        # An evicted stamp must not resurrect entries cached under an older one
+        version = bump_ledger_version(owner_id)
+    return version
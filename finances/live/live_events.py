@@ -0,0 +1,59 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Sum
+from finances.archive.archive_queries import archived_totals, merge_totals
+from finances.live.live_hub import hub
+from finances.models import Account, Transaction
+from finances.sharding.owner_shards import owner_shard
+
+# Changes that move the totals and balances pushed to clients
+SUMMARY_MODELS = {'finances.transaction', 'finances.account'}
+
+
+def publish_on_commit(events, using):
+    """Push ``events`` to their owners' live clients once the writing transaction commits.
+
+    All events of one commit reach a client as a single ``changes`` message.
+    """
+    if not settings.LIVE_REDIS_URL and not any(hub.has_subscribers(event.owner_id) for event in events):
+        return
+    def publish():
+        by_owner = defaultdict(list)
+        for event in events:
+            by_owner[event.owner_id].append({
+                'model': event.model, 'id': event.object_id, 'action': event.action, 'data': event.payload,
+            })
+        for owner_id, changes in by_owner.items():
+            hub.publish(owner_id, {'event': 'changes', 'changes': changes})
+    # A backplane outage must not turn a committed write into an error
+    db_transaction.on_commit(publish, using=using, robust=True)
+
+
+def ledger_snapshot(owner_id):
+    """All-time totals per account currency and account balances of ``owner_id``, as pushed after every change.
+
+    Amounts in different currencies are never added together; every
+    currency the owner's accounts use gets its own totals.
+    """
+    fields = ['account__currency', 'kind_of_transaction']
+    with owner_shard(owner_id):
+        rows = merge_totals(
+            fields,
+            Transaction.objects.filter(owner_id=owner_id).values(*fields).annotate(total=Sum('amount')).order_by(),
+            archived_totals(owner_id, fields),
+        )
+        accounts = list(Account.objects.filter(owner_id=owner_id).values('slug', 'balance', 'currency'))
+    by_currency = {account['currency']: {} for account in accounts}
+    for row in rows:
+        by_currency.setdefault(row['account__currency'], {})[row['kind_of_transaction']] = row['total']
+    totals = {}
+    for currency, by_kind in sorted(by_currency.items()):
+        income = by_kind.get('INCOME', 0)
+        expenses = by_kind.get('EXPENSE', 0)
+        totals[currency] = {'total_income': income, 'total_expenses': expenses, 'balance': income - expenses}
+    return {
+        'event': 'summary',
+        'totals': totals,
+        'accounts': accounts,
+    }
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'live:'
+# Replaces the backlog of a client that stopped reading; it refetches instead
+RESYNC = {'event': 'resync'}
+
+
+class LiveHub:
+    """Per-owner fan-out of change messages to the clients connected to this process.
+
+    Each client is an ``asyncio.Queue`` on its server's event loop;
+    ``deliver`` may be called from any thread. With ``LIVE_REDIS_URL`` set,
+    ``publish`` goes through Redis pub/sub, and every process delivers what
+    it receives to its own clients, so a write in one worker reaches clients
+    connected to another.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._backplane = None
+        self._listener = None
+
+    def subscribe(self, owner_id):
+        queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[owner_id].add((asyncio.get_running_loop(), queue))
+        if settings.LIVE_REDIS_URL:
+            self._listen()
+        return queue
+
+    def unsubscribe(self, owner_id, queue):
+        with self._lock:
+            subscribers = self._subscribers[owner_id]
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+            if not subscribers:
+                del self._subscribers[owner_id]
+
+    def has_subscribers(self, owner_id):
+        return owner_id in self._subscribers
+
+    def deliver(self, owner_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(owner_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_put, queue, message)
+            except RuntimeError:
+                # The client's loop already closed; its stream cleans up on its own
+                pass
+
+    def publish(self, owner_id, message):
+        if settings.LIVE_REDIS_URL:
+            self._redis().publish(f'{CHANNEL_PREFIX}{owner_id}', json.dumps(message, cls=DjangoJSONEncoder))
+        else:
+            self.deliver(owner_id, message)
+
+    def _redis(self):
+        with self._lock:
+            if self._backplane is None:
+                self._backplane = redis.Redis.from_url(settings.LIVE_REDIS_URL, decode_responses=True)
+            return self._backplane
+
+    def _listen(self):
+        with self._lock:
+            if self._listener and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._relay, name='live-hub-relay', daemon=True)
+            self._listener.start()
+
+    def _relay(self):
+        pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+        try:
+            for message in pubsub.listen():
+                owner_id = int(message['channel'][len(CHANNEL_PREFIX):])
+                if self.has_subscribers(owner_id):
+                    self.deliver(owner_id, json.loads(message['data']))
+        except Exception:
+            # The next subscriber restarts the relay
+            logger.exception("Live update relay stopped")
+
+
+def _put(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+
+
+hub = LiveHub()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from finances.live.live_events import SUMMARY_MODELS, ledger_snapshot
+from finances.live.live_hub import hub
+
+
+def _authenticate(request):
+    # The stream is a plain async view, so run the API's authenticators by hand
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    return Request(request, authenticators=authenticators).user
+
+
+def _frame(message):
+    return f"event: {message['event']}\ndata: {json.dumps(message, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def _stream(owner_id):
+    loop = asyncio.get_running_loop()
+    # Django 4.2 does not notice disconnected clients, so every stream ends and EventSource reconnects
+    deadline = loop.time() + settings.LIVE_STREAM_SECONDS
+    queue = hub.subscribe(owner_id)
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MILLISECONDS}\n\n"
+        yield _frame(await sync_to_async(ledger_snapshot)(owner_id))
+        while loop.time() < deadline:
+            try:
+                message = await asyncio.wait_for(
+                    queue.get(), min(settings.LIVE_KEEPALIVE_SECONDS, max(deadline - loop.time(), 0))
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            # Coalesce a burst, e.g. a bulk import, into one summary
+            messages = [message]
+            while not queue.empty():
+                messages.append(queue.get_nowait())
+            for message in messages:
+                yield _frame(message)
+            if any(
+                message['event'] == 'resync' or any(change['model'] in SUMMARY_MODELS for change in message['changes'])
+                for message in messages
+            ):
+                yield _frame(await sync_to_async(ledger_snapshot)(owner_id))
+    finally:
+        hub.unsubscribe(owner_id, queue)
+
+
+async def live_events(request):
+    """Server-Sent Events stream of the user's changes, each followed by fresh totals and balances.
+
+    The first event is a ``summary``; then every committed write arrives as
+    a ``changes`` event. A ``resync`` event means updates were dropped for a
+    slow reader and the client should refetch what it shows. Streams close
+    after ``LIVE_STREAM_SECONDS`` and the browser reconnects by itself.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "Live updates are only served by the ASGI application"}, status=501)
+    user = await sync_to_async(_authenticate)(request)
+    if not user.is_authenticated:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    return StreamingHttpResponse(
+        _stream(user.pk),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
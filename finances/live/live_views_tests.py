@@ -0,0 +1,98 @@
+import asyncio
+import json
+import threading
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from finances.live.live_hub import RESYNC, LiveHub
+from finances.models import Account, Category, Transaction
+from django.urls import reverse
+from decimal import Decimal
+
+
+def parse(chunk):
+    event, data = chunk.decode().strip().split('\n')
+    return event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+
+@override_settings(LIVE_REDIS_URL=None, LIVE_QUEUE_SIZE=3)
+class LiveHubTest(TestCase):
+    def test_delivers_from_other_threads_and_resyncs_slow_readers(self):
+        hub = LiveHub()
+
+        async def scenario():
+            queue = hub.subscribe(1)
+            other = hub.subscribe(2)
+            publisher = threading.Thread(target=lambda: [hub.publish(1, {'event': 'changes', 'n': n}) for n in range(2)])
+            publisher.start()
+            publisher.join()
+            received = [await queue.get(), await queue.get()]
+
+            for n in range(5):
+                hub.publish(1, {'event': 'changes', 'n': n})
+            await asyncio.sleep(0)
+            overflowed = [queue.get_nowait() for _ in range(queue.qsize())]
+            hub.unsubscribe(1, queue)
+            return received, overflowed, other.qsize(), hub.has_subscribers(1)
+
+        received, overflowed, other_size, subscribed = asyncio.run(scenario())
+        self.assertEqual([message['n'] for message in received], [0, 1])
+        # The fourth message did not fit; the backlog was replaced by a resync marker and the rest queued behind it
+        self.assertEqual(overflowed, [RESYNC, {'event': 'changes', 'n': 4}])
+        self.assertEqual(other_size, 0)
+        self.assertFalse(subscribed)
+
+
+@override_settings(LIVE_REDIS_URL=None)
+class LiveEventsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(
+            name='Checking', slug='checking', balance=Decimal('100.00'), owner=self.user
+        )
+
+    def create_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                kind_of_transaction='EXPENSE',
+                amount=Decimal('12.50'),
+                description='Lunch',
+                category=self.category,
+                account=self.account,
+                owner=self.user
+            )
+
+    async def test_stream_pushes_changes_and_summary(self):
+        response = await self.async_client.get(
+            reverse('live-events'), headers={'Authorization': f'Token {self.token.key}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 1000\n\n')
+        event, summary = parse(await anext(stream))
+        self.assertEqual(event, 'summary')
+        self.assertEqual(summary['totals'], {'USD': {'total_income': 0, 'total_expenses': 0, 'balance': 0}})
+        self.assertEqual(summary['accounts'], [{'slug': 'checking', 'balance': '100.00', 'currency': 'USD'}])
+
+        transaction = await sync_to_async(self.create_transaction)()
+        event, changes = parse(await anext(stream))
+        self.assertEqual(event, 'changes')
+        self.assertEqual(changes['changes'][0]['model'], 'finances.transaction')
+        self.assertEqual(changes['changes'][0]['id'], transaction.pk)
+        self.assertEqual(changes['changes'][0]['action'], 'CREATED')
+        event, summary = parse(await anext(stream))
+        self.assertEqual(Decimal(summary['totals']['USD']['total_expenses']), Decimal('12.50'))
+        self.assertEqual(Decimal(summary['totals']['USD']['balance']), Decimal('-12.50'))
+        await stream.aclose()
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse('live-events'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_refuses_to_stream_under_wsgi(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('live-events')).status_code, 501)
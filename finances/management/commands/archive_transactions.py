@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from finances.archive.archive_queries import archive_cutoff, aware_cutoff
+from finances.archive.archive_runner import BATCH_SIZE, archive_transactions
+from finances.sharding.owner_shards import each_shard
+
+
+class Command(BaseCommand):
+    help = "Move transactions older than ARCHIVE_HORIZON_DAYS into the archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        moved = sum(
+            archive_transactions(cutoff=aware_cutoff(), batch_size=options['batch_size']) for _ in each_shard()
+        )
+        self.stdout.write(f"Archived {moved} transactions dated before {archive_cutoff().isoformat()}")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Exists, OuterRef
+from finances.models import Transaction
+from finances.sharding.owner_shards import each_shard
+
+
+class Command(BaseCommand):
+    help = "Delete transactions that repeat an older transaction's fingerprint, keeping the oldest of each group"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        groups = duplicates = deleted = 0
+        for _ in each_shard():
+            # One grouped pass over the (owner, fingerprint) index finds every duplicate group
+            counts = Transaction.objects.values('owner_id', 'fingerprint')\
+                .annotate(rows=Count('id')).filter(rows__gt=1).order_by()
+            for row in counts:
+                groups += 1
+                duplicates += row['rows'] - 1
+            if options['dry_run'] or not counts:
+                continue
+            # Every row with an older twin goes; deleting through the ORM keeps budgets in step
+            newer = Transaction.objects.filter(Exists(
+                Transaction.objects.filter(
+                    owner_id=OuterRef('owner_id'), fingerprint=OuterRef('fingerprint'), id__lt=OuterRef('id')
+                )
+            ))
+            deleted += newer.delete()[1].get(Transaction._meta.label, 0)
+        self.stdout.write(
+            f"{groups} duplicate groups, {duplicates} extra rows"
+            + ("" if options['dry_run'] else f", {deleted} deleted")
+        )
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from finances.anomalies.anomaly_detection import BATCH_SIZE, run_anomaly_detection
+
+
+class Command(BaseCommand):
+    help = "Flag unusually large recent expenses of every owner, using a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.ANOMALY_WORKERS)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        flagged = run_anomaly_detection(options['workers'], options['batch_size'])
+        self.stdout.write(f"{flagged} anomalies flagged")
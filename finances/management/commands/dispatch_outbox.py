@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from finances.outbox.outbox_dispatcher import BATCH_SIZE, dispatch_outbox
+from finances.sharding.owner_shards import each_shard
+
+
+class Command(BaseCommand):
+    help = "Hand pending outbox events to their consumers, once or continuously"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        while True:
+            delivered = sum(dispatch_outbox(options['batch_size']) for _ in each_shard())
+            self.stdout.write(f"{delivered} events delivered")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
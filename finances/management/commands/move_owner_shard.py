@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from finances.sharding.shard_moves import move_owner
+
+
+class Command(BaseCommand):
+    help = "Move all rows of one owner to another shard (run while the owner is idle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('alias')
+
+    def handle(self, *args, **options):
+        if options['alias'] not in settings.SHARD_ALIASES:
+            raise CommandError(f"{options['alias']} is not one of SHARD_ALIASES {settings.SHARD_ALIASES}")
+        try:
+            owner = User.objects.using('default').get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']}")
+        try:
+            moved = move_owner(owner.pk, options['alias'])
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(f"Moved {sum(moved.values())} rows of {owner.username} to {options['alias']}")
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from finances.sharding.shard_moves import move_owner, plan_rebalance, shard_loads
+
+
+class Command(BaseCommand):
+    help = "Move owners from overloaded shards until every shard is near the mean transaction count"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tolerance', type=float, default=0.1)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if len(settings.SHARD_ALIASES) < 2:
+            raise CommandError("Rebalancing needs at least two SHARD_ALIASES")
+        if 'default' in settings.SHARD_ALIASES:
+            raise CommandError("Owners on the default database cannot be moved; drop it from SHARD_ALIASES")
+        moves = plan_rebalance(shard_loads(settings.SHARD_ALIASES), options['tolerance'])
+        for owner_id, source, target in moves:
+            if not options['dry_run']:
+                move_owner(owner_id, target)
+            self.stdout.write(f"Owner {owner_id}: {source} -> {target}")
+        self.stdout.write(f"{len(moves)} owners {'to move' if options['dry_run'] else 'moved'}")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from finances.reconciliation.reconciliation_runner import CHUNK_SIZE, run_reconciliation
+from finances.sharding.owner_shards import each_shard
+
+
+class Command(BaseCommand):
+    help = "Compare every account balance with the balance derived from its transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        for alias in each_shard():
+            report = run_reconciliation(chunk_size=options['chunk_size'])
+            prefix = f"[{alias}] " if alias else ""
+            self.stdout.write(
+                f"{prefix}Report {report.pk}: {report.accounts_checked} accounts checked, {report.mismatches} mismatches"
+            )
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+
+
+def populate_paths(apps, schema_editor):
+    # Every existing category is a root, so its path is just its own key
+    Category = apps.get_model("finances", "Category")
+    Category.objects.update(path=Concat(Cast("pk", CharField()), Value("/")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0007_recurringtransaction"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="children",
+                to="finances.category",
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(fields=["owner", "path"], name="category_path_idx"),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
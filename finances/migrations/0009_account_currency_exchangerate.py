@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:43
+
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0008_category_parent_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="currency",
+            field=models.CharField(default="USD", max_length=3),
+        ),
+        migrations.CreateModel(
+            name="ExchangeRate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("currency", models.CharField(max_length=3)),
+                ("date", models.DateField()),
+                (
+                    "rate",
+                    models.DecimalField(
+                        decimal_places=10,
+                        max_digits=20,
+                        validators=[
+                            django.core.validators.MinValueValidator(Decimal("1E-10"))
+                        ],
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date", "currency"],
+                "unique_together": {("currency", "date")},
+            },
+        ),
+    ]
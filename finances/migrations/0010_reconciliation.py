@@ -0,0 +1,90 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("finances", "0009_account_currency_exchangerate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReconciliationReport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("accounts_checked", models.PositiveIntegerField(default=0)),
+                ("mismatches", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="AccountReconciliation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "recorded_balance",
+                    models.DecimalField(decimal_places=2, max_digits=15),
+                ),
+                (
+                    "derived_balance",
+                    models.DecimalField(decimal_places=2, max_digits=15),
+                ),
+                ("difference", models.DecimalField(decimal_places=2, max_digits=15)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reconciliations",
+                        to="finances.account",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="my_account_reconciliations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "report",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entries",
+                        to="finances.reconciliationreport",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-report_id", "account_id"],
+                "unique_together": {("report", "account")},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0011_reportjob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["date"], name="transaction_date_idx"),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:05
+
+from django.db import migrations, models
+from finances.models import transaction_fingerprint
+
+
+def populate_fingerprints(apps, schema_editor):
+    Transaction = apps.get_model("finances", "Transaction")
+    fields = ["id", "owner_id", "account_id", "date", "amount", "description"]
+    batch = []
+    for row in Transaction.objects.only(*fields).iterator(chunk_size=2000):
+        row.fingerprint = transaction_fingerprint(row.owner_id, row.account_id, row.date, row.amount, row.description)
+        batch.append(row)
+        if len(batch) >= 2000:
+            Transaction.objects.bulk_update(batch, ["fingerprint"])
+            batch = []
+    Transaction.objects.bulk_update(batch, ["fingerprint"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0014_ownershard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="fingerprint",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(populate_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["owner", "fingerprint"], name="transaction_fingerprint_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("finances", "0017_sync_indexes_tombstone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=50)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="my_tags",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="TransactionTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="links",
+                        to="finances.tag",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="tag_links",
+                        to="finances.transaction",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="tags",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="transactions",
+                through="finances.TransactionTag",
+                to="finances.tag",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transactiontag",
+            index=models.Index(
+                fields=["tag", "transaction"], name="transactiontag_tag_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="transactiontag",
+            unique_together={("transaction", "tag")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="tag",
+            unique_together={("owner", "name")},
+        ),
+    ]
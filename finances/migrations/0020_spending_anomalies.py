@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("finances", "0019_transaction_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpendingAnomaly",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[("CATEGORY", "Category"), ("SUPPLIER", "Supplier")],
+                        max_length=10,
+                    ),
+                ),
+                ("group_id", models.BigIntegerField()),
+                ("group_name", models.CharField(max_length=100)),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=15)),
+                ("baseline", models.DecimalField(decimal_places=2, max_digits=15)),
+                ("spread", models.DecimalField(decimal_places=2, max_digits=15)),
+                ("score", models.FloatField()),
+                ("date", models.DateTimeField()),
+                ("detected_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="my_spending_anomalies",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomalies",
+                        to="finances.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["owner", "date"], name="anomaly_owner_date_idx"
+                    )
+                ],
+                "unique_together": {("transaction", "dimension")},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0020_spending_anomalies"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="ai_confidence_score",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="ai_processed",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="original_text",
+            field=models.TextField(
+                blank=True, help_text="Original text extracted from receipt/image"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0022_receipts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="receipt",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
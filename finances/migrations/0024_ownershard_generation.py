@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0023_receipt_started_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ownershard",
+            name="generation",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,23 +1,107 @@
-from django.db import models
+import calendar
+import hashlib
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction as db_transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 from django.utils import timezone
 from core.base_model import BaseModel
 
-class Category(BaseModel):
+
+def local_date(value):
+    """Return the calendar date of a date/datetime in the current timezone."""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def normalize_description(text):
+    """Casefold and keep only words, so "ACME  Corp." and "acme corp" compare equal."""
+    return ' '.join(re.findall(r'\w+', text.casefold()))
+
+
+def transaction_fingerprint(owner_id, account_id, day, amount, description):
+    """Stable digest of the fields that identify the same real-world transaction."""
+    key = '|'.join([
+        str(owner_id),
+        str(account_id),
+        local_date(day).isoformat(),
+        str(Decimal(amount).quantize(Decimal('0.01'))),
+        normalize_description(description),
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class OutboxMixin:
+    """Save inside a transaction, so the ``OutboxEvent`` written by post_save commits with the row.
+
+    Deletes need no help: the deletion collector already runs post_delete
+    inside its own transaction.
+    """
+    # Fields left out of event payloads, e.g. ones rewritten after post_save
+    outbox_exclude = ()
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with db_transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+class Category(OutboxMixin, BaseModel):
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255)
     description = models.TextField(blank=True)
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='children'
+    )
+    # Materialized path of primary keys from the root, e.g. "3/8/21/"; a subtree is a prefix match
+    path = models.CharField(max_length=255, blank=True, editable=False)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_categories')
+    # The path of a new category is only known after its insert, when post_save has already run
+    outbox_exclude = ('path',)
+
     class Meta:
         verbose_name_plural = "Categories"
         ordering = ['name']
         unique_together = ['owner', 'slug']
+        indexes = [
+            models.Index(fields=['owner', 'path'], name='category_path_idx'),
+            models.Index(fields=['owner', 'updated_at'], name='category_sync_idx'),
+        ]
 
     def __str__(self):
         return f"{self.pk} - {self.name}"
 
-class Account(BaseModel):
+    def save(self, *args, **kwargs):
+        old_path = self.path
+        super().save(*args, **kwargs)
+        categories = Category.objects.using(self._state.db)
+        parent_path = categories.values_list('path', flat=True).get(pk=self.parent_id) if self.parent_id else ''
+        new_path = f"{parent_path}{self.pk}/"
+        if new_path == old_path:
+            return
+        if old_path:
+            # Re-root the whole subtree, including this node, with a single UPDATE
+            categories.filter(owner_id=self.owner_id, path__startswith=old_path).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                # Moved descendants must show up in the next delta sync too
+                updated_at=timezone.now()
+            )
+        else:
+            categories.filter(pk=self.pk).update(path=new_path)
+        self.path = new_path
+
+class Account(OutboxMixin, BaseModel):
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255)
     balance = models.DecimalField(
@@ -26,17 +110,38 @@ class Account(BaseModel):
         default=0.00,
         validators=[MinValueValidator(0.00)]
     )
+    currency = models.CharField(max_length=3, default='USD')
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_accounts')
     class Meta:
         ordering = ['name']
         unique_together = ['owner', 'slug']
+        indexes = [
+            models.Index(fields=['owner', 'updated_at'], name='account_sync_idx'),
+        ]
 
     def __str__(self):
         return f"{self.pk} - {self.name} - {self.balance}"
 
-class Transaction(BaseModel):
+class ExchangeRate(models.Model):
+    """Daily value of one unit of ``currency`` in ``settings.FX_PIVOT_CURRENCY``."""
+    currency = models.CharField(max_length=3)
+    date = models.DateField()
+    rate = models.DecimalField(
+        max_digits=20,
+        decimal_places=10,
+        validators=[MinValueValidator(Decimal('0.0000000001'))]
+    )
+
+    class Meta:
+        ordering = ['-date', 'currency']
+        unique_together = ['currency', 'date']
+
+    def __str__(self):
+        return f"{self.currency} - {self.date} - {self.rate}"
+
+class Transaction(OutboxMixin, BaseModel):
     class KindOfTransaction(models.TextChoices):
       INCOME = "INCOME", "Income"
       EXPENSE = "EXPENSE", "Expense"
@@ -55,16 +160,454 @@ class Transaction(BaseModel):
     description = models.TextField()
     category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='transactions')
     account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name='transactions')
+    recurring_transaction = models.ForeignKey(
+        'RecurringTransaction',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='transactions'
+    )
+    occurrence_date = models.DateField(null=True, blank=True)
+    # Duplicate detection key, see transaction_fingerprint()
+    fingerprint = models.CharField(max_length=64, blank=True, editable=False)
+    tags = models.ManyToManyField('Tag', through='TransactionTag', related_name='transactions', blank=True)
     
-    # # Fields for AI processing
-    # receipt_image = models.ImageField(upload_to='receipts/%Y/%m/', null=True, blank=True)
-    # ai_processed = models.BooleanField(default=False)
-    # ai_confidence_score = models.FloatField(null=True, blank=True)
-    # original_text = models.TextField(blank=True, help_text="Original text extracted from receipt/image")
+    # Fields for AI processing; receipt metadata lives in Receipt
+    receipt_image = models.ImageField(upload_to='receipts/%Y/%m/', null=True, blank=True)
+    # Set once the category was predicted (ai_confidence_score is then set too) or the receipt was read
+    ai_processed = models.BooleanField(default=False)
+    ai_confidence_score = models.FloatField(null=True, blank=True)
+    original_text = models.TextField(blank=True, help_text="Original text extracted from receipt/image")
+
+
+    class Meta:
+        ordering = ['-date']
+        # One materialized row per template occurrence keeps the recurring job idempotent
+        unique_together = ['recurring_transaction', 'occurrence_date']
+        indexes = [
+            models.Index(fields=['date'], name='transaction_date_idx'),
+            models.Index(fields=['owner', 'fingerprint'], name='transaction_fingerprint_idx'),
+            models.Index(fields=['owner', 'updated_at'], name='transaction_sync_idx'),
+            # List filters: date ranges alone or within categories/accounts, and amount ranges
+            models.Index(fields=['owner', 'date'], name='transaction_owner_date_idx'),
+            models.Index(fields=['owner', 'category', 'date'], name='transaction_category_idx'),
+            models.Index(fields=['owner', 'account', 'date'], name='transaction_account_idx'),
+            models.Index(fields=['owner', 'amount'], name='transaction_amount_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.pk} - {self.date.strftime('%Y-%m-%d')} - {self.description[:30]}"
+
+    FINGERPRINT_FIELDS = {'owner', 'owner_id', 'account', 'account_id', 'date', 'amount', 'description'}
+
+    def compute_fingerprint(self):
+        return transaction_fingerprint(self.owner_id, self.account_id, self.date, self.amount, self.description)
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = self.compute_fingerprint()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.FINGERPRINT_FIELDS.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'fingerprint'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the persisted values so write hooks can compute deltas without re-reading the row
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+class Tag(BaseModel):
+    """An entry of the owner's tag dictionary; transactions refer to it by id."""
+    name = models.CharField(max_length=50)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_tags')
+
+    class Meta:
+        ordering = ['name']
+        unique_together = ['owner', 'name']
+
+    def __str__(self):
+        return f"{self.pk} - {self.name}"
+
+class TransactionTag(models.Model):
+    """Links a transaction to a tag.
+
+    Archived transactions keep their id, so the link is a key rather than a
+    constraint and survives archiving; links of deleted transactions are
+    removed by the post_delete hook instead.
+    """
+    transaction = models.ForeignKey(
+        Transaction, on_delete=models.DO_NOTHING, db_constraint=False, related_name='tag_links'
+    )
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='links')
+
+    class Meta:
+        unique_together = ['transaction', 'tag']
+        indexes = [
+            # Tag filters and by_tag start from the tag side
+            models.Index(fields=['tag', 'transaction'], name='transactiontag_tag_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id} - {self.tag_id}"
+
+class RecurringTransaction(BaseModel):
+    class Frequency(models.TextChoices):
+      DAILY = "DAILY", "Daily"
+      WEEKLY = "WEEKLY", "Weekly"
+      MONTHLY = "MONTHLY", "Monthly"
+      YEARLY = "YEARLY", "Yearly"
+
+    kind_of_transaction = models.CharField(
+        max_length=10,
+        choices=Transaction.KindOfTransaction.choices,
+        default=Transaction.KindOfTransaction.EXPENSE
+    )
+    amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        validators=[MinValueValidator(0.01)]
+    )
+    description = models.TextField()
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='recurring_transactions')
+    account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name='recurring_transactions')
+    frequency = models.CharField(
+        max_length=10,
+        choices=Frequency.choices,
+        default=Frequency.MONTHLY
+    )
+    interval = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    # Low-water mark: the first occurrence that has not been materialized yet
+    next_occurrence = models.DateField()
+    is_active = models.BooleanField(default=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_recurring_transactions')
+
+    class Meta:
+        ordering = ['next_occurrence']
+        indexes = [
+            models.Index(fields=['is_active', 'next_occurrence'], name='recurring_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.pk} - {self.frequency} - {self.description[:30]}"
+
+    def following_occurrence(self, day):
+        """Return the occurrence after ``day``, keeping month-end anchors from ``start_date``."""
+        if self.frequency == self.Frequency.DAILY:
+            return day + timedelta(days=self.interval)
+        if self.frequency == self.Frequency.WEEKLY:
+            return day + timedelta(weeks=self.interval)
+        months = self.interval * (12 if self.frequency == self.Frequency.YEARLY else 1)
+        year, month = divmod(day.month - 1 + months, 12)
+        year, month = day.year + year, month + 1
+        return date(year, month, min(self.start_date.day, calendar.monthrange(year, month)[1]))
+
+class Budget(BaseModel):
+    class Period(models.TextChoices):
+      WEEKLY = "WEEKLY", "Weekly"
+      MONTHLY = "MONTHLY", "Monthly"
+      YEARLY = "YEARLY", "Yearly"
+
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='budgets')
+    period = models.CharField(
+        max_length=10,
+        choices=Period.choices,
+        default=Period.MONTHLY
+    )
+    limit = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        validators=[MinValueValidator(0.01)]
+    )
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_budgets')
+
+    class Meta:
+        ordering = ['category__name', 'period']
+        unique_together = ['owner', 'category', 'period']
+
+    def __str__(self):
+        return f"{self.pk} - {self.category.name} - {self.period} - {self.limit}"
 
+    @classmethod
+    def period_bounds(cls, period, day):
+        """Return the first and last day of the ``period`` that contains ``day``."""
+        if period == cls.Period.WEEKLY:
+            start = day - timedelta(days=day.weekday())
+            return start, start + timedelta(days=6)
+        if period == cls.Period.YEARLY:
+            return date(day.year, 1, 1), date(day.year, 12, 31)
+        last_day = calendar.monthrange(day.year, day.month)[1]
+        return day.replace(day=1), day.replace(day=last_day)
+
+class BudgetPeriod(models.Model):
+    """Running expense total of a budget's category for one period.
+
+    Rows are kept up to date on every ``Transaction`` write, so reading a
+    budget's utilization never re-sums the transactions of the period.
+    """
+    budget = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name='periods')
+    period_start = models.DateField()
+    spent = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['-period_start']
+        unique_together = ['budget', 'period_start']
+
+    def __str__(self):
+        return f"{self.budget_id} - {self.period_start} - {self.spent}"
+
+class ReconciliationReport(models.Model):
+    """One run of the account reconciliation job across all owners."""
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    accounts_checked = models.PositiveIntegerField(default=0)
+    mismatches = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.pk} - {self.started_at.strftime('%Y-%m-%d %H:%M')} - {self.mismatches} mismatches"
+
+class AccountReconciliation(BaseModel):
+    """An account whose stored balance disagrees with its transaction history."""
+    report = models.ForeignKey(ReconciliationReport, on_delete=models.CASCADE, related_name='entries')
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='reconciliations')
+    recorded_balance = models.DecimalField(max_digits=15, decimal_places=2)
+    derived_balance = models.DecimalField(max_digits=15, decimal_places=2)
+    difference = models.DecimalField(max_digits=15, decimal_places=2)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_account_reconciliations')
+
+    class Meta:
+        ordering = ['-report_id', 'account_id']
+        unique_together = ['report', 'account']
+
+    def __str__(self):
+        return f"{self.report_id} - {self.account_id} - {self.difference}"
+
+class ReportJob(BaseModel):
+    """A report computed by a Celery worker, with its result stored compressed."""
+    class Kind(models.TextChoices):
+      SUMMARY = "SUMMARY", "Summary"
+      BY_CATEGORY = "BY_CATEGORY", "By category"
+      BY_ACCOUNT = "BY_ACCOUNT", "By account"
+
+    class Status(models.TextChoices):
+      PENDING = "PENDING", "Pending"
+      RUNNING = "RUNNING", "Running"
+      SUCCESS = "SUCCESS", "Success"
+      FAILURE = "FAILURE", "Failure"
+
+    IN_FLIGHT = [Status.PENDING, Status.RUNNING]
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    params = models.JSONField(default=dict)
+    # Hash of kind and params; identical in-flight requests share one job
+    params_hash = models.CharField(max_length=64)
+    ledger_version = models.BigIntegerField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    result = models.BinaryField(null=True, blank=True, editable=False)
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_report_jobs')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', 'params_hash', 'status'], name='report_job_lookup_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner', 'params_hash'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']),
+                name='unique_in_flight_report_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.pk} - {self.kind} - {self.status}"
+
+class ArchivedTransaction(BaseModel):
+    """A transaction moved out of the hot table once it passed the archive horizon.
+
+    Rows keep their original primary key so they can be merged with hot rows.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    kind_of_transaction = models.CharField(max_length=10, choices=Transaction.KindOfTransaction.choices)
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    date = models.DateTimeField()
+    description = models.TextField()
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='archived_transactions')
+    account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name='archived_transactions')
+    # Supplier links live in business_suppliers; only the key is kept here
+    supplier_id = models.BigIntegerField(null=True, blank=True)
+    receipt_image = models.ImageField(upload_to='receipts/%Y/%m/', null=True, blank=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_archived_transactions')
+    # Timestamps are copied from the hot row rather than set on archival
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
 
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['owner', 'date'], name='archived_owner_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.pk} - {self.date.strftime('%Y-%m-%d')} - {self.description[:30]}"
+
+class TransactionRollup(models.Model):
+    """Monthly totals of archived transactions, so all-time reports skip the archive table."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_transaction_rollups')
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='rollups')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='rollups')
+    kind_of_transaction = models.CharField(max_length=10, choices=Transaction.KindOfTransaction.choices)
+    month = models.DateField()
+    total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-month']
+        unique_together = ['owner', 'account', 'category', 'kind_of_transaction', 'month']
+
+    def __str__(self):
+        return f"{self.month} - {self.account_id} - {self.category_id} - {self.kind_of_transaction} - {self.total}"
+
+
+class OwnerShard(models.Model):
+    """Directory entry naming the shard that holds an owner's rows; always stored on ``default``."""
+    owner = models.OneToOneField(User, on_delete=models.CASCADE, related_name='shard')
+    alias = models.CharField(max_length=64)
+    # Counts the owner's moves; sync tokens issued before a move no longer match it
+    generation = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['owner']
+
+    def __str__(self):
+        return f"{self.owner_id} - {self.alias}"
+
+
+class OutboxEvent(models.Model):
+    """A committed change to an owner's data, waiting for the outbox dispatcher.
+
+    Rows are written in the same database transaction as the change and
+    deleted once every consumer has handled them, so the table only holds
+    the backlog.
+    """
+    class Action(models.TextChoices):
+      CREATED = "CREATED", "Created"
+      UPDATED = "UPDATED", "Updated"
+      DELETED = "DELETED", "Deleted"
+
+    # A plain id rather than a foreign key: deleting a user emits events for rows deleted with them
+    owner_id = models.BigIntegerField()
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=Action.choices)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.pk} - {self.model} {self.object_id} {self.action}"
+
+
+class Tombstone(models.Model):
+    """Marks a deleted transaction, account, category or supplier for clients syncing deltas.
+
+    Tombstones are pruned after ``SYNC_TOMBSTONE_DAYS``; older sync tokens
+    can no longer be honoured and the client has to resync from scratch.
+    """
+    # A plain id, like OutboxEvent.owner_id, so deleting a user can record its cascaded rows
+    owner_id = models.BigIntegerField()
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['owner_id', 'deleted_at'], name='tombstone_sync_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} - {self.deleted_at}"
+
+
+class SpendingAnomaly(models.Model):
+    """A recent expense far above what its category or supplier usually costs.
+
+    Rows are rebuilt for each owner by the nightly anomaly job, see
+    ``finances.anomalies.anomaly_detection``.
+    """
+    class Dimension(models.TextChoices):
+      CATEGORY = "CATEGORY", "Category"
+      SUPPLIER = "SUPPLIER", "Supplier"
+
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='anomalies')
+    dimension = models.CharField(max_length=10, choices=Dimension.choices)
+    group_id = models.BigIntegerField()
+    group_name = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    # Median of the group (or of its month of the year) and the robust standard deviation around it
+    baseline = models.DecimalField(max_digits=15, decimal_places=2)
+    spread = models.DecimalField(max_digits=15, decimal_places=2)
+    score = models.FloatField()
+    date = models.DateTimeField()
+    detected_at = models.DateTimeField(auto_now_add=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_spending_anomalies')
+
+    class Meta:
+        ordering = ['-date', 'id']
+        unique_together = ['transaction', 'dimension']
+        indexes = [
+            models.Index(fields=['owner', 'date'], name='anomaly_owner_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id} - {self.dimension} {self.group_name} - {self.score:.1f}"
+
+
+class Receipt(models.Model):
+    """Processing state and metadata of a transaction's ``receipt_image``.
+
+    Uploads only store the file and a pending row; the thumbnail, size, EXIF
+    and extracted text are filled in by the ``process_receipt`` task. Like
+    ``TransactionTag``, the transaction is a key rather than a constraint so
+    the receipt follows its transaction into the archive.
+    """
+    class Status(models.TextChoices):
+      PENDING = "PENDING", "Pending"
+      PROCESSING = "PROCESSING", "Processing"
+      DONE = "DONE", "Done"
+      FAILED = "FAILED", "Failed"
+
+    transaction = models.OneToOneField(
+        Transaction, on_delete=models.DO_NOTHING, db_constraint=False, related_name='receipt'
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    thumbnail = models.ImageField(upload_to='receipts/thumbnails/%Y/%m/', null=True, blank=True)
+    image_format = models.CharField(max_length=10, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    size_bytes = models.PositiveBigIntegerField(null=True, blank=True)
+    exif = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    uploaded_at = models.DateTimeField(default=timezone.now)
+    # When a worker claimed it; a claim older than RECEIPT_PROCESSING_TIMEOUT is abandoned
+    started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='my_receipts')
+
+    class Meta:
+        ordering = ['-uploaded_at']
 
     def __str__(self):
-        return f"{self.pk} - {self.date.strftime('%Y-%m-%d')} - {self.description[:30]}"
\ No newline at end of file
+        return f"{self.transaction_id} - {self.status}"
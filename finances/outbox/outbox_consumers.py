@@ -0,0 +1,36 @@
+import json
+import logging
+from urllib.request import Request, urlopen
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from finances.ledger_versions import bump_ledger_version
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_owner_caches(event):
+    """Expire the owner's cached reports and forecasts, which embed category, account and supplier names."""
+    bump_ledger_version(event.owner_id)
+
+
+def deliver_webhooks(event):
+    """POST the event to every ``OUTBOX_WEBHOOK_URLS`` endpoint; a failure leaves it for the next run."""
+    if not settings.OUTBOX_WEBHOOK_URLS:
+        return
+    body = json.dumps({
+        'id': event.pk,
+        'owner': event.owner_id,
+        'model': event.model,
+        'object_id': event.object_id,
+        'action': event.action,
+        'payload': event.payload,
+        'created_at': event.created_at,
+    }, cls=DjangoJSONEncoder).encode()
+    for url in settings.OUTBOX_WEBHOOK_URLS:
+        request = Request(url, data=body, headers={
+            'Content-Type': 'application/json',
+            # Receivers dedupe on this, since delivery is at least once
+            'Idempotency-Key': f'outbox-{event.pk}',
+        })
+        with urlopen(request, timeout=settings.OUTBOX_WEBHOOK_TIMEOUT):
+            pass
@@ -0,0 +1,116 @@
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router, transaction as db_transaction
+from django.utils.module_loading import import_string
+from finances.models import OutboxEvent
+
+BATCH_SIZE = 500
+# Key of the PostgreSQL advisory lock held by the running dispatcher ("outbox")
+ADVISORY_LOCK_ID = 0x6F7574626F78
+
+
+def get_consumers():
+    return [import_string(path) for path in settings.OUTBOX_CONSUMERS]
+
+
+@contextmanager
+def dispatcher_lock(using):
+    """Claim the dispatching of ``using``'s outbox.
+
+    Yields ``None`` when another dispatcher holds the claim, otherwise a
+    callable telling whether it is still held. On PostgreSQL the claim is a
+    session advisory lock, which the database drops if the worker dies.
+    Elsewhere it is a cache lease of ``OUTBOX_LOCK_TIMEOUT`` seconds that
+    each check renews, and that is only released by its holder.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [ADVISORY_LOCK_ID])
+            acquired = cursor.fetchone()[0]
+        if not acquired:
+            yield None
+            return
+        try:
+            yield lambda: True
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [ADVISORY_LOCK_ID])
+        return
+
+    key = f'outbox:dispatching:{using}'
+    token = uuid.uuid4().hex
+    if not cache.add(key, token, settings.OUTBOX_LOCK_TIMEOUT):
+        yield None
+        return
+
+    def held():
+        if cache.get(key) != token:
+            return False
+        cache.touch(key, settings.OUTBOX_LOCK_TIMEOUT)
+        return True
+
+    try:
+        yield held
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def dispatch_outbox(batch_size=BATCH_SIZE, consumers=None):
+    """Hand pending outbox events to every consumer, oldest first, and return how many were delivered.
+
+    Delivery is at least once: an event is deleted only after all consumers
+    accepted it, so a crash replays it. Once an owner's event fails, that
+    owner's later events wait for the next run, which keeps every owner's
+    events in order. Events failing ``OUTBOX_MAX_ATTEMPTS`` times are parked
+    and no longer hold their owner back. Only one dispatcher runs per
+    database at a time; one that lost its claim stops after saving its
+    progress.
+    """
+    consumers = get_consumers() if consumers is None else consumers
+    using = router.db_for_write(OutboxEvent)
+    with dispatcher_lock(using) as held:
+        if held is None:
+            return 0
+        return _dispatch(using, consumers, batch_size, held)
+
+
+def _dispatch(using, consumers, batch_size, held):
+    delivered = 0
+    blocked = set()
+    while True:
+        events = list(
+            OutboxEvent.objects.filter(attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+            .exclude(owner_id__in=blocked).order_by('id')[:batch_size]
+        )
+        if not events:
+            return delivered
+        done = []
+        failed = []
+        lost = False
+        for event in events:
+            if event.owner_id in blocked:
+                continue
+            # Another dispatcher may have taken over an expired claim; leave the rest to it
+            if not held():
+                lost = True
+                break
+            try:
+                for consumer in consumers:
+                    consumer(event)
+            except Exception as error:
+                blocked.add(event.owner_id)
+                event.attempts += 1
+                event.last_error = f'{type(error).__name__}: {error}'
+                failed.append(event)
+            else:
+                done.append(event.pk)
+        with db_transaction.atomic(using=using):
+            OutboxEvent.objects.filter(pk__in=done).delete()
+            OutboxEvent.objects.bulk_update(failed, ['attempts', 'last_error'])
+        delivered += len(done)
+        if lost:
+            return delivered
@@ -0,0 +1,125 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from business_suppliers.models import Supplier
+from finances.archive.archive_queries import aware_cutoff
+from finances.archive.archive_runner import archive_transactions
+from finances.ledger_versions import get_ledger_version
+from finances.models import Account, Category, OutboxEvent, Transaction
+from finances.outbox.outbox_consumers import invalidate_owner_caches
+from finances.outbox.outbox_dispatcher import dispatch_outbox
+from finances.transactions.transaction_ingest import ingest_transactions
+from datetime import timedelta
+from decimal import Decimal
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=2)
+class OutboxTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(
+            name='Checking', slug='checking', balance=Decimal('100.00'), owner=self.user
+        )
+
+    def row(self, amount, description='Lunch'):
+        return {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': Decimal(amount),
+            'description': description,
+            'date': aware_cutoff() + timedelta(days=1),
+            'category': self.category,
+            'account': self.account,
+        }
+
+    def events(self):
+        return list(OutboxEvent.objects.values_list('model', 'action'))
+
+    def test_changes_are_recorded_with_the_row(self):
+        transaction = Transaction.objects.create(owner=self.user, **self.row('10.00'))
+        transaction.amount = Decimal('12.00')
+        transaction.save()
+        transaction_id = transaction.pk
+        transaction.delete()
+        Supplier.objects.create(name='Bakery', owner=self.user)
+
+        self.assertEqual(self.events(), [
+            ('finances.category', 'CREATED'),
+            ('finances.account', 'CREATED'),
+            ('finances.transaction', 'CREATED'),
+            ('finances.transaction', 'UPDATED'),
+            ('finances.transaction', 'DELETED'),
+            ('business_suppliers.supplier', 'CREATED'),
+        ])
+        updated = OutboxEvent.objects.get(action='UPDATED')
+        self.assertEqual(updated.owner_id, self.user.pk)
+        self.assertEqual(updated.object_id, transaction_id)
+        self.assertEqual(updated.payload['amount'], '12.00')
+        self.assertNotIn('path', OutboxEvent.objects.get(model='finances.category').payload)
+
+    def test_bulk_ingest_records_one_event_per_new_row(self):
+        OutboxEvent.objects.all().delete()
+        results = ingest_transactions(self.user, [self.row('10.00'), self.row('10.00'), self.row('20.00', 'Dinner')])
+        created = [transaction.pk for transaction, was_created in results if was_created]
+        self.assertEqual(list(OutboxEvent.objects.values_list('object_id', flat=True)), created)
+
+    def test_archiving_records_no_events(self):
+        Transaction.objects.create(owner=self.user, **dict(self.row('10.00'), date=aware_cutoff() - timedelta(days=5)))
+        OutboxEvent.objects.all().delete()
+        self.assertEqual(archive_transactions(), 1)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_dispatch_delivers_in_order_and_drains(self):
+        Category.objects.create(name='Rent', slug='rent', owner=self.other)
+        delivered = []
+        self.assertEqual(dispatch_outbox(batch_size=2, consumers=[delivered.append]), 3)
+        self.assertEqual([event.model for event in delivered], [
+            'finances.category', 'finances.account', 'finances.category'
+        ])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failure_holds_back_only_that_owner(self):
+        Category.objects.create(name='Rent', slug='rent', owner=self.other)
+        delivered = []
+
+        def consumer(event):
+            if event.model == 'finances.category' and event.owner_id == self.user.pk:
+                raise ConnectionError('receiver down')
+            delivered.append(event)
+
+        self.assertEqual(dispatch_outbox(consumers=[consumer]), 1)
+        self.assertEqual([event.owner_id for event in delivered], [self.other.pk])
+        pending = list(OutboxEvent.objects.values_list('model', 'attempts', 'last_error'))
+        self.assertEqual(pending, [
+            ('finances.category', 1, 'ConnectionError: receiver down'),
+            ('finances.account', 0, ''),
+        ])
+
+        # Once the failing event runs out of attempts it stops blocking the owner's later events
+        self.assertEqual(dispatch_outbox(consumers=[consumer]), 0)
+        self.assertEqual(dispatch_outbox(consumers=[consumer]), 1)
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list('model', 'attempts')), [('finances.category', 2)]
+        )
+
+    def test_dispatch_skips_while_another_dispatcher_runs(self):
+        cache.add('outbox:dispatching:default', 'their-token')
+        self.assertEqual(dispatch_outbox(consumers=[]), 0)
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+        self.assertEqual(cache.get('outbox:dispatching:default'), 'their-token')
+
+    def test_dispatcher_stops_once_its_lease_is_taken_over(self):
+        def consumer(event):
+            # The lease expired and another dispatcher claimed it
+            cache.set('outbox:dispatching:default', 'their-token')
+
+        self.assertEqual(dispatch_outbox(consumers=[consumer]), 1)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+        self.assertEqual(cache.get('outbox:dispatching:default'), 'their-token')
+
+    def test_cache_consumer_bumps_the_owner_version(self):
+        version = get_ledger_version(self.user.pk)
+        invalidate_owner_caches(OutboxEvent.objects.first())
+        self.assertNotEqual(get_ledger_version(self.user.pk), version)
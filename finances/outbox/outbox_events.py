@@ -0,0 +1,38 @@
+from django.db.models.fields.files import FieldFile
+from finances.live.live_events import publish_on_commit
+from finances.models import OutboxEvent
+
+
+def _value(instance, field):
+    value = getattr(instance, field.attname)
+    # Files are sent as their storage name
+    return value.name if isinstance(value, FieldFile) else value
+
+
+def _event(instance, action):
+    exclude = set(getattr(instance, 'outbox_exclude', ()))
+    return OutboxEvent(
+        owner_id=instance.owner_id,
+        model=instance._meta.label_lower,
+        object_id=instance.pk,
+        action=action,
+        payload={
+            field.attname: _value(instance, field)
+            for field in instance._meta.concrete_fields if field.name not in exclude
+        },
+    )
+
+
+def record_event(instance, action):
+    """Write the outbox event for one change, on the database the row was written to, and push it live on commit."""
+    event = _event(instance, action)
+    event.save(using=instance._state.db)
+    publish_on_commit([event], instance._state.db)
+
+
+def record_events(instances, action):
+    """Write the outbox events of a ``bulk_create`` with one insert."""
+    if instances:
+        using = instances[0]._state.db
+        events = OutboxEvent.objects.using(using).bulk_create([_event(instance, action) for instance in instances])
+        publish_on_commit(events, using)
@@ -0,0 +1,20 @@
+"""Receipt text extractors for ``RECEIPT_TEXT_EXTRACTOR``.
+
+An extractor takes the opened Pillow image and returns its text. Extractors
+run inside the receipt worker, so they may be slow, but must stay local.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+
+def no_text(image):
+    """Keep only the thumbnail and metadata."""
+    return ''
+
+
+def tesseract_text(image):
+    """OCR with a local Tesseract install through the optional ``pytesseract`` package."""
+    try:
+        import pytesseract
+    except ImportError as error:
+        raise ImproperlyConfigured("tesseract_text needs the pytesseract package") from error
+    return pytesseract.image_to_string(image)
@@ -0,0 +1,158 @@
+import io
+import logging
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import router, transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import ExifTags, Image, ImageOps
+from finances.models import Receipt, Transaction
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def delete_files_on_commit(files, using):
+    """Remove the stored ``files`` once the transaction on ``using`` commits."""
+    files = [(file.storage, file.name) for file in files if file]
+    if files:
+        db_transaction.on_commit(
+            lambda: [storage.delete(name) for storage, name in files], using=using
+        )
+
+
+def delete_receipt(transaction):
+    """Drop the ``Receipt`` of a deleted ``transaction`` and, on commit, its image and thumbnail."""
+    using = transaction._state.db
+    receipts = Receipt.objects.using(using).filter(transaction_id=transaction.pk)
+    delete_files_on_commit([transaction.receipt_image, *(receipt.thumbnail for receipt in receipts)], using)
+    receipts.delete()
+
+
+def store_receipt(transaction, upload):
+    """Save ``upload`` as the receipt of ``transaction`` and reset its ``Receipt`` to pending.
+
+    The storage copies the upload chunk by chunk; the image is not opened
+    here, decoding is left to ``process_receipt``. The replaced image and
+    thumbnail are removed once the change commits.
+    """
+    using = router.db_for_write(Transaction)
+    with db_transaction.atomic(using=using):
+        previous = Receipt.objects.filter(transaction_id=transaction.pk).first()
+        delete_files_on_commit([transaction.receipt_image, previous and previous.thumbnail], using)
+        transaction.receipt_image.save(os.path.basename(upload.name), upload, save=False)
+        transaction.save(update_fields=['receipt_image', 'updated_at'])
+        receipt, _ = Receipt.objects.update_or_create(transaction_id=transaction.pk, defaults={
+            'owner_id': transaction.owner_id,
+            'status': Receipt.Status.PENDING,
+            'thumbnail': None,
+            'image_format': '',
+            'width': None,
+            'height': None,
+            'size_bytes': None,
+            'exif': {},
+            'error': '',
+            'uploaded_at': timezone.now(),
+            'started_at': None,
+            'processed_at': None,
+        })
+    return receipt
+
+
+def exif_metadata(image):
+    """Readable EXIF tags of ``image``; binary blobs such as maker notes are left out."""
+    metadata = {}
+    for tag, value in image.getexif().items():
+        if isinstance(value, bytes):
+            continue
+        metadata[ExifTags.TAGS.get(tag, str(tag))] = value if isinstance(value, (int, str)) else str(value)
+    return metadata
+
+
+def _thumbnail(image):
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(settings.RECEIPT_THUMBNAIL_SIZE)
+    buffer = io.BytesIO()
+    image.convert('RGB').save(buffer, format='JPEG', quality=80)
+    return ContentFile(buffer.getvalue())
+
+
+def process_receipt(transaction_id):
+    """Fill in the thumbnail, metadata and extracted text of a transaction's pending receipt.
+
+    Returns the receipt, or ``None`` when the transaction or its receipt is
+    gone. Images that cannot be read mark the receipt failed. A receipt
+    being processed elsewhere is left alone unless that claim is older than
+    ``RECEIPT_PROCESSING_TIMEOUT``. Results are only written while this
+    worker's claim still holds: a receipt re-uploaded or reclaimed meanwhile
+    keeps its new state and the thumbnail built here is discarded.
+    """
+    receipt = Receipt.objects.filter(transaction_id=transaction_id).select_related('transaction').first()
+    if receipt is None:
+        return None
+    now = timezone.now()
+    claimable = Q(status__in=[Receipt.Status.PENDING, Receipt.Status.FAILED]) | Q(
+        status=Receipt.Status.PROCESSING, started_at__lt=now - timedelta(seconds=settings.RECEIPT_PROCESSING_TIMEOUT)
+    )
+    if not Receipt.objects.filter(claimable, pk=receipt.pk).update(status=Receipt.Status.PROCESSING, started_at=now):
+        return receipt
+    claim = Receipt.objects.filter(pk=receipt.pk, status=Receipt.Status.PROCESSING, started_at=now)
+    transaction = receipt.transaction
+    try:
+        with transaction.receipt_image.open('rb') as file:
+            image = Image.open(file)
+            # Only the header is read so far; refuse to decode oversized images
+            if image.width * image.height > settings.RECEIPT_MAX_PIXELS:
+                raise ValueError(f"Image of {image.width}x{image.height} pixels is too large")
+            receipt.image_format = image.format or ''
+            receipt.width, receipt.height = image.size
+            receipt.exif = exif_metadata(image)
+            text = import_string(settings.RECEIPT_TEXT_EXTRACTOR)(image)
+            thumbnail = _thumbnail(image)
+        receipt.size_bytes = transaction.receipt_image.size
+    except Exception as error:
+        logger.warning("Receipt of transaction %s failed", transaction_id, exc_info=True)
+        if not claim.update(status=Receipt.Status.FAILED, error=str(error)):
+            receipt.refresh_from_db()
+            return receipt
+        receipt.status = Receipt.Status.FAILED
+        receipt.error = str(error)
+        return receipt
+
+    receipt.thumbnail.save(f'{transaction.pk}.jpg', thumbnail, save=False)
+    receipt.status = Receipt.Status.DONE
+    receipt.error = ''
+    receipt.processed_at = timezone.now()
+    with db_transaction.atomic(using=router.db_for_write(Receipt)):
+        claimed = claim.update(
+            status=receipt.status,
+            thumbnail=receipt.thumbnail.name,
+            image_format=receipt.image_format,
+            width=receipt.width,
+            height=receipt.height,
+            size_bytes=receipt.size_bytes,
+            exif=receipt.exif,
+            error=receipt.error,
+            processed_at=receipt.processed_at,
+        )
+        if claimed:
+            transaction.original_text = text
+            transaction.ai_processed = True
+            transaction.save(update_fields=['original_text', 'ai_processed', 'updated_at'])
+    if not claimed:
+        receipt.thumbnail.delete(save=False)
+        receipt.refresh_from_db()
+    return receipt
+
+
+def stale_receipts(now=None):
+    """``(transaction_id, owner_id)`` of receipts waiting or processing for over ``RECEIPT_PROCESSING_TIMEOUT``."""
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.RECEIPT_PROCESSING_TIMEOUT)
+    return list(Receipt.objects.filter(
+        Q(status=Receipt.Status.PENDING, uploaded_at__lt=cutoff)
+        | Q(status=Receipt.Status.PROCESSING, started_at__lt=cutoff)
+    ).values_list('transaction_id', 'owner_id').order_by())
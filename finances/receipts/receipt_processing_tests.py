@@ -0,0 +1,172 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from core.throttles import buckets
+from finances.models import Account, Category, Receipt, Transaction
+from finances.receipts.receipt_processing import process_receipt
+from finances.tasks import requeue_stale_receipts
+from django.urls import reverse
+from rest_framework import status
+from datetime import timedelta
+from decimal import Decimal
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def read_total(image):
+    return 'TOTAL 42.90'
+
+
+def receipt_jpeg(size=(1200, 1600)):
+    image = Image.new('RGB', size, 'white')
+    exif = Image.Exif()
+    exif[0x010F] = 'Acme Phones'  # Make
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    RECEIPT_TEXT_EXTRACTOR='finances.receipts.receipt_processing_tests.read_total',
+)
+class ReceiptTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.transaction = Transaction.objects.create(
+            kind_of_transaction='EXPENSE',
+            amount=Decimal('42.90'),
+            description='Market',
+            date=timezone.now(),
+            category=Category.objects.create(name='Food', slug='food', owner=self.user),
+            account=Account.objects.create(name='Checking', slug='checking', owner=self.user),
+            owner=self.user
+        )
+        self.url = reverse('transaction-receipt', args=[self.transaction.pk])
+
+    def upload(self, content, name='receipt.jpg'):
+        with mock.patch('finances.transactions.transaction_views.process_receipt.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, {'file': SimpleUploadedFile(name, content)})
+        return response, delay
+
+    def test_upload_is_queued_for_processing(self):
+        response, delay = self.upload(receipt_jpeg())
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        self.assertEqual(response.data['status'], Receipt.Status.PENDING)
+        delay.assert_called_once_with(self.transaction.pk, self.user.pk)
+        self.transaction.refresh_from_db()
+        self.assertTrue(self.transaction.receipt_image.name.startswith('receipts/'))
+
+    def test_processing_fills_thumbnail_metadata_and_text(self):
+        self.upload(receipt_jpeg())
+        receipt = process_receipt(self.transaction.pk)
+        self.assertEqual(receipt.status, Receipt.Status.DONE)
+        self.assertEqual((receipt.image_format, receipt.width, receipt.height), ('JPEG', 1200, 1600))
+        self.assertEqual(receipt.exif['Make'], 'Acme Phones')
+        with Image.open(receipt.thumbnail.path) as thumbnail:
+            self.assertLessEqual(max(thumbnail.size), 320)
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.original_text, 'TOTAL 42.90')
+        self.assertTrue(self.transaction.ai_processed)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['status'], Receipt.Status.DONE)
+
+    def test_unreadable_images_fail(self):
+        response, _ = self.upload(b'not an image')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        receipt = process_receipt(self.transaction.pk)
+        self.assertEqual(receipt.status, Receipt.Status.FAILED)
+        self.assertTrue(receipt.error)
+
+    @override_settings(RECEIPT_MAX_PIXELS=1000)
+    def test_oversized_images_are_not_decoded(self):
+        self.upload(receipt_jpeg())
+        with mock.patch('finances.receipts.receipt_processing_tests.read_total') as extractor:
+            receipt = process_receipt(self.transaction.pk)
+        self.assertEqual(receipt.status, Receipt.Status.FAILED)
+        extractor.assert_not_called()
+
+    @override_settings(RECEIPT_MAX_BYTES=100)
+    def test_upload_validation(self):
+        response, delay = self.upload(receipt_jpeg())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response, delay = self.upload(b'%PDF', name='receipt.pdf')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        delay.assert_not_called()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deleting_the_transaction_drops_the_receipt_and_its_files(self):
+        self.upload(receipt_jpeg())
+        receipt = process_receipt(self.transaction.pk)
+        self.transaction.refresh_from_db()
+        files = [self.transaction.receipt_image.path, receipt.thumbnail.path]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.transaction.delete()
+        self.assertFalse(Receipt.objects.exists())
+        self.assertFalse(any(os.path.exists(path) for path in files))
+
+    def test_new_upload_replaces_the_stored_files(self):
+        self.upload(receipt_jpeg())
+        receipt = process_receipt(self.transaction.pk)
+        self.transaction.refresh_from_db()
+        files = [self.transaction.receipt_image.path, receipt.thumbnail.path]
+        self.upload(receipt_jpeg(size=(800, 600)))
+        self.assertFalse(any(os.path.exists(path) for path in files))
+        self.transaction.refresh_from_db()
+        self.assertTrue(os.path.exists(self.transaction.receipt_image.path))
+
+    def test_abandoned_processing_is_reclaimed(self):
+        self.upload(receipt_jpeg())
+        claimed = timezone.now() - timedelta(minutes=5)
+        Receipt.objects.update(status=Receipt.Status.PROCESSING, started_at=claimed)
+        # Another worker may still be on it
+        self.assertEqual(process_receipt(self.transaction.pk).status, Receipt.Status.PROCESSING)
+        with mock.patch('finances.tasks.process_receipt.delay') as delay:
+            self.assertEqual(requeue_stale_receipts(), 0)
+            Receipt.objects.update(started_at=claimed - timedelta(minutes=10))
+            self.assertEqual(requeue_stale_receipts(), 1)
+        delay.assert_called_once_with(self.transaction.pk, self.user.pk)
+        self.assertEqual(process_receipt(self.transaction.pk).status, Receipt.Status.DONE)
+
+    def test_upload_during_processing_is_not_overwritten(self):
+        self.upload(receipt_jpeg())
+
+        def reupload(image):
+            self.upload(receipt_jpeg(size=(800, 600)))
+            return 'TOTAL 1.00'
+
+        with mock.patch('finances.receipts.receipt_processing.import_string', return_value=reupload):
+            receipt = process_receipt(self.transaction.pk)
+        self.assertEqual(receipt.status, Receipt.Status.PENDING)
+        self.assertFalse(receipt.thumbnail)
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.original_text, '')
+
+        # The new upload is still claimable and processed from its own image
+        receipt = process_receipt(self.transaction.pk)
+        self.assertEqual((receipt.status, receipt.width), (Receipt.Status.DONE, 800))
+
+    def test_status_polling_is_cheap(self):
+        self.upload(receipt_jpeg())
+        for _ in range(100):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
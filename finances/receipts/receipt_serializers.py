@@ -0,0 +1,36 @@
+import os
+from django.conf import settings
+from rest_framework import serializers
+from finances.models import Receipt
+from finances.receipts.receipt_processing import RECEIPT_EXTENSIONS
+
+
+class ReceiptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Receipt
+        fields = [
+            'transaction',
+            'status',
+            'thumbnail',
+            'image_format',
+            'width',
+            'height',
+            'size_bytes',
+            'exif',
+            'error',
+            'uploaded_at',
+            'processed_at'
+        ]
+        read_only_fields = fields
+
+
+class ReceiptUploadSerializer(serializers.Serializer):
+    # A plain file field: checking that it is an image would decode it in the web worker
+    file = serializers.FileField()
+
+    def validate_file(self, value):
+        if value.size > settings.RECEIPT_MAX_BYTES:
+            raise serializers.ValidationError(f"Receipts are limited to {settings.RECEIPT_MAX_BYTES} bytes")
+        if os.path.splitext(value.name)[1].lower() not in RECEIPT_EXTENSIONS:
+            raise serializers.ValidationError(f"Use one of {', '.join(RECEIPT_EXTENSIONS)}")
+        return value
@@ -0,0 +1,51 @@
+from django.utils import timezone
+from finances.aggregates import kind_total, rollup_total
+from finances.models import Account, AccountReconciliation, ReconciliationReport, Transaction
+
+CHUNK_SIZE = 2000
+
+
+def run_reconciliation(chunk_size=CHUNK_SIZE):
+    """Compare every account balance with the net of its transactions.
+
+    All accounts of all owners are checked by a single query grouped by
+    account and streamed with ``iterator()``, so memory stays bounded by
+    ``chunk_size`` rows. Archived transactions count through their monthly
+    rollups. Only mismatches are stored, in batches.
+    """
+    report = ReconciliationReport.objects.create()
+    derived = Account.objects.annotate(
+        income=kind_total(Transaction.KindOfTransaction.INCOME)
+        + rollup_total(Transaction.KindOfTransaction.INCOME, 'account'),
+        expenses=kind_total(Transaction.KindOfTransaction.EXPENSE)
+        + rollup_total(Transaction.KindOfTransaction.EXPENSE, 'account'),
+    ).values_list('id', 'owner_id', 'balance', 'income', 'expenses').order_by()
+
+    checked = 0
+    mismatches = 0
+    pending = []
+    for account_id, owner_id, balance, income, expenses in derived.iterator(chunk_size=chunk_size):
+        checked += 1
+        derived_balance = income - expenses
+        if balance == derived_balance:
+            continue
+        pending.append(AccountReconciliation(
+            report=report,
+            account_id=account_id,
+            owner_id=owner_id,
+            recorded_balance=balance,
+            derived_balance=derived_balance,
+            difference=balance - derived_balance,
+        ))
+        if len(pending) >= chunk_size:
+            AccountReconciliation.objects.bulk_create(pending)
+            mismatches += len(pending)
+            pending = []
+    AccountReconciliation.objects.bulk_create(pending)
+    mismatches += len(pending)
+
+    report.accounts_checked = checked
+    report.mismatches = mismatches
+    report.finished_at = timezone.now()
+    report.save(update_fields=['accounts_checked', 'mismatches', 'finished_at'])
+    return report
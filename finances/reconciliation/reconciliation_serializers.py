@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from finances.models import AccountReconciliation
+
+class AccountReconciliationSerializer(serializers.ModelSerializer):
+    account_slug = serializers.CharField(source='account.slug', read_only=True)
+    report_started_at = serializers.DateTimeField(source='report.started_at', read_only=True)
+    report_finished_at = serializers.DateTimeField(source='report.finished_at', read_only=True)
+
+    class Meta:
+        model = AccountReconciliation
+        fields = [
+            'id',
+            'report',
+            'report_started_at',
+            'report_finished_at',
+            'account',
+            'account_slug',
+            'recorded_balance',
+            'derived_balance',
+            'difference',
+            'created_at'
+        ]
+        read_only_fields = fields
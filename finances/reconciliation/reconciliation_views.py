@@ -0,0 +1,14 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from finances.reconciliation.reconciliation_serializers import AccountReconciliationSerializer
+from finances.models import AccountReconciliation
+from finances.sharding.owner_shards import OwnerShardMixin
+
+class AccountReconciliationViewSet(OwnerShardMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = AccountReconciliation.objects.all()
+    serializer_class = AccountReconciliationSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['report', 'account']
+
+    def get_queryset(self):
+        return self.queryset.filter(owner=self.request.user).select_related('report', 'account')
@@ -0,0 +1,67 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from finances.models import AccountReconciliation, ReconciliationReport, Transaction, Category, Account
+from finances.reconciliation.reconciliation_runner import run_reconciliation
+from finances.tasks import reconcile_accounts
+from django.urls import reverse
+from rest_framework import status
+from decimal import Decimal
+from io import StringIO
+
+class AccountReconciliationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        self.balanced = self.create_account(self.user, 'balanced', '150.00')
+        self.drifted = self.create_account(self.user, 'drifted', '999.00')
+        self.other = self.create_account(self.other_user, 'other', '10.00')
+        self.empty = self.create_account(self.user, 'empty', '0.00')
+
+        for account in (self.balanced, self.drifted):
+            self.create_transaction(account, 'INCOME', '200.00')
+            self.create_transaction(account, 'EXPENSE', '50.00')
+
+    def create_account(self, owner, slug, balance):
+        return Account.objects.create(name=slug.title(), slug=slug, balance=Decimal(balance), owner=owner)
+
+    def create_transaction(self, account, kind, amount):
+        category, _ = Category.objects.get_or_create(name='General', slug='general', owner=account.owner)
+        Transaction.objects.create(
+            kind_of_transaction=kind,
+            amount=Decimal(amount),
+            description='Entry',
+            category=category,
+            account=account,
+            owner=account.owner
+        )
+
+    def test_run_reconciliation(self):
+        with self.assertNumQueries(4):
+            # Report insert, one grouped pass over all accounts, mismatch insert, report update
+            report = run_reconciliation()
+        self.assertEqual(report.accounts_checked, 4)
+        self.assertEqual(report.mismatches, 2)
+        self.assertIsNotNone(report.finished_at)
+
+        entry = AccountReconciliation.objects.get(report=report, account=self.drifted)
+        self.assertEqual(entry.derived_balance, Decimal('150.00'))
+        self.assertEqual(entry.difference, Decimal('849.00'))
+
+    def test_command_and_task(self):
+        out = StringIO()
+        call_command('reconcile_accounts', '--chunk-size', '1', stdout=out)
+        self.assertIn('4 accounts checked, 2 mismatches', out.getvalue())
+        self.assertEqual(ReconciliationReport.objects.get(pk=reconcile_accounts()[0]).mismatches, 2)
+
+    def test_list_reconciliations(self):
+        report = run_reconciliation()
+        response = self.client.get(reverse('accountreconciliation-list'), {'report': report.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['account_slug'], 'drifted')
+        self.assertEqual(response.data['results'][0]['difference'], '849.00')
@@ -0,0 +1,91 @@
+from datetime import datetime, time
+from django.db import router, transaction as db_transaction
+from django.utils import timezone
+from finances.budgets.budget_rollups import apply_bulk_expenses
+from finances.ledger_versions import bump_ledger_version
+from finances.models import OutboxEvent, RecurringTransaction, Transaction
+from finances.outbox.outbox_events import record_events
+
+BATCH_SIZE = 1000
+
+
+def _occurrences(template, until):
+    """Yield every due occurrence of ``template`` and advance its low-water mark past them."""
+    day = template.next_occurrence
+    last_day = min(until, template.end_date) if template.end_date else until
+    while day <= last_day:
+        yield day
+        day = template.following_occurrence(day)
+    template.next_occurrence = day
+    if template.end_date and day > template.end_date:
+        template.is_active = False
+
+
+def materialize_due_occurrences(until=None, batch_size=BATCH_SIZE):
+    """Create the transactions of every template due on or before ``until``.
+
+    Templates are read in batches from the ``(is_active, next_occurrence)``
+    index, so each run only touches templates that are due. Every batch is
+    written with a single ``bulk_create``; the unique
+    ``(recurring_transaction, occurrence_date)`` key makes re-runs harmless.
+    """
+    until = until or timezone.localdate()
+    created = 0
+    while True:
+        with db_transaction.atomic(using=router.db_for_write(RecurringTransaction)):
+            # skip_locked lets concurrent workers split the due templates instead of double-applying them
+            templates = list(
+                RecurringTransaction.objects.select_for_update(skip_locked=True)
+                .filter(is_active=True, next_occurrence__lte=until)
+                .order_by('next_occurrence', 'id')[:batch_size]
+            )
+            if not templates:
+                return created
+
+            occurrences = [
+                Transaction(
+                    owner_id=template.owner_id,
+                    kind_of_transaction=template.kind_of_transaction,
+                    amount=template.amount,
+                    date=timezone.make_aware(datetime.combine(day, time.min)),
+                    description=template.description,
+                    category_id=template.category_id,
+                    account_id=template.account_id,
+                    recurring_transaction=template,
+                    occurrence_date=day,
+                )
+                for template in templates
+                for day in _occurrences(template, until)
+            ]
+            existing = set(
+                Transaction.objects.filter(
+                    recurring_transaction__in=templates,
+                    occurrence_date__gte=min(occurrence.occurrence_date for occurrence in occurrences),
+                ).values_list('recurring_transaction_id', 'occurrence_date').order_by()
+            ) if occurrences else set()
+            new_occurrences = [
+                occurrence for occurrence in occurrences
+                if (occurrence.recurring_transaction_id, occurrence.occurrence_date) not in existing
+            ]
+            for occurrence in new_occurrences:
+                occurrence.fingerprint = occurrence.compute_fingerprint()
+
+            Transaction.objects.bulk_create(new_occurrences, batch_size=batch_size, ignore_conflicts=True)
+            RecurringTransaction.objects.bulk_update(
+                templates, ['next_occurrence', 'is_active'], batch_size=batch_size
+            )
+            apply_bulk_expenses(new_occurrences)
+            if new_occurrences:
+                # ignore_conflicts leaves the primary keys unset, and the outbox events need them
+                ids = {
+                    (template_id, day): pk for template_id, day, pk in Transaction.objects.filter(
+                        recurring_transaction__in=templates,
+                        occurrence_date__gte=min(occurrence.occurrence_date for occurrence in new_occurrences),
+                    ).values_list('recurring_transaction_id', 'occurrence_date', 'id').order_by()
+                }
+                for occurrence in new_occurrences:
+                    occurrence.pk = ids.get((occurrence.recurring_transaction_id, occurrence.occurrence_date))
+                record_events(new_occurrences, OutboxEvent.Action.CREATED)
+        for owner_id in {occurrence.owner_id for occurrence in new_occurrences}:
+            bump_ledger_version(owner_id)
+        created += len(new_occurrences)
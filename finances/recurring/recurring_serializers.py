@@ -0,0 +1,40 @@
+from rest_framework import serializers
+from core.owner_fields import OwnedPrimaryKeyRelatedField
+from finances.models import RecurringTransaction
+
+class RecurringTransactionSerializer(serializers.ModelSerializer):
+    serializer_related_field = OwnedPrimaryKeyRelatedField
+
+    class Meta:
+        model = RecurringTransaction
+        fields = [
+            'id',
+            'kind_of_transaction',
+            'amount',
+            'description',
+            'category',
+            'account',
+            'frequency',
+            'interval',
+            'start_date',
+            'end_date',
+            'next_occurrence',
+            'is_active',
+            'created_at',
+            'updated_at'
+        ]
+        read_only_fields = ['owner', 'next_occurrence']
+
+    def validate(self, data):
+        # Categories and accounts of other owners are rejected by OwnedPrimaryKeyRelatedField
+        start_date = data.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError({"end_date": "End date must not be before start date"})
+
+        return data
+
+    def create(self, validated_data):
+        validated_data['owner'] = self.context['request'].user
+        validated_data['next_occurrence'] = validated_data['start_date']
+        return super().create(validated_data)
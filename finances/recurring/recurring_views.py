@@ -0,0 +1,13 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from finances.recurring.recurring_serializers import RecurringTransactionSerializer
+from finances.models import RecurringTransaction
+from finances.sharding.owner_shards import OwnerShardMixin
+
+class RecurringTransactionViewSet(OwnerShardMixin, viewsets.ModelViewSet):
+    queryset = RecurringTransaction.objects.all()
+    serializer_class = RecurringTransactionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return self.queryset.filter(owner=self.request.user)
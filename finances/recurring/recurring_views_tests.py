@@ -0,0 +1,119 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from finances.models import Budget, BudgetPeriod, RecurringTransaction, Transaction, Category, Account
+from finances.recurring.recurring_materializer import materialize_due_occurrences
+from finances.tasks import materialize_recurring_transactions
+from django.urls import reverse
+from rest_framework import status
+from datetime import date
+from decimal import Decimal
+
+class RecurringTransactionViewSetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.category = Category.objects.create(
+            name='Rent',
+            slug='rent',
+            owner=self.user
+        )
+        self.account = Account.objects.create(
+            name='Test Account',
+            slug='test-account',
+            balance=1000.00,
+            owner=self.user
+        )
+
+    def create_template(self, **kwargs):
+        start_date = kwargs.pop('start_date', date(2024, 1, 31))
+        return RecurringTransaction.objects.create(
+            kind_of_transaction=kwargs.pop('kind_of_transaction', 'EXPENSE'),
+            amount=Decimal('100.00'),
+            description='Monthly rent',
+            category=self.category,
+            account=self.account,
+            start_date=start_date,
+            next_occurrence=start_date,
+            owner=self.user,
+            **kwargs
+        )
+
+    def test_create_recurring_transaction(self):
+        response = self.client.post(reverse('recurringtransaction-list'), {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': '100.00',
+            'description': 'Monthly rent',
+            'category': self.category.id,
+            'account': self.account.id,
+            'frequency': 'MONTHLY',
+            'start_date': '2024-01-31'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['next_occurrence'], '2024-01-31')
+
+    def test_invalid_end_date(self):
+        response = self.client.post(reverse('recurringtransaction-list'), {
+            'amount': '100.00',
+            'description': 'Monthly rent',
+            'category': self.category.id,
+            'account': self.account.id,
+            'start_date': '2024-01-31',
+            'end_date': '2023-01-31'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('end_date', response.data)
+
+    def test_materialize_keeps_month_end_anchor(self):
+        template = self.create_template(frequency='MONTHLY')
+        created = materialize_due_occurrences(until=date(2024, 4, 30))
+        self.assertEqual(created, 4)
+        self.assertEqual(
+            list(Transaction.objects.order_by('occurrence_date').values_list('occurrence_date', flat=True)),
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)]
+        )
+        template.refresh_from_db()
+        self.assertEqual(template.next_occurrence, date(2024, 5, 31))
+
+    def test_materialize_is_idempotent(self):
+        template = self.create_template(frequency='WEEKLY', interval=2, start_date=date(2024, 1, 1))
+        self.assertEqual(materialize_due_occurrences(until=date(2024, 1, 31)), 3)
+
+        # Rewind the low-water mark as if the previous run crashed before saving it
+        RecurringTransaction.objects.filter(pk=template.pk).update(next_occurrence=date(2024, 1, 1))
+        self.assertEqual(materialize_due_occurrences(until=date(2024, 1, 31)), 0)
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_materialize_deactivates_finished_templates(self):
+        template = self.create_template(frequency='DAILY', end_date=date(2024, 2, 2))
+        self.assertEqual(materialize_due_occurrences(until=date(2024, 3, 1)), 3)
+        template.refresh_from_db()
+        self.assertFalse(template.is_active)
+
+    def test_materialize_scans_only_due_templates_in_batches(self):
+        for _ in range(5):
+            self.create_template(frequency='YEARLY')
+        self.create_template(frequency='YEARLY', start_date=date(2030, 1, 1))
+        with self.assertNumQueries(21):
+            # Two batches of (select, existing keys, insert, update, budgets, new ids, outbox events)
+            # and a final empty scan, each in a savepoint
+            created = materialize_due_occurrences(until=date(2024, 12, 31), batch_size=3)
+        self.assertEqual(created, 5)
+
+    def test_materialize_updates_budgets(self):
+        budget = Budget.objects.create(category=self.category, limit=Decimal('500.00'), owner=self.user)
+        self.create_template(frequency='MONTHLY')
+        materialize_due_occurrences(until=date(2024, 2, 29))
+        self.assertEqual(
+            list(BudgetPeriod.objects.filter(budget=budget).order_by('period_start').values_list('spent', flat=True)),
+            [Decimal('100.00'), Decimal('100.00')]
+        )
+
+    def test_beat_task(self):
+        self.create_template(frequency='MONTHLY')
+        self.assertGreater(materialize_recurring_transactions(), 0)
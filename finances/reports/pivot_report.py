@@ -0,0 +1,136 @@
+"""Income and expense matrices of categories, accounts or suppliers by month or week.
+
+Totals come from a single grouped query (hot and archived rows joined by
+``UNION ALL``) and are scattered into a dense ``(kind, row, period)`` array
+of integer cents with NumPy. Rows are also grouped by account currency:
+with a target ``currency`` each day's totals are converted, and without
+one, accounts in several currencies are refused rather than added up.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+import numpy as np
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from business_suppliers.models import Supplier
+from finances.currencies.currency_rates import MixedCurrencies, conversion_factors
+from finances.models import Transaction, local_date
+
+KINDS = (Transaction.KindOfTransaction.INCOME, Transaction.KindOfTransaction.EXPENSE)
+PERIODS = {'month': TruncMonth, 'week': TruncWeek}
+
+
+def _row_keys(dimension, archived):
+    """``(id, name)`` expressions of the pivot rows; transactions without a supplier get id 0."""
+    if dimension == 'supplier':
+        if archived:
+            return (
+                Coalesce('supplier_id', Value(0), output_field=IntegerField()),
+                Subquery(Supplier.objects.filter(pk=OuterRef('supplier_id')).values('name')[:1]),
+            )
+        return (
+            Coalesce('supplier_transaction__supplier_id', Value(0), output_field=IntegerField()),
+            F('supplier_transaction__supplier__name'),
+        )
+    return F(f'{dimension}_id'), F(f'{dimension}__name')
+
+
+def _grouped(queryset, dimension, period, archived, by_day):
+    row_id, row_name = _row_keys(dimension, archived)
+    # Conversion needs each day's rate; otherwise the day column is a constant and groups nothing
+    day = TruncDate('date') if by_day else Value(None, output_field=queryset.model._meta.get_field('date'))
+    return queryset.annotate(row_id=row_id, row_name=row_name, bucket=PERIODS[period]('date'), day=day)\
+        .values_list('row_id', 'row_name', 'bucket', 'kind_of_transaction', 'account__currency', 'day')\
+        .annotate(total=Sum('amount')).order_by()
+
+
+def _cents(rows, currency):
+    """Integer cents of every grouped row, converted into ``currency`` when one is given."""
+    if currency is None:
+        currencies = {source for _, _, _, _, source, _, _ in rows}
+        if len(currencies) > 1:
+            raise MixedCurrencies(currencies)
+        return [round(total * 100) for *_, total in rows]
+    factors = conversion_factors({(source, day) for _, _, _, _, source, day, _ in rows}, currency)
+    return [round(total * factors[(source, day)] * 100) for _, _, _, _, source, day, total in rows]
+
+
+def _money(cents):
+    """Decimal amounts of a nested list of integer cents."""
+    if isinstance(cents, list):
+        return [_money(value) for value in cents]
+    return Decimal(cents).scaleb(-2)
+
+
+def _aware(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def period_starts(period, first, last):
+    """Every month or week start from the one containing ``first`` to the one containing ``last``."""
+    if period == 'week':
+        start = first - timedelta(days=first.weekday())
+        return [start + timedelta(weeks=n) for n in range((last - start).days // 7 + 1)]
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return [
+        first.replace(year=first.year + (first.month - 1 + n) // 12, month=(first.month - 1 + n) % 12 + 1, day=1)
+        for n in range(months + 1)
+    ]
+
+
+def pivot_report(transactions, archived, dimension, period, start_date=None, end_date=None, currency=None):
+    """Return ``rows`` x ``periods`` matrices of ``income`` and ``expense`` Decimal totals.
+
+    ``archived`` is the archived queryset to add, or ``None`` when the range
+    cannot reach it. Every period between the first and last one with
+    activity (or the requested bounds) gets a column, so the matrices are
+    dense. Totals are converted into ``currency`` when it is given; raises
+    ``MixedCurrencies`` without it when accounts differ in currency, and
+    ``RateNotFound`` when a rate is missing.
+    """
+    querysets = []
+    for queryset, is_archived in ((transactions, False), (archived, True)):
+        if queryset is None:
+            continue
+        if start_date:
+            queryset = queryset.filter(date__gte=_aware(start_date))
+        if end_date:
+            queryset = queryset.filter(date__lt=_aware(end_date + timedelta(days=1)))
+        querysets.append(_grouped(queryset, dimension, period, is_archived, by_day=currency is not None))
+    rows = list(querysets[0].union(*querysets[1:], all=True))
+    cents = _cents(rows, currency)
+
+    buckets = [local_date(bucket) for _, _, bucket, *_ in rows]
+    first = start_date or min(buckets, default=None)
+    last = end_date or max(buckets, default=None)
+    periods = period_starts(period, first, last) if first and last else []
+    names = {}
+    for row_id, row_name, *_ in rows:
+        names.setdefault(row_id, row_name)
+    row_ids = sorted(names, key=lambda row_id: (names[row_id] is None, names[row_id] or '', row_id))
+
+    matrix = np.zeros((len(KINDS), len(row_ids), len(periods)), dtype=np.int64)
+    if rows:
+        row_index = {row_id: index for index, row_id in enumerate(row_ids)}
+        period_index = {period_start: index for index, period_start in enumerate(periods)}
+        np.add.at(
+            matrix,
+            (
+                np.fromiter((KINDS.index(row[3]) for row in rows), dtype=np.int64, count=len(rows)),
+                np.fromiter((row_index[row[0]] for row in rows), dtype=np.int64, count=len(rows)),
+                np.fromiter((period_index[bucket] for bucket in buckets), dtype=np.int64, count=len(rows)),
+            ),
+            np.array(cents, dtype=np.int64),
+        )
+    income, expense = matrix
+    return {
+        'dimension': dimension,
+        'period': period,
+        'currency': currency,
+        'rows': [{'id': row_id or None, 'name': names[row_id]} for row_id in row_ids],
+        'periods': [period_start.isoformat() for period_start in periods],
+        'income': _money(income.tolist()),
+        'expense': _money(expense.tolist()),
+        'row_totals': {'income': _money(income.sum(axis=1).tolist()), 'expense': _money(expense.sum(axis=1).tolist())},
+        'period_totals': {'income': _money(income.sum(axis=0).tolist()), 'expense': _money(expense.sum(axis=0).tolist())},
+    }
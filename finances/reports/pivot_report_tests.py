@@ -0,0 +1,106 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+from business_suppliers.models import Supplier, SupplierTransaction
+from core.throttles import buckets
+from finances.archive.archive_runner import archive_transactions
+from finances.models import Account, Category, ExchangeRate, Transaction
+from finances.reports.pivot_report import period_starts
+from django.urls import reverse
+from rest_framework import status
+from datetime import date, datetime, time
+from decimal import Decimal
+
+
+def money(*amounts):
+    return [Decimal(amount) for amount in amounts]
+
+
+class PivotReportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.salary = Category.objects.create(name='Salary', slug='salary', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+        self.supplier = Supplier.objects.create(name='Bakery', slug='bakery', owner=self.user)
+
+        bakery = self.create_transaction('EXPENSE', '12.50', date(2024, 1, 10), self.food)
+        SupplierTransaction.objects.create(supplier=self.supplier, transaction=bakery, owner=self.user)
+        self.create_transaction('EXPENSE', '7.50', date(2024, 1, 20), self.food)
+        self.create_transaction('EXPENSE', '0.29', date(2024, 3, 2), self.food)
+        self.create_transaction('INCOME', '3000.00', date(2024, 3, 1), self.salary)
+
+    def create_transaction(self, kind, amount, day, category):
+        return Transaction.objects.create(
+            kind_of_transaction=kind,
+            amount=Decimal(amount),
+            description='Entry',
+            date=timezone.make_aware(datetime.combine(day, time(12))),
+            category=category,
+            account=self.account,
+            owner=self.user
+        )
+
+    def pivot(self, **params):
+        response = self.client.get(reverse('transaction-pivot'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def test_category_by_month(self):
+        with self.assertNumQueries(1):
+            data = self.pivot(start_date='2024-01-01', end_date='2024-03-31')
+        self.assertEqual([row['name'] for row in data['rows']], ['Food', 'Salary'])
+        self.assertEqual(data['periods'], ['2024-01-01', '2024-02-01', '2024-03-01'])
+        self.assertEqual(data['expense'], [money('20.00', '0', '0.29'), money('0', '0', '0')])
+        self.assertEqual(data['income'], [money('0', '0', '0'), money('0', '0', '3000.00')])
+        self.assertEqual(data['row_totals']['expense'], money('20.29', '0'))
+        self.assertEqual(data['period_totals']['income'], money('0', '0', '3000.00'))
+
+    def test_date_filters_apply(self):
+        data = self.pivot(start_date='2024-03-01', end_date='2024-03-31')
+        self.assertEqual(data['periods'], ['2024-03-01'])
+        self.assertEqual(data['expense'], [money('0.29'), money('0')])
+
+    @override_settings(ARCHIVE_HORIZON_DAYS=30)
+    def test_supplier_rows_by_week_include_archived_rows(self):
+        self.create_transaction('EXPENSE', '1.00', timezone.localdate(), self.food)
+        self.assertEqual(archive_transactions(), 4)
+        with self.assertNumQueries(1):
+            # Hot and archived totals come back from one UNION ALL query
+            data = self.pivot(rows='supplier', period='week', start_date='2024-01-08', end_date='2024-01-21')
+        self.assertEqual(data['rows'], [{'id': self.supplier.pk, 'name': 'Bakery'}, {'id': None, 'name': None}])
+        self.assertEqual(data['periods'], ['2024-01-08', '2024-01-15'])
+        self.assertEqual(data['expense'], [money('12.50', '0'), money('0', '7.50')])
+
+    def test_mixed_currencies_need_a_target_currency(self):
+        euro = Account.objects.create(name='Euro', slug='euro', currency='EUR', owner=self.user)
+        Transaction.objects.create(
+            kind_of_transaction='EXPENSE', amount=Decimal('10.00'), description='Entry',
+            date=timezone.make_aware(datetime(2024, 1, 15, 12)), category=self.food, account=euro, owner=self.user
+        )
+        response = self.client.get(reverse('transaction-pivot'), {'start_date': '2024-01-01', 'end_date': '2024-01-31'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('EUR', response.data['error'])
+
+        ExchangeRate.objects.create(currency='EUR', date=date(2024, 1, 15), rate=Decimal('1.10'))
+        data = self.pivot(start_date='2024-01-01', end_date='2024-01-31', currency='usd')
+        self.assertEqual(data['currency'], 'USD')
+        self.assertEqual(data['expense'], [money('31.00')])
+
+    def test_rejects_unknown_dimensions(self):
+        response = self.client.get(reverse('transaction-pivot'), {'rows': 'tag'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('transaction-pivot'), {'period': 'day'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_period_starts_cross_years(self):
+        self.assertEqual(
+            period_starts('month', date(2023, 11, 15), date(2024, 2, 1)),
+            [date(2023, 11, 1), date(2023, 12, 1), date(2024, 1, 1), date(2024, 2, 1)]
+        )
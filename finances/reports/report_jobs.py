@@ -0,0 +1,143 @@
+import hashlib
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, router, transaction as db_transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+from finances.currencies.currency_rates import CENTS, convert_grouped, single_currency
+from finances.ledger_versions import get_ledger_version
+from finances.models import Account, ArchivedTransaction, ReportJob, Transaction, local_date
+
+REPORT_FIELDS = {
+    ReportJob.Kind.SUMMARY: ['kind_of_transaction'],
+    ReportJob.Kind.BY_CATEGORY: ['category__name', 'kind_of_transaction'],
+    ReportJob.Kind.BY_ACCOUNT: ['account__name', 'kind_of_transaction'],
+}
+
+
+def params_hash(kind, params):
+    payload = json.dumps({'kind': kind, 'params': params}, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def submit_report_job(owner, kind, params):
+    """Return ``(job, created)``, reusing an in-flight or still current job when one exists.
+
+    In-flight jobs that made no progress for ``REPORT_JOB_STALE_SECONDS``
+    are failed first, so a lost job cannot hold the report back forever.
+    """
+    digest = params_hash(kind, params)
+    version = get_ledger_version(owner.pk)
+    jobs = ReportJob.objects.filter(owner=owner, params_hash=digest)
+    now = timezone.now()
+    jobs.filter(
+        status__in=ReportJob.IN_FLIGHT, updated_at__lt=now - timedelta(seconds=settings.REPORT_JOB_STALE_SECONDS)
+    ).update(status=ReportJob.Status.FAILURE, error='Abandoned without progress', finished_at=now, updated_at=now)
+    existing = jobs.filter(status__in=ReportJob.IN_FLIGHT).first() or \
+        jobs.filter(status=ReportJob.Status.SUCCESS, ledger_version=version).first()
+    if existing:
+        return existing, False
+    try:
+        with db_transaction.atomic(using=router.db_for_write(ReportJob)):
+            job = ReportJob.objects.create(
+                owner=owner, kind=kind, params=params, params_hash=digest, ledger_version=version
+            )
+    except IntegrityError:
+        # Another request enqueued the same report between our lookup and insert
+        return jobs.get(status__in=ReportJob.IN_FLIGHT), False
+    return job, True
+
+
+def _aware(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def date_chunks(start, end, days):
+    """Split ``[start, end]`` into consecutive windows of at most ``days`` days."""
+    while start <= end:
+        chunk_end = min(start + timedelta(days=days - 1), end)
+        yield start, chunk_end
+        start = chunk_end + timedelta(days=1)
+
+
+def compute_report(job):
+    """Aggregate the report one date window at a time and merge the partial totals.
+
+    The hot and archive tables are walked separately, each over its own date
+    bounds, so archived history only costs windows where it actually has rows.
+    Without a target currency, owners whose accounts use several currencies
+    get ``MixedCurrencies``.
+    """
+    fields = REPORT_FIELDS[job.kind]
+    params = job.params
+    currency = params.get('currency')
+    if not currency:
+        single_currency(Account.objects.filter(owner_id=job.owner_id))
+    totals = defaultdict(Decimal)
+    count = 0
+    for model in (Transaction, ArchivedTransaction):
+        queryset = model.objects.filter(owner_id=job.owner_id)
+        bounds = queryset.aggregate(first=Min('date'), last=Max('date'))
+        if bounds['first'] is None:
+            continue
+        start = max(filter(None, [local_date(bounds['first']), _parse(params.get('start_date'))]))
+        end = min(filter(None, [local_date(bounds['last']), _parse(params.get('end_date'))]))
+        for chunk_start, chunk_end in date_chunks(start, end, settings.REPORT_CHUNK_DAYS):
+            chunk = queryset.filter(date__gte=_aware(chunk_start), date__lt=_aware(chunk_end + timedelta(days=1)))
+            if currency:
+                rows = convert_grouped(chunk, fields, currency)
+            else:
+                rows = chunk.values(*fields).annotate(total=Sum('amount')).order_by()
+            for row in rows:
+                totals[tuple(row[field] for field in fields)] += row['total']
+            if job.kind == ReportJob.Kind.SUMMARY:
+                count += chunk.count()
+            # Progress keeps a long job from being taken for a lost one
+            ReportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now())
+
+    if job.kind == ReportJob.Kind.SUMMARY:
+        income = totals[('INCOME',)].quantize(CENTS)
+        expenses = totals[('EXPENSE',)].quantize(CENTS)
+        return {
+            'currency': currency,
+            'total_income': income,
+            'total_expenses': expenses,
+            'balance': income - expenses,
+            'transaction_count': count,
+        }
+    return [
+        {**dict(zip(fields, key)), 'total': total.quantize(CENTS)}
+        for key, total in sorted(totals.items())
+    ]
+
+
+def _parse(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def execute_report_job(job_id):
+    job = ReportJob.objects.get(pk=job_id)
+    if job.status not in ReportJob.IN_FLIGHT:
+        return job.status
+    job.status = ReportJob.Status.RUNNING
+    job.save(update_fields=['status', 'updated_at'])
+    try:
+        result = compute_report(job)
+    except Exception as error:
+        job.status = ReportJob.Status.FAILURE
+        job.error = str(error)
+    else:
+        job.status = ReportJob.Status.SUCCESS
+        job.result = zlib.compress(json.dumps(result, cls=DjangoJSONEncoder).encode())
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at', 'updated_at'])
+    return job.status
+
+
+def load_result(job):
+    return json.loads(zlib.decompress(job.result))
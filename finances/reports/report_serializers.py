@@ -0,0 +1,41 @@
+from rest_framework import serializers
+from finances.models import ReportJob
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    start_date = serializers.DateField(write_only=True, required=False)
+    end_date = serializers.DateField(write_only=True, required=False)
+    currency = serializers.RegexField(r'^[A-Za-z]{3}$', write_only=True, required=False)
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'kind',
+            'params',
+            'status',
+            'error',
+            'start_date',
+            'end_date',
+            'currency',
+            'created_at',
+            'finished_at'
+        ]
+        read_only_fields = ['params', 'status', 'error', 'finished_at']
+
+    def validate(self, data):
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError({"end_date": "End date must not be before start date"})
+        return data
+
+    def get_params(self):
+        """Canonical report parameters, used to coalesce identical requests."""
+        data = self.validated_data
+        params = {}
+        for field in ('start_date', 'end_date'):
+            if data.get(field):
+                params[field] = data[field].isoformat()
+        if data.get('currency'):
+            params['currency'] = data['currency'].upper()
+        return params
@@ -0,0 +1,44 @@
+from rest_framework import viewsets, mixins
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework import status
+from django.db import transaction as db_transaction
+from finances.reports.report_jobs import load_result, submit_report_job
+from finances.reports.report_serializers import ReportJobSerializer
+from finances.models import ReportJob
+from finances.tasks import run_report_job
+from finances.sharding.owner_shards import OwnerShardMixin
+
+class ReportJobViewSet(OwnerShardMixin, viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin):
+    serializer_class = ReportJobSerializer
+    permission_classes = [IsAuthenticated]
+    # Jobs run in the background, but each one aggregates the whole requested range
+    throttle_costs = {'create': 20}
+    queryset = ReportJob.objects.none()
+
+    def get_queryset(self):
+        queryset = ReportJob.objects.filter(owner=self.request.user)
+        if self.action != 'result':
+            # Compressed results can be large; only the result action reads them
+            queryset = queryset.defer('result')
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job, created = submit_report_job(request.user, serializer.validated_data['kind'], serializer.get_params())
+        if created:
+            # The aggregation itself only ever runs on a Celery worker
+            db_transaction.on_commit(lambda: run_report_job.delay(job.pk, job.owner_id), using=job._state.db)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        job = self.get_object()
+        if job.status != ReportJob.Status.SUCCESS:
+            return Response(
+                {'status': job.status, 'error': job.error},
+                status=status.HTTP_409_CONFLICT if job.status == ReportJob.Status.FAILURE else status.HTTP_202_ACCEPTED
+            )
+        return Response(load_result(job))
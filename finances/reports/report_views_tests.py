@@ -0,0 +1,105 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from finances.models import ReportJob, Transaction, Category, Account
+from finances.reports.report_jobs import date_chunks
+from finances.tasks import run_report_job
+from django.urls import reverse
+from rest_framework import status
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from django.utils import timezone
+from unittest import mock
+
+class ReportJobViewSetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+        self.food = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.rent = Category.objects.create(name='Rent', slug='rent', owner=self.user)
+        for year in (2021, 2022, 2023):
+            self.create_transaction(self.food, '10.00', datetime(year, 3, 1))
+            self.create_transaction(self.rent, '100.00', datetime(year, 9, 1))
+
+    def create_transaction(self, category, amount, day):
+        Transaction.objects.create(
+            amount=Decimal(amount),
+            date=timezone.make_aware(day),
+            description='Entry',
+            category=category,
+            account=self.account,
+            owner=self.user
+        )
+
+    def test_create_enqueues_job_on_commit(self):
+        with mock.patch('finances.reports.report_views.run_report_job.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('reportjob-list'), {'kind': 'BY_CATEGORY'})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'PENDING')
+        delay.assert_called_once_with(response.data['id'], self.user.pk)
+
+    def test_identical_requests_are_coalesced(self):
+        url = reverse('reportjob-list')
+        data = {'kind': 'BY_CATEGORY', 'start_date': '2022-01-01', 'currency': 'usd'}
+        with mock.patch('finances.reports.report_views.run_report_job.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                first = self.client.post(url, data)
+                second = self.client.post(url, data)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(first.data['params'], {'start_date': '2022-01-01', 'currency': 'USD'})
+        self.assertEqual(delay.call_count, 1)
+
+    def test_result_after_job_runs(self):
+        response = self.client.post(reverse('reportjob-list'), {'kind': 'BY_CATEGORY', 'start_date': '2022-01-01'})
+        result_url = reverse('reportjob-result', args=[response.data['id']])
+        self.assertEqual(self.client.get(result_url).status_code, status.HTTP_202_ACCEPTED)
+
+        with self.settings(REPORT_CHUNK_DAYS=30):
+            self.assertEqual(run_report_job(response.data['id']), 'SUCCESS')
+
+        job = ReportJob.objects.get(pk=response.data['id'])
+        self.assertLess(len(job.result), 200)
+        response = self.client.get(result_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [
+            {'category__name': 'Food', 'kind_of_transaction': 'EXPENSE', 'total': '20.00'},
+            {'category__name': 'Rent', 'kind_of_transaction': 'EXPENSE', 'total': '200.00'},
+        ])
+
+    def test_summary_job(self):
+        job = self.client.post(reverse('reportjob-list'), {'kind': 'SUMMARY'}).data
+        run_report_job(job['id'])
+        response = self.client.get(reverse('reportjob-result', args=[job['id']]))
+        self.assertEqual(response.data['total_expenses'], '330.00')
+        self.assertEqual(response.data['balance'], '-330.00')
+        self.assertEqual(response.data['transaction_count'], 6)
+
+    def test_mixed_currencies_fail_without_target(self):
+        Account.objects.create(name='Euro', slug='euro', currency='EUR', owner=self.user)
+        job = self.client.post(reverse('reportjob-list'), {'kind': 'SUMMARY'}).data
+        self.assertEqual(run_report_job(job['id']), 'FAILURE')
+        self.assertIn('EUR, USD', ReportJob.objects.get(pk=job['id']).error)
+
+    def test_lost_jobs_are_replaced(self):
+        url = reverse('reportjob-list')
+        with mock.patch('finances.reports.report_views.run_report_job.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                lost = self.client.post(url, {'kind': 'SUMMARY'}).data
+            # The broker lost the message; the job never ran
+            ReportJob.objects.filter(pk=lost['id']).update(updated_at=timezone.now() - timedelta(hours=1))
+            with self.captureOnCommitCallbacks(execute=True):
+                again = self.client.post(url, {'kind': 'SUMMARY'}).data
+        self.assertNotEqual(again['id'], lost['id'])
+        self.assertEqual(ReportJob.objects.get(pk=lost['id']).status, ReportJob.Status.FAILURE)
+        self.assertEqual(delay.call_count, 2)
+
+    def test_date_chunks(self):
+        self.assertEqual(list(date_chunks(date(2024, 1, 1), date(2024, 1, 10), 4)), [
+            (date(2024, 1, 1), date(2024, 1, 4)),
+            (date(2024, 1, 5), date(2024, 1, 8)),
+            (date(2024, 1, 9), date(2024, 1, 10)),
+        ])
@@ -0,0 +1,128 @@
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from finances.models import OwnerShard
+
+SHARDED_APPS = {'finances', 'business_suppliers'}
+# Reference data and the shard directory itself stay on the primary
+GLOBAL_MODELS = {'finances.exchangerate', 'finances.ownershard'}
+
+_current_shard = ContextVar('current_shard', default=None)
+
+
+def sharding_enabled():
+    return bool(settings.SHARD_ALIASES)
+
+
+def is_sharded(model):
+    return sharding_enabled() and model._meta.app_label in SHARDED_APPS \
+        and model._meta.label_lower not in GLOBAL_MODELS
+
+
+def _directory_key(owner_id):
+    return f'shard:placement:{owner_id}'
+
+
+def shard_placement(owner_id):
+    """Return ``(alias, generation)`` of ``owner_id``'s rows, placing a new owner by hash on first use.
+
+    The generation counts the owner's moves, so it tells apart two stays on
+    the same shard.
+    """
+    key = _directory_key(owner_id)
+    placement = cache.get(key)
+    if placement is None:
+        placement = OwnerShard.objects.using('default').filter(owner_id=owner_id)\
+            .values_list('alias', 'generation').first()
+        if placement is None:
+            aliases = settings.SHARD_ALIASES
+            alias = aliases[zlib.crc32(str(owner_id).encode()) % len(aliases)]
+            mirror_owner(owner_id, alias)
+            entry = OwnerShard.objects.using('default').get_or_create(
+                owner_id=owner_id, defaults={'alias': alias}
+            )[0]
+            placement = (entry.alias, entry.generation)
+        placement = tuple(placement)
+        cache.set(key, placement, None)
+    return placement
+
+
+def shard_for_owner(owner_id):
+    """Return the alias holding ``owner_id``'s rows, placing a new owner by hash on first use."""
+    return shard_placement(owner_id)[0]
+
+
+def forget_owner(owner_id):
+    cache.delete(_directory_key(owner_id))
+
+
+def mirror_owner(owner_id, alias):
+    """Copy the owner's user row to ``alias`` so the shard's owner foreign keys hold."""
+    if not User.objects.using(alias).filter(pk=owner_id).exists():
+        User.objects.using(alias).bulk_create(
+            [User.objects.using('default').get(pk=owner_id)], ignore_conflicts=True
+        )
+
+
+@contextmanager
+def using_shard(alias):
+    """Route sharded queries without an instance to ``alias`` for the duration of the block."""
+    token = _current_shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _current_shard.reset(token)
+
+
+def owner_shard(owner_id):
+    return using_shard(shard_for_owner(owner_id) if sharding_enabled() and owner_id else None)
+
+
+def each_shard():
+    """Yield every shard alias inside its ``using_shard`` block; once, with ``None``, when sharding is off."""
+    for alias in settings.SHARD_ALIASES or [None]:
+        with using_shard(alias):
+            yield alias
+
+
+class OwnerShardRouter:
+    """Send owner-scoped ``finances`` and ``business_suppliers`` queries to the owner's shard.
+
+    Writes follow the instance's owner; reads and bulk queries follow the
+    shard of the current request or job (see ``OwnerShardMixin`` and
+    ``using_shard``). Other models fall through to the next router.
+    """
+
+    def _db(self, model, instance=None, **hints):
+        if not is_sharded(model):
+            return None
+        if isinstance(instance, User):
+            return shard_for_owner(instance.pk)
+        if instance is not None and is_sharded(type(instance)):
+            if instance._state.db:
+                return instance._state.db
+            if getattr(instance, 'owner_id', None):
+                return shard_for_owner(instance.owner_id)
+        return _current_shard.get()
+
+    db_for_read = _db
+    db_for_write = _db
+
+
+class OwnerShardMixin:
+    """Route the request's owner-scoped queries to the authenticated user's shard."""
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _current_shard.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _current_shard.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if sharding_enabled() and request.user.is_authenticated:
+            _current_shard.set(shard_for_owner(request.user.pk))
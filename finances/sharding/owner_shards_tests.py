@@ -0,0 +1,125 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from business_suppliers.models import Supplier, SupplierTransaction
+from finances.models import Account, Budget, BudgetPeriod, Category, OutboxEvent, OwnerShard, Tombstone, Transaction
+from finances.sharding.owner_shards import mirror_owner, shard_for_owner
+from finances.sharding.shard_moves import move_owner, plan_rebalance
+from django.urls import reverse
+from rest_framework import status
+from io import StringIO
+
+SHARDS = ['shard_0', 'shard_1']
+
+
+@override_settings(SHARD_ALIASES=SHARDS)
+class OwnerShardingTest(TestCase):
+    databases = {'default', *SHARDS}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        OwnerShard.objects.create(owner=self.user, alias='shard_0')
+        mirror_owner(self.user.pk, 'shard_0')
+
+        self.post('category-list', {'name': 'Home', 'slug': 'home'})
+        self.post('category-list', {'name': 'Rent', 'slug': 'rent', 'parent': self.category('home').id})
+        self.post('account-list', {'name': 'Checking', 'slug': 'checking', 'balance': '1000.00'})
+        self.post('budget-list', {'category': self.category('rent').id, 'period': 'MONTHLY', 'limit': '900.00'})
+        self.post('supplier-list', {'name': 'Landlord'})
+
+    def post(self, name, data, **kwargs):
+        response = self.client.post(reverse(name, kwargs=kwargs), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response
+
+    def category(self, slug):
+        return Category.objects.using(shard_for_owner(self.user.pk)).get(owner=self.user, slug=slug)
+
+    def create_rent(self):
+        account = Account.objects.using(shard_for_owner(self.user.pk)).get(owner=self.user)
+        self.post('supplier-transaction-list', {'transaction': {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': '800.00',
+            'date': timezone.now().isoformat(),
+            'description': 'Rent',
+            'category': self.category('rent').id,
+            'account': account.id,
+        }}, supplier_slug='landlord')
+
+    def test_writes_and_reads_use_owner_shard(self):
+        self.create_rent()
+        for model in (Category, Account, Supplier, Transaction, SupplierTransaction):
+            self.assertFalse(model.objects.using('default').exists(), model)
+            self.assertFalse(model.objects.using('shard_1').exists(), model)
+            self.assertTrue(model.objects.using('shard_0').exists(), model)
+        self.assertEqual(self.category('rent').path, f"{self.category('home').pk}/{self.category('rent').pk}/")
+        self.assertEqual(BudgetPeriod.objects.using('shard_0').get().spent, 800)
+
+        response = self.client.get(reverse('transaction-list'))
+        self.assertEqual(response.data['count'], 1)
+        response = self.client.get(reverse('budget-status'))
+        self.assertEqual(response.data[0]['spent'], '800.00')
+
+    def test_move_owner(self):
+        self.create_rent()
+        rent = Transaction.objects.using('shard_0').get()
+        response = self.client.put(reverse('transaction-tags', args=[rent.pk]), {'tags': ['housing']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        out = StringIO()
+        call_command('move_owner_shard', 'testuser', 'shard_1', stdout=out)
+        self.assertIn('to shard_1', out.getvalue())
+
+        self.assertEqual(OwnerShard.objects.get(owner=self.user).alias, 'shard_1')
+        self.assertFalse(Transaction.objects.using('shard_0').exists())
+        self.assertFalse(User.objects.using('shard_0').filter(pk=self.user.pk).exists())
+        moved = Transaction.objects.using('shard_1').get()
+        self.assertEqual(moved.supplier_transaction.supplier.slug, 'landlord')
+        self.assertEqual(list(moved.tags.values_list('name', flat=True)), ['housing'])
+        self.assertEqual(self.category('rent').parent, self.category('home'))
+        self.assertEqual(self.category('rent').path, f"{self.category('home').pk}/{self.category('rent').pk}/")
+        self.assertEqual(Budget.objects.using('shard_1').get().periods.get().spent, 800)
+
+        response = self.client.get(reverse('supplier-detail', kwargs={'slug': 'landlord'}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse('transaction-by-category'))
+        self.assertEqual(response.data[0]['total'], 800)
+
+    def test_move_carries_tombstones_and_pending_events(self):
+        self.create_rent()
+        rent = Transaction.objects.using('shard_0').get()
+        rent_id = rent.pk
+        rent.delete()
+        deleted_at = Tombstone.objects.using('shard_0').get(model='finances.transaction').deleted_at
+        events = OutboxEvent.objects.using('shard_0').count()
+
+        move_owner(self.user.pk, 'shard_1')
+        self.assertFalse(Tombstone.objects.using('shard_0').exists())
+        self.assertFalse(OutboxEvent.objects.using('shard_0').exists())
+        tombstone = Tombstone.objects.using('shard_1').get(model='finances.transaction')
+        self.assertEqual((tombstone.object_id, tombstone.deleted_at), (rent_id, deleted_at))
+        self.assertGreaterEqual(OutboxEvent.objects.using('shard_1').count(), events)
+
+    def test_sync_tokens_expire_after_moving_back(self):
+        token = self.client.get(reverse('sync-list')).data['next']
+        move_owner(self.user.pk, 'shard_1')
+        move_owner(self.user.pk, 'shard_0')
+        self.assertEqual(OwnerShard.objects.get(owner=self.user).generation, 2)
+        self.assertEqual(self.category('rent').parent, self.category('home'))
+        response = self.client.get(reverse('sync-list'), {'since': token})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_default_database_is_never_moved(self):
+        with self.assertRaises(ValueError):
+            move_owner(self.user.pk, 'default')
+        self.assertTrue(User.objects.using('default').filter(pk=self.user.pk).exists())
+
+    def test_plan_rebalance(self):
+        loads = {'shard_0': {1: 50, 2: 30, 3: 10}, 'shard_1': {4: 10}}
+        self.assertEqual(plan_rebalance(loads), [(2, 'shard_0', 'shard_1'), (3, 'shard_0', 'shard_1')])
+        self.assertEqual(plan_rebalance({'shard_0': {1: 10}, 'shard_1': {2: 10}}), [])
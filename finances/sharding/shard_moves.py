@@ -0,0 +1,196 @@
+from django.contrib.auth.models import User
+from django.db import transaction as db_transaction
+from django.db.models import Count, F, Min
+from business_suppliers.models import Supplier, SupplierTransaction
+from finances.ledger_versions import bump_ledger_version
+from finances.models import (
+    Account, AccountReconciliation, ArchivedTransaction, Budget, BudgetPeriod, Category, OutboxEvent, OwnerShard,
+    Receipt, RecurringTransaction, ReportJob, SpendingAnomaly, Tag, Tombstone, Transaction, TransactionRollup,
+    TransactionTag
+)
+from finances.sharding.owner_shards import forget_owner, mirror_owner, shard_for_owner, using_shard
+from finances.signals import ledger_hooks_suspended
+
+# Parents before children, so every foreign key can be remapped to an already copied row
+OWNER_MODELS = [
+    (Category, 'owner_id'),
+    (Account, 'owner_id'),
+    (Supplier, 'owner_id'),
+    (RecurringTransaction, 'owner_id'),
+    (Tag, 'owner_id'),
+    (Transaction, 'owner_id'),
+    (SupplierTransaction, 'owner_id'),
+    (Budget, 'owner_id'),
+    (BudgetPeriod, 'budget__owner_id'),
+    (ArchivedTransaction, 'owner_id'),
+    (TransactionTag, 'tag__owner_id'),
+    (Receipt, 'owner_id'),
+    (TransactionRollup, 'owner_id'),
+    (ReportJob, 'owner_id'),
+]
+# Deletions and undelivered events follow the owner as recorded, with the time they happened
+LOG_MODELS = [(Tombstone, 'deleted_at'), (OutboxEvent, 'created_at')]
+# Reconciliation results point at a report of the source shard and are left behind;
+# anomalies are found again by the next nightly run
+DROPPED_MODELS = [(AccountReconciliation, 'owner_id'), (SpendingAnomaly, 'owner_id')]
+
+
+def _depth(category):
+    return category.path.count('/')
+
+
+def _remap(row, new_ids):
+    for field in row._meta.concrete_fields:
+        if field.is_relation and field.related_model in new_ids:
+            old = getattr(row, field.attname)
+            if old is not None:
+                setattr(row, field.attname, new_ids[field.related_model][old])
+    row._state.fields_cache = {}
+    row._state.adding = True
+    row._state.db = None
+
+
+def _copy_rows(model, rows, target, new_ids):
+    """Insert ``rows`` on ``target`` under fresh primary keys and return ``{old_pk: new_pk}``."""
+    old_pks = [row.pk for row in rows]
+    stamps = [(row.created_at, row.updated_at) for row in rows] if hasattr(model, 'created_at') else None
+    for row in rows:
+        _remap(row, new_ids)
+
+    if model is ArchivedTransaction:
+        # Archived ids are copies of hot ids; moved rows take ids below zero, which no hot row uses
+        floor = min(ArchivedTransaction.objects.using(target).aggregate(low=Min('id'))['low'] or 0, 0)
+        for offset, row in enumerate(rows, start=1):
+            row.id = floor - offset
+            if row.supplier_id is not None:
+                row.supplier_id = new_ids[Supplier][row.supplier_id]
+        model.objects.using(target).bulk_create(rows)
+        return dict(zip(old_pks, [row.pk for row in rows]))
+
+    for row in rows:
+        row.pk = None
+        if model is Transaction:
+            # The fingerprint covers the account key, which just changed
+            row.fingerprint = row.compute_fingerprint()
+    if model is Category:
+        # save() rebuilds the materialized path from the already copied parent, so each
+        # parent key is remapped as its row lands and the source path is dropped
+        new_ids[Category] = copied = {}
+        for old_pk, row in zip(old_pks, rows):
+            if row.parent_id is not None:
+                row.parent_id = copied[row.parent_id]
+            row.path = ''
+            row.save(using=target)
+            copied[old_pk] = row.pk
+    else:
+        model.objects.using(target).bulk_create(rows)
+    if stamps:
+        # auto_now_add/auto_now overwrote the timestamps on insert
+        for row, (created_at, updated_at) in zip(rows, stamps):
+            row.created_at, row.updated_at = created_at, updated_at
+        model.objects.using(target).bulk_update(rows, ['created_at', 'updated_at'])
+    return dict(zip(old_pks, [row.pk for row in rows]))
+
+
+def _copy_log(model, rows, target, stamp):
+    """Insert ``rows`` on ``target`` under fresh primary keys, keeping their ``stamp`` field."""
+    stamps = [getattr(row, stamp) for row in rows]
+    for row in rows:
+        row.pk = None
+        row._state.adding = True
+        row._state.db = None
+    model.objects.using(target).bulk_create(rows)
+    # auto_now_add overwrote the stamp on insert
+    for row, value in zip(rows, stamps):
+        setattr(row, stamp, value)
+    model.objects.using(target).bulk_update(rows, [stamp])
+
+
+def move_owner(owner_id, target):
+    """Copy every row of ``owner_id`` to the ``target`` shard, repoint the directory and purge the source.
+
+    Rows get new primary keys on the target; slugs, and therefore the public
+    category, account and supplier URLs, are unchanged. Both shards are
+    written inside one transaction each, but writes made by the owner while
+    the move runs may be lost, so run it while the owner is idle. Tombstones
+    and undelivered outbox events move along; the owner's shard generation
+    is bumped so sync tokens issued before the move expire. The primary
+    holds the real user and the shard directory, so ``default`` is refused
+    as either end of a move with ``ValueError``.
+    Returns the number of copied rows per model label.
+    """
+    source = shard_for_owner(owner_id)
+    if 'default' in (source, target):
+        raise ValueError("Owners cannot be moved off or onto the default database")
+    if source == target:
+        return {}
+    mirror_owner(owner_id, target)
+
+    new_ids = {}
+    moved = {}
+    with db_transaction.atomic(using=source), db_transaction.atomic(using=target), using_shard(target):
+        for model, lookup in OWNER_MODELS:
+            rows = list(model.objects.using(source).filter(**{lookup: owner_id}).order_by('pk'))
+            if model is Category:
+                rows.sort(key=_depth)
+            if model in (TransactionTag, Receipt):
+                # Tag links and receipts point at hot or archived transactions alike
+                new_ids[Transaction] = {**new_ids[ArchivedTransaction], **new_ids[Transaction]}
+            new_ids[model] = _copy_rows(model, rows, target, new_ids)
+            moved[model._meta.label] = len(rows)
+        for model, stamp in LOG_MODELS:
+            rows = list(model.objects.using(source).filter(owner_id=owner_id).order_by('pk'))
+            _copy_log(model, rows, target, stamp)
+            moved[model._meta.label] = len(rows)
+
+        with using_shard(source), ledger_hooks_suspended():
+            for model, _ in LOG_MODELS:
+                model.objects.using(source).filter(owner_id=owner_id).delete()
+            for model, lookup in reversed(OWNER_MODELS + DROPPED_MODELS):
+                if model is Category:
+                    continue
+                model.objects.using(source).filter(**{lookup: owner_id}).delete()
+            # Categories protect their parents, so delete the deepest level first
+            categories = Category.objects.using(source).filter(owner_id=owner_id)
+            for depth in sorted({_depth(category) for category in categories}, reverse=True):
+                categories.filter(pk__in=[c.pk for c in categories if _depth(c) == depth]).delete()
+            User.objects.using(source).filter(pk=owner_id).delete()
+
+        OwnerShard.objects.using('default').filter(owner_id=owner_id)\
+            .update(alias=target, generation=F('generation') + 1)
+    forget_owner(owner_id)
+    bump_ledger_version(owner_id)
+    return moved
+
+
+def shard_loads(aliases):
+    """Return ``{alias: {owner_id: transaction_count}}`` with one grouped query per shard."""
+    loads = {}
+    for alias in aliases:
+        owners = Transaction.objects.using(alias).values('owner_id').annotate(rows=Count('id')).order_by()
+        loads[alias] = {row['owner_id']: row['rows'] for row in owners}
+    return loads
+
+
+def plan_rebalance(loads, tolerance=0.1):
+    """Return ``(owner_id, source, target)`` moves bringing each shard within ``tolerance`` of the mean load.
+
+    Owners are taken largest first from the most loaded shards and sent to
+    the least loaded one, as long as the move does not overshoot it.
+    """
+    totals = {alias: sum(owners.values()) for alias, owners in loads.items()}
+    if not totals:
+        return []
+    ceiling = sum(totals.values()) / len(totals) * (1 + tolerance)
+    moves = []
+    for source in sorted(totals, key=totals.get, reverse=True):
+        for owner_id, rows in sorted(loads[source].items(), key=lambda item: item[1], reverse=True):
+            if totals[source] <= ceiling:
+                break
+            target = min(totals, key=totals.get)
+            if target == source or totals[target] + rows > ceiling:
+                continue
+            moves.append((owner_id, source, target))
+            totals[source] -= rows
+            totals[target] += rows
+    return moves
@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from finances.budgets.budget_rollups import CONTRIBUTION_FIELDS, apply_expense_delta, expense_contribution
+from finances.currencies.currency_rates import rate_cache
+from finances.ledger_versions import bump_ledger_version_on_commit
+from finances.models import Account, Category, ExchangeRate, OutboxEvent, Transaction, TransactionTag
+from finances.outbox.outbox_events import record_event
+from finances.receipts.receipt_processing import delete_receipt
+from finances.sharding.owner_shards import using_shard
+from finances.sync.sync_tombstones import record_tombstone
+
+TRACKED_FIELDS = CONTRIBUTION_FIELDS
+
+_hooks_suspended = ContextVar('ledger_hooks_suspended', default=False)
+
+
+@contextmanager
+def ledger_hooks_suspended():
+    """Skip budget, cache, outbox and tombstone bookkeeping for writes that move rows without changing them."""
+    token = _hooks_suspended.set(True)
+    try:
+        yield
+    finally:
+        _hooks_suspended.reset(token)
+
+
+def hooks_suspended():
+    return _hooks_suspended.get()
+
+
+def _snapshot(instance):
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS}
+
+
+def _previous_values(instance):
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    values = {field: loaded.get(field, DEFERRED) for field in TRACKED_FIELDS}
+    if any(value is DEFERRED for value in values.values()):
+        return None
+    return values
+
+
+@receiver(pre_save, sender=Transaction)
+def load_previous_transaction_values(sender, instance, raw=False, **kwargs):
+    # Instances loaded with deferred fields have no usable snapshot; read the stored row once
+    if raw or instance._state.adding or _previous_values(instance) is not None:
+        return
+    instance._loaded_values = Transaction.objects.using(instance._state.db).filter(pk=instance.pk)\
+        .values(*TRACKED_FIELDS).first()
+
+
+@receiver(post_save, sender=Transaction)
+def transaction_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or _hooks_suspended.get():
+        return
+    previous = None if created else _previous_values(instance)
+    # Budgets live on the same shard as the transaction
+    with using_shard(instance._state.db):
+        if previous:
+            old = expense_contribution(previous)
+            if old:
+                apply_expense_delta(old[0], old[1], old[2], -old[3])
+        new = expense_contribution(_snapshot(instance))
+        if new:
+            apply_expense_delta(*new)
+    instance._loaded_values = _snapshot(instance)
+    bump_ledger_version_on_commit(instance.owner_id, instance._state.db)
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    if _hooks_suspended.get():
+        return
+    old = expense_contribution(_snapshot(instance))
+    if old:
+        with using_shard(instance._state.db):
+            apply_expense_delta(old[0], old[1], old[2], -old[3])
+    # Tag links and receipts have no foreign key constraint so they follow rows into the archive;
+    # drop them on a real delete
+    TransactionTag.objects.using(instance._state.db).filter(transaction_id=instance.pk).delete()
+    delete_receipt(instance)
+    bump_ledger_version_on_commit(instance.owner_id, instance._state.db)
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def bump_ledger_version_on_account_change(sender, instance, **kwargs):
+    bump_ledger_version_on_commit(instance.owner_id, instance._state.db)
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def clear_rate_cache(sender, **kwargs):
+    # Only this process' cache is cleared; other workers keep borrowed rates for FX_FALLBACK_RATE_SECONDS
+    # and exact ones until evicted, as published rates are rarely corrected
+    rate_cache.clear()
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=Category)
+def record_saved_event(sender, instance, created, raw=False, **kwargs):
+    if raw or _hooks_suspended.get():
+        return
+    record_event(instance, OutboxEvent.Action.CREATED if created else OutboxEvent.Action.UPDATED)
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Category)
+def record_deleted_event(sender, instance, **kwargs):
+    if _hooks_suspended.get():
+        return
+    record_event(instance, OutboxEvent.Action.DELETED)
+    record_tombstone(instance)
@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from business_suppliers.models import Supplier
+from business_suppliers.serializers import SupplierSerializer
+from finances.accounts.account_serializers import AccountSerializer
+from finances.categories.category_serializers import CategorySerializer
+from finances.models import Account, Category, Tombstone, Transaction
+from finances.sync.sync_tombstones import tombstone_horizon
+from finances.tags.tag_store import attach_tag_names
+from finances.transactions.transaction_serializers import TransactionSerializer
+
+TOKEN_SALT = 'finances.sync'
+
+
+@dataclass(frozen=True)
+class SyncStream:
+    name: str
+    model: type
+    serializer_class: type
+    related: tuple = ()
+
+
+# Parents before children, so a client can apply a batch in order
+STREAMS = (
+    SyncStream('categories', Category, CategorySerializer),
+    SyncStream('accounts', Account, AccountSerializer),
+    SyncStream('suppliers', Supplier, SupplierSerializer),
+    SyncStream('transactions', Transaction, TransactionSerializer, ('category', 'account')),
+)
+STREAM_NAMES = {stream.model._meta.label_lower: stream.name for stream in STREAMS}
+DELETED = len(STREAMS)
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+class TokenExpired(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class SyncCursor:
+    """Position in a sync: the ``(since, until]`` window, the stream being read and the last row sent from it.
+
+    A client that finished a window starts the next one at ``until``; rows
+    and tombstones are read in ``(timestamp, id)`` order, so a batch boundary
+    can fall anywhere without skipping or repeating a change. ``placement``
+    is the owner's ``(shard, generation)`` when the token was issued.
+    """
+    since: datetime = None
+    until: datetime = None
+    stream: int = 0
+    after: tuple = None
+    placement: tuple = None
+
+    @property
+    def finished(self):
+        return self.stream > DELETED
+
+    def dumps(self):
+        return signing.dumps({
+            'since': self.since and self.since.isoformat(),
+            'until': self.until.isoformat(),
+            'stream': self.stream,
+            'after': self.after and [self.after[0].isoformat(), self.after[1]],
+            'placement': self.placement and list(self.placement),
+        }, salt=TOKEN_SALT, compress=True)
+
+    @classmethod
+    def loads(cls, token):
+        try:
+            data = signing.loads(token, salt=TOKEN_SALT)
+            return cls(
+                since=data['since'] and datetime.fromisoformat(data['since']),
+                until=datetime.fromisoformat(data['until']),
+                stream=data['stream'],
+                after=data['after'] and (datetime.fromisoformat(data['after'][0]), data['after'][1]),
+                placement=data.get('placement') and tuple(data['placement']),
+            )
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidToken("Invalid sync token")
+
+
+def start_cursor(token, placement):
+    """Return the cursor a request continues from, opening a new window when the last one was finished.
+
+    ``placement`` is the owner's ``(shard, generation)``, ``None`` without
+    sharding. Raises ``TokenExpired`` when tombstones the client still needs
+    were pruned, or the owner moved since and every id changed.
+    """
+    # Rows are stamped before they commit; stopping short of now keeps slow writers out of a closed window
+    until = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    if not token:
+        return SyncCursor(until=until, placement=placement)
+    cursor = SyncCursor.loads(token)
+    if cursor.placement != placement or (cursor.since and cursor.since < tombstone_horizon()):
+        raise TokenExpired()
+    if cursor.finished:
+        return SyncCursor(since=cursor.until, until=max(until, cursor.until), placement=placement)
+    return cursor
+
+
+def _window(queryset, field, cursor):
+    queryset = queryset.filter(**{f'{field}__lte': cursor.until})
+    if cursor.since:
+        queryset = queryset.filter(**{f'{field}__gt': cursor.since})
+    if cursor.after:
+        moment, pk = cursor.after
+        queryset = queryset.filter(Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'pk__gt': pk}))
+    return queryset.order_by(field, 'pk')
+
+
+def read_changes(owner, cursor, limit, context=None):
+    """Return up to ``limit`` changes of ``owner`` after ``cursor`` and the cursor to continue from.
+
+    Each stream is read with one query on its ``(owner, updated_at)`` index.
+    A first sync (no ``since``) returns every row and no deletions.
+    """
+    changes = {stream.name: [] for stream in STREAMS}
+    changes['deleted'] = []
+    stream, after = cursor.stream, cursor.after
+    while stream <= DELETED and limit:
+        if stream == DELETED:
+            if cursor.since is None:
+                stream += 1
+                continue
+            field = 'deleted_at'
+            queryset = Tombstone.objects.filter(owner_id=owner.pk)
+        else:
+            field = 'updated_at'
+            queryset = STREAMS[stream].model.objects.filter(owner=owner).select_related(*STREAMS[stream].related)
+        rows = list(_window(queryset, field, SyncCursor(cursor.since, cursor.until, stream, after))[:limit + 1])
+        full = len(rows) > limit
+        rows = rows[:limit]
+        if stream == DELETED:
+            changes['deleted'] = [
+                {'type': STREAM_NAMES[row.model], 'id': row.object_id} for row in rows
+            ]
+        else:
+            if STREAMS[stream].model is Transaction:
+                attach_tag_names(rows)
+            changes[STREAMS[stream].name] = STREAMS[stream].serializer_class(rows, many=True, context=context).data
+        limit -= len(rows)
+        if full:
+            after = (getattr(rows[-1], field), rows[-1].pk)
+            break
+        stream, after = stream + 1, None
+    return changes, SyncCursor(cursor.since, cursor.until, stream, after, cursor.placement)
@@ -0,0 +1,20 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from finances.models import Tombstone
+
+
+def record_tombstone(instance):
+    """Remember that ``instance`` was deleted, on the database it was deleted from."""
+    Tombstone.objects.using(instance._state.db).create(
+        owner_id=instance.owner_id, model=instance._meta.label_lower, object_id=instance.pk
+    )
+
+
+def tombstone_horizon():
+    """Oldest moment for which every deletion is still on record."""
+    return timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+
+
+def prune_tombstones():
+    return Tombstone.objects.filter(deleted_at__lt=tombstone_horizon()).delete()[0]
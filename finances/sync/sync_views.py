@@ -0,0 +1,45 @@
+from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from finances.sharding.owner_shards import OwnerShardMixin, shard_placement, sharding_enabled
+from finances.sync.sync_feed import InvalidToken, TokenExpired, read_changes, start_cursor
+
+
+class SyncViewSet(OwnerShardMixin, viewsets.ViewSet):
+    """Changes to the user's categories, accounts, suppliers and transactions since a sync token.
+
+    Call without ``since`` for a full snapshot, then keep passing back the
+    returned ``next`` token: while ``has_more`` is true it continues the
+    current batch sequence, afterwards it asks for what changed since.
+    Deletions are listed under ``deleted``. A ``410`` means the token is too
+    old to continue from and the client must start over without ``since``.
+    """
+    # No ReadReplicaMixin: a lagging replica could close a window over rows it has not received yet
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', settings.SYNC_BATCH_SIZE)), settings.SYNC_BATCH_SIZE)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"error": "limit must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        placement = shard_placement(request.user.pk) if sharding_enabled() else None
+        try:
+            cursor = start_cursor(request.query_params.get('since'), placement)
+        except InvalidToken as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        except TokenExpired:
+            return Response(
+                {"error": "Sync token expired, resynchronize without 'since'"},
+                status=status.HTTP_410_GONE
+            )
+
+        changes, cursor = read_changes(request.user, cursor, limit, context={'request': request})
+        return Response({
+            **changes,
+            'next': cursor.dumps(),
+            'has_more': not cursor.finished,
+        })
@@ -0,0 +1,129 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+from business_suppliers.models import Supplier
+from core.throttles import buckets
+from finances.models import Account, Category, Transaction
+from finances.sync.sync_feed import SyncCursor
+from django.urls import reverse
+from rest_framework import status
+from datetime import timedelta
+from decimal import Decimal
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncViewSetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(
+            name='Checking', slug='checking', balance=Decimal('100.00'), owner=self.user
+        )
+        self.supplier = Supplier.objects.create(name='Bakery', slug='bakery', owner=self.user)
+        self.transactions = [self.create_transaction(f'Entry {i}') for i in range(3)]
+        Category.objects.create(name='Food', slug='food', owner=self.other)
+
+    def create_transaction(self, description):
+        return Transaction.objects.create(
+            kind_of_transaction='EXPENSE',
+            amount=Decimal('10.00'),
+            description=description,
+            category=self.category,
+            account=self.account,
+            owner=self.user
+        )
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get(reverse('sync-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def ids(self, data, stream):
+        return [row['id'] for row in data[stream]]
+
+    def test_first_sync_returns_everything(self):
+        data = self.sync()
+        self.assertEqual(self.ids(data, 'categories'), [self.category.pk])
+        self.assertEqual(self.ids(data, 'accounts'), [self.account.pk])
+        self.assertEqual(self.ids(data, 'suppliers'), [self.supplier.pk])
+        self.assertEqual(self.ids(data, 'transactions'), [transaction.pk for transaction in self.transactions])
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_delta_returns_only_changes_and_tombstones(self):
+        token = self.sync()['next']
+        self.assertEqual(self.sync(token)['transactions'], [])
+
+        edited, deleted = self.transactions[:2]
+        edited.description = 'Edited'
+        edited.save()
+        deleted_id = deleted.pk
+        deleted.delete()
+        added = self.create_transaction('Added')
+        supplier_id = self.supplier.pk
+        self.supplier.delete()
+
+        with self.assertNumQueries(6):
+            # One indexed query per stream, the tombstones and the changed transactions' tags
+            data = self.sync(token)
+        self.assertEqual(self.ids(data, 'transactions'), [edited.pk, added.pk])
+        self.assertEqual(data['categories'], [])
+        self.assertEqual(data['deleted'], [
+            {'type': 'transactions', 'id': deleted_id},
+            {'type': 'suppliers', 'id': supplier_id},
+        ])
+        self.assertEqual(self.sync(data['next'])['transactions'], [])
+
+    def test_batches_continue_without_gaps_or_repeats(self):
+        token = self.sync()['next']
+        for transaction in self.transactions:
+            transaction.description = 'Edited'
+            transaction.save()
+        deleted_id = self.transactions[2].pk
+        self.transactions[2].delete()
+
+        seen = []
+        data = {'next': token, 'has_more': True}
+        pages = 0
+        while data['has_more']:
+            data = self.sync(data['next'], limit=1)
+            seen += [('transactions', row['id']) for row in data['transactions']]
+            seen += [(row['type'], row['id']) for row in data['deleted']]
+            pages += 1
+        self.assertEqual(seen, [
+            ('transactions', self.transactions[0].pk),
+            ('transactions', self.transactions[1].pk),
+            ('transactions', deleted_id),
+        ])
+        self.assertEqual(pages, 3)
+
+    def test_category_moves_sync_their_subtree(self):
+        child = Category.objects.create(name='Bread', slug='bread', parent=self.category, owner=self.user)
+        root = Category.objects.create(name='Home', slug='home', owner=self.user)
+        token = self.sync()['next']
+        self.category.parent = root
+        self.category.save()
+        data = self.sync(token)
+        self.assertEqual(sorted(self.ids(data, 'categories')), sorted([self.category.pk, child.pk]))
+        self.assertEqual(
+            {row['id']: row['path'] for row in data['categories']}[child.pk],
+            f'{root.pk}/{self.category.pk}/{child.pk}/'
+        )
+
+    def test_rejects_bad_and_expired_tokens(self):
+        response = self.client.get(reverse('sync-list'), {'since': 'forged'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        expired = SyncCursor(since=now - timedelta(days=365), until=now, stream=5).dumps()
+        response = self.client.get(reverse('sync-list'), {'since': expired})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
@@ -0,0 +1,16 @@
+from rest_framework.filters import BaseFilterBackend
+from finances.tags.tag_store import normalize_tag, tagged_with
+
+
+def requested_tags(request):
+    return sorted({normalize_tag(name) for name in request.query_params.get('tags', '').split(',') if name.strip()})
+
+
+class TagFilterBackend(BaseFilterBackend):
+    """``?tags=a,b`` keeps transactions carrying every listed tag; add ``tags_match=any`` for any of them."""
+
+    def filter_queryset(self, request, queryset, view):
+        names = requested_tags(request)
+        if not names:
+            return queryset
+        return tagged_with(queryset, request.user, names, match_all=request.query_params.get('tags_match') != 'any')
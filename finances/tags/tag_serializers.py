@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from finances.tags.tag_store import MAX_TAG_LENGTH, normalize_tag, tag_names
+
+
+class TagListField(serializers.ListField):
+    """Tag names in and out; written tags are normalized and deduplicated."""
+    child = serializers.CharField(max_length=MAX_TAG_LENGTH)
+
+    def get_attribute(self, instance):
+        return tag_names(instance)
+
+    def to_internal_value(self, data):
+        return sorted({normalize_tag(name) for name in super().to_internal_value(data) if name.strip()})
+
+
+class TransactionTagsSerializer(serializers.Serializer):
+    tags = TagListField()
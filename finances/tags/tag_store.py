@@ -0,0 +1,134 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import router, transaction as db_transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from finances.models import ArchivedTransaction, Tag, Transaction, TransactionTag
+
+MAX_TAG_LENGTH = 50
+
+
+def normalize_tag(name):
+    return ' '.join(name.split()).lower()[:MAX_TAG_LENGTH]
+
+
+def tag_ids(owner_id, names):
+    """Return ``{name: id}`` for ``names`` in the owner's tag dictionary, adding the missing ones."""
+    if not names:
+        return {}
+    tags = Tag.objects.filter(owner_id=owner_id, name__in=names)
+    known = dict(tags.values_list('name', 'id'))
+    missing = [name for name in names if name not in known]
+    if missing:
+        Tag.objects.bulk_create([Tag(owner_id=owner_id, name=name) for name in missing], ignore_conflicts=True)
+        known = dict(tags.values_list('name', 'id'))
+    return known
+
+
+def add_tags(transactions, names_per_transaction):
+    """Link freshly inserted ``transactions`` to their tag names with one dictionary pass and one insert."""
+    tagged = []
+    for transaction, names in zip(transactions, names_per_transaction):
+        transaction._tag_names = sorted(names or ())
+        if names:
+            tagged.append((transaction, names))
+    if not tagged:
+        return
+    ids = tag_ids(tagged[0][0].owner_id, sorted({name for _, names in tagged for name in names}))
+    TransactionTag.objects.bulk_create([
+        TransactionTag(transaction_id=transaction.pk, tag_id=ids[name])
+        for transaction, names in tagged
+        for name in names
+    ])
+
+
+def set_tags(transaction, names):
+    """Replace the tags of ``transaction`` and save it as changed.
+
+    Saving bumps ``updated_at`` for delta sync and goes through the save
+    signals, so the change reaches the outbox, live clients and cached
+    reports like any other edit.
+    """
+    with db_transaction.atomic(using=router.db_for_write(Transaction)):
+        ids = tag_ids(transaction.owner_id, names)
+        links = TransactionTag.objects.filter(transaction_id=transaction.pk)
+        links.exclude(tag_id__in=ids.values()).delete()
+        existing = set(links.values_list('tag_id', flat=True))
+        TransactionTag.objects.bulk_create([
+            TransactionTag(transaction_id=transaction.pk, tag_id=tag_id)
+            for tag_id in ids.values() if tag_id not in existing
+        ])
+        transaction.save(update_fields=['updated_at'])
+    transaction._tag_names = sorted(names)
+
+
+def attach_tag_names(transactions):
+    """Load the tag names of hot or archived ``transactions`` with one query, for serialization."""
+    transactions = [transaction for transaction in transactions if not hasattr(transaction, '_tag_names')]
+    if not transactions:
+        return
+    names = defaultdict(list)
+    for transaction_id, name in TransactionTag.objects.filter(
+        transaction_id__in=[transaction.pk for transaction in transactions]
+    ).values_list('transaction_id', 'tag__name').order_by('tag__name'):
+        names[transaction_id].append(name)
+    for transaction in transactions:
+        transaction._tag_names = names[transaction.pk]
+
+
+def tag_names(transaction):
+    if not hasattr(transaction, '_tag_names'):
+        attach_tag_names([transaction])
+    return transaction._tag_names
+
+
+def tagged_with(queryset, owner, names, match_all=True):
+    """Restrict ``queryset`` of hot or archived transactions to those carrying ``names``.
+
+    With ``match_all`` every tag is required, otherwise any of them will do.
+    Either way the owner's dictionary and the ``(tag, transaction)`` index
+    are read inside the same query.
+    """
+    links = TransactionTag.objects.filter(tag__in=Tag.objects.filter(owner=owner, name__in=names).values('id'))
+    if match_all:
+        links = links.values('transaction_id').annotate(matched=Count('tag_id')).filter(matched=len(names))
+    return queryset.filter(pk__in=links.values('transaction_id'))
+
+
+def tag_totals(owner, start=None, end=None, archived=False):
+    """Income and expense totals per tag, from one grouped query over the tag links.
+
+    ``start`` and ``end`` are aware bounds, ``end`` exclusive. With
+    ``archived`` the links of archived transactions are added by a
+    ``UNION ALL`` branch reading them by primary key.
+    """
+    def in_range(queryset, prefix):
+        if start:
+            queryset = queryset.filter(**{f'{prefix}date__gte': start})
+        if end:
+            queryset = queryset.filter(**{f'{prefix}date__lt': end})
+        return queryset
+
+    links = TransactionTag.objects.filter(tag__owner=owner)
+    grouped = in_range(links, 'transaction__').values_list('tag__name', 'transaction__kind_of_transaction')\
+        .annotate(total=Sum('transaction__amount'), count=Count('id')).order_by()
+    if archived:
+        row = ArchivedTransaction.objects.filter(pk=OuterRef('transaction_id'))
+        grouped = grouped.union(
+            in_range(
+                links.annotate(
+                    kind=Subquery(row.values('kind_of_transaction')),
+                    amount=Subquery(row.values('amount')),
+                    date=Subquery(row.values('date')),
+                ).filter(amount__isnull=False),
+                '',
+            ).values_list('tag__name', 'kind').annotate(total=Sum('amount'), count=Count('id')).order_by(),
+            all=True,
+        )
+    totals = defaultdict(lambda: [Decimal('0'), 0])
+    for name, kind, total, count in grouped:
+        totals[name, kind][0] += total
+        totals[name, kind][1] += count
+    return [
+        {'tag': name, 'kind_of_transaction': kind, 'total': total, 'count': count}
+        for (name, kind), (total, count) in sorted(totals.items())
+    ]
@@ -0,0 +1,140 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.throttles import buckets
+from finances.archive.archive_queries import aware_cutoff
+from finances.archive.archive_runner import archive_transactions
+from finances.models import Account, Category, OutboxEvent, Tag, Transaction, TransactionTag
+from finances.tags.tag_store import set_tags
+from django.urls import reverse
+from rest_framework import status
+from datetime import timedelta
+from decimal import Decimal
+
+
+class TransactionTagTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+
+    def create_transaction(self, amount, tags=(), date=None, kind='EXPENSE'):
+        transaction = Transaction.objects.create(
+            kind_of_transaction=kind,
+            amount=Decimal(amount),
+            description='Entry',
+            date=date or timezone.now(),
+            category=self.category,
+            account=self.account,
+            owner=self.user
+        )
+        if tags:
+            set_tags(transaction, list(tags))
+        return transaction
+
+    def list_ids(self, **params):
+        response = self.client.get(reverse('transaction-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(row['id'] for row in response.data['results'])
+
+    def test_create_normalizes_tags(self):
+        response = self.client.post(reverse('transaction-list'), {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': '12.50',
+            'description': 'Dinner',
+            'date': timezone.now().isoformat(),
+            'category': self.category.pk,
+            'account': self.account.pk,
+            'tags': ['Trip  Lisbon', 'business', 'business'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['tags'], ['business', 'trip lisbon'])
+        self.assertEqual(Tag.objects.filter(owner=self.user).count(), 2)
+
+    def test_ingest_shares_the_tag_dictionary(self):
+        rows = [
+            {
+                'kind_of_transaction': 'EXPENSE', 'amount': amount, 'description': 'Taxi',
+                'date': timezone.now().isoformat(), 'category': self.category.pk, 'account': self.account.pk,
+                'tags': ['trip'],
+            }
+            for amount in ('5.00', '7.00')
+        ]
+        response = self.client.post(reverse('transaction-list'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual([row['tags'] for row in response.data], [['trip'], ['trip']])
+        self.assertEqual(Tag.objects.filter(owner=self.user).count(), 1)
+        self.assertEqual(TransactionTag.objects.count(), 2)
+
+    def test_filter_all_or_any_tags(self):
+        both = self.create_transaction('10.00', ['trip', 'business'])
+        trip = self.create_transaction('20.00', ['trip'])
+        self.create_transaction('30.00')
+        self.assertEqual(self.list_ids(tags='trip,business'), [both.pk])
+        self.assertEqual(self.list_ids(tags='trip,business', tags_match='any'), sorted([both.pk, trip.pk]))
+        self.assertEqual(self.list_ids(tags='unknown'), [])
+
+    def test_list_loads_tags_in_one_query(self):
+        for amount in ('1.00', '2.00', '3.00'):
+            self.create_transaction(amount, ['trip'])
+        response = self.client.get(reverse('transaction-list'))
+        self.assertEqual([row['tags'] for row in response.data['results']], [['trip']] * 3)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('transaction-list'))
+        self.assertEqual(sum('finances_transactiontag' in query['sql'] for query in queries), 1)
+
+    def test_replace_tags(self):
+        transaction = self.create_transaction('10.00', ['trip', 'business'])
+        response = self.client.put(
+            reverse('transaction-tags', args=[transaction.pk]), {'tags': ['Family', 'trip']}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['tags'], ['family', 'trip'])
+        self.assertEqual(
+            sorted(TransactionTag.objects.filter(transaction_id=transaction.pk).values_list('tag__name', flat=True)),
+            ['family', 'trip']
+        )
+        # The change is published like any other edit of the transaction
+        self.assertEqual(
+            OutboxEvent.objects.filter(object_id=transaction.pk).latest('id').action, OutboxEvent.Action.UPDATED
+        )
+
+    def test_replace_tags_needs_an_object(self):
+        transaction = self.create_transaction('10.00', ['trip'])
+        response = self.client.put(reverse('transaction-tags', args=[transaction.pk]), ['family'], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_by_tag_totals_include_archived_links(self):
+        self.create_transaction('8.10', ['trip'], date=aware_cutoff() - timedelta(days=10))
+        self.create_transaction('12.50', ['trip', 'business'])
+        self.create_transaction('100.00', ['business'], kind='INCOME')
+        self.assertEqual(archive_transactions(), 1)
+        # The account currencies, then the totals
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('transaction-by-tag'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['tag'], row['kind_of_transaction'], row['total'], row['count']) for row in response.data],
+            [
+                ('business', 'EXPENSE', Decimal('12.50'), 1),
+                ('business', 'INCOME', Decimal('100.00'), 1),
+                ('trip', 'EXPENSE', Decimal('20.60'), 2),
+            ]
+        )
+        response = self.client.get(reverse('transaction-by-tag'), {'start_date': timezone.localdate().isoformat()})
+        self.assertEqual([row['total'] for row in response.data if row['tag'] == 'trip'], [Decimal('12.50')])
+
+    def test_delete_removes_links_but_archive_keeps_them(self):
+        archived = self.create_transaction('8.10', ['trip'], date=aware_cutoff() - timedelta(days=10))
+        deleted = self.create_transaction('12.50', ['trip'])
+        archive_transactions()
+        deleted.delete()
+        self.assertEqual(list(TransactionTag.objects.values_list('transaction_id', flat=True)), [archived.pk])
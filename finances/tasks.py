@@ -0,0 +1,72 @@
+from celery import shared_task
+from finances.anomalies.anomaly_detection import anomaly_batches, detect_batch
+from finances.archive.archive_runner import archive_transactions as archive_old_transactions
+from finances.outbox.outbox_dispatcher import dispatch_outbox as dispatch_outbox_events
+from finances.receipts.receipt_processing import process_receipt as process_receipt_image, stale_receipts
+from finances.reconciliation.reconciliation_runner import run_reconciliation
+from finances.recurring.recurring_materializer import materialize_due_occurrences
+from finances.reports.report_jobs import execute_report_job
+from finances.sharding.owner_shards import each_shard, owner_shard
+from finances.sync.sync_tombstones import prune_tombstones as prune_old_tombstones
+
+
+@shared_task
+def materialize_recurring_transactions():
+    return sum(materialize_due_occurrences() for _ in each_shard())
+
+
+@shared_task
+def reconcile_accounts():
+    # One report per shard
+    return [run_reconciliation().pk for _ in each_shard()]
+
+
+@shared_task
+def run_report_job(job_id, owner_id=None):
+    with owner_shard(owner_id):
+        return execute_report_job(job_id)
+
+
+@shared_task
+def process_receipt(transaction_id, owner_id=None):
+    with owner_shard(owner_id):
+        receipt = process_receipt_image(transaction_id)
+        return receipt and receipt.status
+
+
+@shared_task
+def requeue_stale_receipts():
+    # Receipts whose message was lost or whose worker died
+    stale = [receipt for _ in each_shard() for receipt in stale_receipts()]
+    for transaction_id, owner_id in stale:
+        process_receipt.delay(transaction_id, owner_id)
+    return len(stale)
+
+
+@shared_task
+def archive_transactions():
+    return sum(archive_old_transactions() for _ in each_shard())
+
+
+@shared_task
+def dispatch_outbox():
+    return sum(dispatch_outbox_events() for _ in each_shard())
+
+
+@shared_task
+def prune_tombstones():
+    return sum(prune_old_tombstones() for _ in each_shard())
+
+
+@shared_task
+def detect_anomalies():
+    # Batches fan out over Celery's prefork pool; its daemonic workers cannot start a pool of their own
+    batches = anomaly_batches()
+    for alias, owner_ids in batches:
+        detect_anomaly_batch.delay(alias, owner_ids)
+    return len(batches)
+
+
+@shared_task
+def detect_anomaly_batch(alias, owner_ids):
+    return detect_batch(alias, owner_ids)
@@ -0,0 +1,75 @@
+from datetime import datetime, time, timedelta
+import django_filters
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from finances.models import ArchivedTransaction, Transaction
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class TransactionFilter(django_filters.FilterSet):
+    """Range and multi-value filters, each served by one of the ``(owner, ...)`` composite indexes.
+
+    ``date_after``/``date_before`` are inclusive local days, also accepted
+    as ``start_date``/``end_date`` like the report endpoints; ``category``,
+    ``account`` and ``supplier`` take comma separated ids.
+    """
+    date_after = django_filters.DateFilter(method='filter_date_after')
+    date_before = django_filters.DateFilter(method='filter_date_before')
+    start_date = django_filters.DateFilter(method='filter_date_after')
+    end_date = django_filters.DateFilter(method='filter_date_before')
+    amount_min = django_filters.NumberFilter(field_name='amount', lookup_expr='gte')
+    amount_max = django_filters.NumberFilter(field_name='amount', lookup_expr='lte')
+    category = NumberInFilter(field_name='category_id')
+    account = NumberInFilter(field_name='account_id')
+    supplier = NumberInFilter(field_name='supplier_transaction__supplier_id')
+    has_supplier = django_filters.BooleanFilter(field_name='supplier_transaction', lookup_expr='isnull', exclude=True)
+
+    class Meta:
+        model = Transaction
+        fields = ['kind_of_transaction']
+
+    def filter_date_after(self, queryset, name, value):
+        return queryset.filter(date__gte=_day_start(value))
+
+    def filter_date_before(self, queryset, name, value):
+        return queryset.filter(date__lt=_day_start(value + timedelta(days=1)))
+
+
+def date_bounds(params):
+    """Return the ``(first, last)`` days requested by either pair of date filters, ``None`` when unbounded.
+
+    ``params`` must already have been accepted by ``TransactionFilter``.
+    """
+    form = TransactionFilter(params).form
+    form.is_valid()
+    data = form.cleaned_data
+    return (
+        max(filter(None, (data.get('date_after'), data.get('start_date'))), default=None),
+        min(filter(None, (data.get('date_before'), data.get('end_date'))), default=None),
+    )
+
+
+class ArchivedTransactionFilter(TransactionFilter):
+    # Archived rows keep the supplier key in a plain column
+    supplier = NumberInFilter(field_name='supplier_id')
+    has_supplier = django_filters.BooleanFilter(field_name='supplier_id', lookup_expr='isnull', exclude=True)
+
+    class Meta(TransactionFilter.Meta):
+        model = ArchivedTransaction
+
+
+FILTERSETS = {Transaction: TransactionFilter, ArchivedTransaction: ArchivedTransactionFilter}
+
+
+class TransactionFilterBackend(DjangoFilterBackend):
+    """Apply the same query parameters to hot and archived transactions."""
+
+    def get_filterset_class(self, view, queryset=None):
+        return FILTERSETS.get(queryset.model)
@@ -0,0 +1,105 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+from business_suppliers.models import Supplier, SupplierTransaction
+from core.throttles import buckets
+from finances.archive.archive_runner import archive_transactions
+from finances.models import Account, Category, Transaction
+from finances.transactions.transaction_filters import TransactionFilter
+from django.urls import reverse
+from rest_framework import status
+from datetime import date, datetime, time
+from decimal import Decimal
+
+
+class TransactionFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.rent = Category.objects.create(name='Rent', slug='rent', owner=self.user)
+        self.other = Category.objects.create(name='Other', slug='other', owner=self.user)
+        self.checking = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+        self.savings = Account.objects.create(name='Savings', slug='savings', owner=self.user)
+        self.supplier = Supplier.objects.create(name='Bakery', slug='bakery', owner=self.user)
+
+        self.bread = self.create_transaction('4.50', date(2024, 1, 10), self.food, self.checking)
+        SupplierTransaction.objects.create(supplier=self.supplier, transaction=self.bread, owner=self.user)
+        self.january_rent = self.create_transaction('900.00', date(2024, 1, 31), self.rent, self.checking)
+        self.gift = self.create_transaction('50.00', date(2024, 2, 1), self.other, self.savings)
+
+    def create_transaction(self, amount, day, category, account):
+        return Transaction.objects.create(
+            kind_of_transaction='EXPENSE',
+            amount=Decimal(amount),
+            description='Entry',
+            date=timezone.make_aware(datetime.combine(day, time(23, 30))),
+            category=category,
+            account=account,
+            owner=self.user
+        )
+
+    def list_ids(self, **params):
+        response = self.client.get(reverse('transaction-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return sorted(row['id'] for row in response.data['results'])
+
+    def plan(self, **params):
+        queryset = TransactionFilter(params, queryset=Transaction.objects.filter(owner=self.user)).qs
+        return queryset.explain()
+
+    def test_date_range_includes_both_days(self):
+        self.assertEqual(
+            self.list_ids(date_after='2024-01-10', date_before='2024-01-31'),
+            sorted([self.bread.pk, self.january_rent.pk])
+        )
+        self.assertEqual(self.list_ids(date_after='2024-02-01'), [self.gift.pk])
+        # start_date/end_date are the same filters under the report endpoints' names
+        self.assertEqual(
+            self.list_ids(start_date='2024-01-10', end_date='2024-01-31'),
+            self.list_ids(date_after='2024-01-10', date_before='2024-01-31')
+        )
+
+    def test_amount_range(self):
+        self.assertEqual(self.list_ids(amount_min='10', amount_max='900'), sorted([self.january_rent.pk, self.gift.pk]))
+
+    def test_multi_value_categories_and_accounts(self):
+        self.assertEqual(
+            self.list_ids(category=f'{self.food.pk},{self.rent.pk}'), sorted([self.bread.pk, self.january_rent.pk])
+        )
+        self.assertEqual(self.list_ids(account=self.savings.pk), [self.gift.pk])
+
+    def test_supplier_filters(self):
+        self.assertEqual(self.list_ids(supplier=self.supplier.pk), [self.bread.pk])
+        self.assertEqual(self.list_ids(has_supplier='false'), sorted([self.january_rent.pk, self.gift.pk]))
+
+    @override_settings(ARCHIVE_HORIZON_DAYS=30)
+    def test_old_date_after_reads_archived_rows(self):
+        self.assertEqual(archive_transactions(), 3)
+        self.assertEqual(self.list_ids(date_after='2024-01-01', supplier=self.supplier.pk), [self.bread.pk])
+        self.assertEqual(self.list_ids(date_after='2024-01-15', amount_max='100'), [self.gift.pk])
+
+    def test_rejects_malformed_values(self):
+        response = self.client.get(reverse('transaction-list'), {'date_after': '2024-13-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('transaction-list'), {'category': 'food'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filters_search_composite_indexes(self):
+        # SQLite query plans: every filter seeks an owner-leading index instead of scanning the table
+        cases = [
+            ({'date_after': '2024-01-01', 'date_before': '2024-01-31'}, 'transaction_owner_date_idx (owner_id=? AND date>? AND date<?)'),
+            ({'amount_min': '10', 'amount_max': '20'}, 'transaction_amount_idx (owner_id=? AND amount>? AND amount<?)'),
+            ({'category': str(self.food.pk)}, 'transaction_category_idx (owner_id=? AND category_id=?)'),
+            ({'account': str(self.checking.pk)}, 'transaction_account_idx (owner_id=? AND account_id=?)'),
+            ({'supplier': str(self.supplier.pk)}, 'suppliertransaction_supplier_id_transaction_id'),
+        ]
+        for params, index in cases:
+            plan = self.plan(**params)
+            self.assertIn(index, plan, params)
+            self.assertNotIn('SCAN', plan, params)
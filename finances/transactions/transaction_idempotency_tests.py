@@ -0,0 +1,89 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+from core.throttles import buckets
+from business_suppliers.models import Supplier, SupplierTransaction
+from core.idempotency import IN_FLIGHT, IdempotencyMixin
+from finances.models import Account, Category, Transaction
+from django.urls import reverse
+from rest_framework import status
+from types import SimpleNamespace
+
+
+class IdempotencyKeyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+        self.payload = {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': '12.50',
+            'description': 'Lunch',
+            'category': self.category.id,
+            'account': self.account.id,
+        }
+
+    def post(self, name, data, key, **kwargs):
+        return self.client.post(reverse(name, kwargs=kwargs), data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        first = self.post('transaction-list', self.payload, 'abc')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            retry = self.post('transaction-list', self.payload, 'abc')
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+        # A new key is a new request
+        self.post('transaction-list', {**self.payload, 'description': 'Dinner'}, 'def')
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_key_reused_with_other_body(self):
+        self.post('account-list', {'name': 'Savings', 'slug': 'savings'}, 'abc')
+        response = self.post('account-list', {'name': 'Other', 'slug': 'other'}, 'abc')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Account.objects.count(), 2)
+
+    def test_validation_errors_are_replayed(self):
+        first = self.post('account-list', {'name': 'Savings', 'slug': 'checking'}, 'abc')
+        retry = self.post('account-list', {'name': 'Savings', 'slug': 'checking'}, 'abc')
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry.data, first.data)
+
+    def test_supplier_transaction_retry(self):
+        supplier = Supplier.objects.create(name='Acme', slug='acme', owner=self.user)
+        first = self.post('supplier-transaction-list', {'transaction': self.payload}, 'abc', supplier_slug='acme')
+        retry = self.post('supplier-transaction-list', {'transaction': self.payload}, 'abc', supplier_slug='acme')
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(SupplierTransaction.objects.filter(supplier=supplier).count(), 1)
+
+    def test_concurrent_retry_conflicts(self):
+        # Another worker has claimed the key and not answered yet
+        request = SimpleNamespace(user=self.user, path=reverse('transaction-list'))
+        cache.set(IdempotencyMixin()._idempotency_cache_key(request, 'abc'), IN_FLIGHT)
+        response = self.post('transaction-list', self.payload, 'abc')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_uploads_are_compared_by_content(self):
+        def upload(amount):
+            statement = f"date,description,amount,account,category\n2024-03-05,Lunch,{amount},checking,food\n"
+            return self.client.post(
+                reverse('transaction-import-transactions'),
+                {'file': SimpleUploadedFile('statement.csv', statement.encode())},
+                HTTP_IDEMPOTENCY_KEY='abc'
+            )
+
+        first = upload('-12.50')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED, first.data)
+        self.assertEqual(upload('-12.50')['Idempotent-Replayed'], 'true')
+        # Same file name, other contents
+        self.assertEqual(upload('-99.00').status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Transaction.objects.count(), 1)
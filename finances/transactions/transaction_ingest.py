@@ -0,0 +1,105 @@
+import csv
+import io
+from django.db import router, transaction as db_transaction
+from finances.budgets.budget_rollups import apply_bulk_expenses
+from finances.ledger_versions import bump_ledger_version_on_commit
+from finances.models import Account, Category, OutboxEvent, Transaction
+from finances.outbox.outbox_events import record_events
+from finances.tags.tag_store import add_tags
+
+BATCH_SIZE = 1000
+IMPORT_COLUMNS = ('date', 'description', 'amount', 'account')
+
+
+def ingest_transactions(owner, rows, batch_size=BATCH_SIZE):
+    """Store validated transaction ``rows`` of ``owner``, answering duplicates with the stored row.
+
+    Returns ``(transaction, created)`` pairs in input order. Each batch looks
+    its fingerprints up with one indexed query, collapses repeats within the
+    batch onto their first occurrence and inserts the rest with one
+    ``bulk_create``, plus one insert for their outbox events.
+    """
+    results = []
+    created_any = False
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        # Tags are links, not columns; they are added once the new rows have ids
+        tags = [row.get('tags') for row in chunk]
+        batch = [
+            Transaction(owner=owner, **{field: value for field, value in row.items() if field != 'tags'})
+            for row in chunk
+        ]
+        for transaction in batch:
+            transaction.fingerprint = transaction.compute_fingerprint()
+        seen = {}
+        for transaction in Transaction.objects.filter(
+            owner=owner, fingerprint__in={transaction.fingerprint for transaction in batch}
+        ).select_related('category', 'account').order_by('id'):
+            seen.setdefault(transaction.fingerprint, transaction)
+
+        new = []
+        new_tags = []
+        for transaction, names in zip(batch, tags):
+            if transaction.fingerprint in seen:
+                results.append((seen[transaction.fingerprint], False))
+            else:
+                seen[transaction.fingerprint] = transaction
+                new.append(transaction)
+                new_tags.append(names)
+                results.append((transaction, True))
+        if new:
+            with db_transaction.atomic(using=router.db_for_write(Transaction)):
+                Transaction.objects.bulk_create(new)
+                # bulk_create skips the signals that keep budgets current
+                apply_bulk_expenses(new)
+                record_events(new, OutboxEvent.Action.CREATED)
+                add_tags(new, new_tags)
+            created_any = True
+    if created_any:
+        bump_ledger_version_on_commit(owner.pk, router.db_for_write(Transaction))
+    return results
+
+
+class StatementError(ValueError):
+    pass
+
+
+def read_statement(owner, file):
+    """Turn an uploaded CSV statement into serializer input for ``TransactionSerializer``.
+
+    Columns are ``date, description, amount, account`` plus optional
+    ``category`` and ``kind_of_transaction``; accounts and categories are
+    given by slug. Without a kind, negative amounts are expenses and
+    positive ones income. Rows without a category get a predicted one.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig'))
+    missing = set(IMPORT_COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise StatementError(f"Missing columns: {', '.join(sorted(missing))}")
+    accounts = dict(Account.objects.filter(owner=owner).values_list('slug', 'id'))
+    categories = dict(Category.objects.filter(owner=owner).values_list('slug', 'id'))
+
+    rows = []
+    for line, record in enumerate(reader, start=2):
+        # Short rows leave the missing columns as None
+        empty = [column for column in IMPORT_COLUMNS if not (record[column] or '').strip()]
+        if empty:
+            raise StatementError(f"Line {line}: missing {', '.join(empty)}")
+        try:
+            amount = record['amount'].strip()
+            kind = record.get('kind_of_transaction') or (
+                Transaction.KindOfTransaction.EXPENSE if amount.startswith('-') else Transaction.KindOfTransaction.INCOME
+            )
+            row = {
+                'date': record['date'],
+                'description': record['description'],
+                'amount': amount.lstrip('-'),
+                'kind_of_transaction': kind,
+                'account': accounts[record['account']],
+            }
+            if record.get('category'):
+                row['category'] = categories[record['category']]
+            rows.append(row)
+        except KeyError as error:
+            raise StatementError(f"Line {line}: unknown account or category {error}")
+    return rows
@@ -0,0 +1,118 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from business_suppliers.models import Supplier
+from core.throttles import buckets
+from finances.models import Account, Budget, BudgetPeriod, Category, Transaction
+from django.urls import reverse
+from rest_framework import status
+from decimal import Decimal
+from io import StringIO
+
+
+class TransactionIngestTest(TestCase):
+    def setUp(self):
+        # Imports are expensive; start every test with a full throttle bucket
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+
+    def payload(self, description='ACME  Corp.', amount='12.50', day='2024-03-05T10:00:00Z'):
+        return {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': amount,
+            'date': day,
+            'description': description,
+            'category': self.category.id,
+            'account': self.account.id,
+        }
+
+    def test_single_create_returns_existing_duplicate(self):
+        first = self.client.post(reverse('transaction-list'), self.payload(), format='json')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        again = self.client.post(
+            reverse('transaction-list'), self.payload('acme corp', day='2024-03-05T18:30:00Z'), format='json'
+        )
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data['id'], first.data['id'])
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_bulk_create(self):
+        Budget.objects.create(category=self.category, period='MONTHLY', limit=Decimal('100.00'), owner=self.user)
+        self.client.post(reverse('transaction-list'), self.payload(), format='json')
+        rows = [self.payload(), self.payload('Bakery'), self.payload('bakery!')]
+        with self.assertNumQueries(10):
+            # Validation reads the batch's categories and accounts once each; storing the batch is
+            # one fingerprint lookup, then in a savepoint one insert, one budget lookup and update
+            # and one outbox insert, and the already stored duplicate's tags are read for the response
+            response = self.client.post(reverse('transaction-list'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ids = [row['id'] for row in response.data]
+        self.assertEqual(ids[1], ids[2])
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertEqual(BudgetPeriod.objects.get().spent, Decimal('25.00'))
+
+    def test_import_statement(self):
+        statement = (
+            "date,description,amount,account,category\n"
+            "2024-03-05,ACME Corp,-12.50,checking,food\n"
+            "2024-03-06,Salary,1000.00,checking,food\n"
+        ).encode()
+        response = self.client.post(
+            reverse('transaction-import-transactions'),
+            {'file': SimpleUploadedFile('statement.csv', statement)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['created'], response.data['duplicates']), (2, 0))
+        self.assertEqual(response.data['transactions'][1]['kind_of_transaction'], 'INCOME')
+
+        response = self.client.post(
+            reverse('transaction-import-transactions'),
+            {'file': SimpleUploadedFile('statement.csv', statement)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['duplicates']), (0, 2))
+
+        response = self.client.post(
+            reverse('transaction-import-transactions'),
+            {'file': SimpleUploadedFile('statement.csv', b"date,description,amount,account,category\n2024-03-05,X,1,savings,food\n")}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Line 2', response.data['error'])
+
+        response = self.client.post(
+            reverse('transaction-import-transactions'),
+            {'file': SimpleUploadedFile('statement.csv', b"date,description,amount,account\n2024-03-05,X,1,checking\n2024-03-06,Y\n")}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'Line 3: missing amount, account')
+
+    def test_supplier_transaction_duplicate(self):
+        supplier = Supplier.objects.create(name='Acme', slug='acme', owner=self.user)
+        url = reverse('supplier-transaction-list', kwargs={'supplier_slug': supplier.slug})
+        first = self.client.post(url, {'transaction': self.payload()}, format='json')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        again = self.client.post(url, {'transaction': self.payload()}, format='json')
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data['id'], first.data['id'])
+
+    def test_dedupe_command(self):
+        for description in ('Lunch', 'LUNCH', 'lunch.', 'Dinner'):
+            Transaction.objects.create(
+                amount=Decimal('9.00'), description=description, category=self.category,
+                account=self.account, owner=self.user
+            )
+        out = StringIO()
+        call_command('dedupe_transactions', '--dry-run', stdout=out)
+        self.assertIn('1 duplicate groups, 2 extra rows', out.getvalue())
+        self.assertEqual(Transaction.objects.count(), 4)
+
+        call_command('dedupe_transactions', stdout=out)
+        self.assertEqual(
+            sorted(Transaction.objects.values_list('description', flat=True)), ['Dinner', 'Lunch']
+        )
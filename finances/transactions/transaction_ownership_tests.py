@@ -0,0 +1,59 @@
+from django.test import RequestFactory, TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.throttles import buckets
+from finances.models import Account, Category, Transaction
+from finances.transactions.transaction_serializers import TransactionSerializer
+from django.urls import reverse
+from rest_framework import status
+
+
+class OwnedRelatedFieldTest(TestCase):
+    def setUp(self):
+        buckets.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.rent = Category.objects.create(name='Rent', slug='rent', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.their_category = Category.objects.create(name='Theirs', slug='theirs', owner=other)
+        self.their_account = Account.objects.create(name='Theirs', slug='theirs', owner=other)
+
+    def payload(self, category, account, description='Market'):
+        return {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': '10.00',
+            'date': timezone.now().isoformat(),
+            'description': description,
+            'category': category.pk,
+            'account': account.pk,
+        }
+
+    def test_other_owners_rows_are_not_found(self):
+        response = self.client.post(
+            reverse('transaction-list'), self.payload(self.their_category, self.their_account), format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['category'][0].code, 'does_not_exist')
+        self.assertEqual(response.data['account'][0].code, 'does_not_exist')
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_batch_reads_each_relation_once(self):
+        request = RequestFactory().post(reverse('transaction-list'))
+        request.user = self.user
+        rows = [
+            self.payload(category, self.account, f'Row {index}')
+            for index, category in enumerate([self.food, self.rent, self.food, self.rent])
+        ]
+        serializer = TransactionSerializer(data=rows, many=True, context={'request': request})
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertIs(serializer.validated_data[0]['category'], serializer.validated_data[2]['category'])
+
+        # Later serializers of the same request reuse the rows already read
+        serializer = TransactionSerializer(data=rows[0], context={'request': request})
+        with self.assertNumQueries(0):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
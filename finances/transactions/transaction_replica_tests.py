@@ -0,0 +1,50 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from finances.models import Account, Category, Transaction
+from django.urls import reverse
+from rest_framework import status
+
+
+@override_settings(READ_REPLICA_ALIAS='replica')
+class ReadReplicaRoutingTest(TestCase):
+    # The test runner builds "replica" as a second, independent SQLite database,
+    # so rows written to the primary are only visible there if routing allows it.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food', slug='food', owner=self.user)
+        self.account = Account.objects.create(name='Checking', slug='checking', owner=self.user)
+
+    def post_transaction(self):
+        return self.client.post(reverse('transaction-list'), {
+            'kind_of_transaction': 'EXPENSE',
+            'amount': '10.00',
+            'description': 'Lunch',
+            'category': self.category.id,
+            'account': self.account.id,
+        })
+
+    def test_reads_go_to_replica(self):
+        response = self.client.get(reverse('category-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_writes_go_to_primary_and_stick(self):
+        self.assertEqual(self.post_transaction().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Transaction.objects.using('default').count(), 1)
+        self.assertEqual(Transaction.objects.using('replica').count(), 0)
+
+        response = self.client.get(reverse('transaction-list'))
+        self.assertEqual(response.data['count'], 1)
+
+    @override_settings(READ_YOUR_WRITES_SECONDS=0)
+    def test_stickiness_expires(self):
+        self.post_transaction()
+        response = self.client.get(reverse('transaction-list'))
+        self.assertEqual(response.data['count'], 0)
@@ -1,12 +1,60 @@
 from rest_framework import serializers
-from finances.models import Transaction
+from core.owner_fields import OwnedPrimaryKeyRelatedField, load_owned
+from finances.models import Category, Transaction
+from finances.categorizer.category_classifier import predict_categories
 from finances.categories.category_serializers import CategorySerializer
 from finances.accounts.account_serializers import AccountSerializer
+from finances.tags.tag_serializers import TagListField
+from finances.tags.tag_store import add_tags
+
+
+def categorize(request, rows):
+    """Give validated ``rows`` without a category the owner's predicted one, with one batched prediction.
+
+    Returns the indexes of rows that are still missing a category.
+    """
+    pending = [row for row in rows if row.get('category') is None]
+    if not pending:
+        return []
+    predictions = predict_categories(request.user.pk, [row['description'] for row in pending])
+    categories = load_owned(
+        request,
+        Category.objects.filter(owner_id=request.user.pk),
+        {prediction[0] for prediction in predictions if prediction}
+    )
+    for row, prediction in zip(pending, predictions):
+        category = prediction and categories.get((Category, prediction[0]))
+        if category:
+            row['category'] = category
+            row['ai_processed'] = True
+            row['ai_confidence_score'] = prediction[1]
+    return [index for index, row in enumerate(rows) if row.get('category') is None]
+
+
+UNCATEGORIZED = "No category given and none could be predicted from the description"
+
+
+class TransactionListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        # One query per relation for the whole batch instead of one per distinct id
+        if isinstance(data, list):
+            for name in ('category', 'account'):
+                self.child.fields[name].prefetch([row[name] for row in data if isinstance(row, dict) and name in row])
+        return super().to_internal_value(data)
+
+    def validate(self, rows):
+        missing = categorize(self.context['request'], rows)
+        if missing:
+            raise serializers.ValidationError({'category': [f"Row {index}: {UNCATEGORIZED}" for index in missing]})
+        return rows
+
 
 class TransactionSerializer(serializers.ModelSerializer):
     category_details = CategorySerializer(source='category', read_only=True)
     account_details = AccountSerializer(source='account', read_only=True)
-    
+    tags = TagListField(required=False)
+    serializer_related_field = OwnedPrimaryKeyRelatedField
+
     class Meta:
         model = Transaction
         fields = [
@@ -19,10 +67,18 @@ class TransactionSerializer(serializers.ModelSerializer):
             'category_details',
             'account',
             'account_details',
+            'tags',
+            'ai_processed',
+            'ai_confidence_score',
+            'original_text',
+            'receipt_image',
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ['owner']
+        read_only_fields = ['owner', 'ai_processed', 'ai_confidence_score', 'receipt_image']
+        # Left out, the category is predicted from the description
+        extra_kwargs = {'category': {'required': False}}
+        list_serializer_class = TransactionListSerializer
 
     def validate_amount(self, value):
         if value <= 0:
@@ -31,19 +87,15 @@ class TransactionSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
-        return super().create(validated_data)
+        tags = validated_data.pop('tags', None)
+        transaction = super().create(validated_data)
+        # A new row has no links to replace and nothing changed since its CREATED event
+        add_tags([transaction], [tags])
+        return transaction
 
     def validate(self, data):
-        # Ensure the category belongs to the user
-        if 'category' in data:
-            category = data['category']
-            if category.owner != self.context['request'].user:
-                raise serializers.ValidationError({"category": "Invalid category selected"})
-        
-        # Ensure the account belongs to the user
-        if 'account' in data:
-            account = data['account']
-            if account.owner != self.context['request'].user:
-                raise serializers.ValidationError({"account": "Invalid account selected"})
-        
+        # Bulk rows are categorized together by TransactionListSerializer
+        if not isinstance(self.parent, serializers.ListSerializer) and categorize(self.context['request'], [data]):
+            raise serializers.ValidationError({"category": UNCATEGORIZED})
+        # Categories and accounts of other owners are rejected by OwnedPrimaryKeyRelatedField
         return data 
\ No newline at end of file
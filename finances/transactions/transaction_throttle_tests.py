@@ -0,0 +1,82 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.request import Request
+from core.throttles import BucketRegistry, buckets, report_cost
+from django.urls import reverse
+from rest_framework import status
+
+
+@override_settings(THROTTLE_BUCKET_SIZE=40, THROTTLE_REFILL_RATE=0.01, THROTTLE_SYNC_SECONDS=0)
+class CostThrottleTest(TestCase):
+    def setUp(self):
+        buckets.clear()
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+    def test_expensive_reports_spend_more(self):
+        for _ in range(2):
+            response = self.client.get(reverse('transaction-by-category'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse('transaction-by-category'))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+        # Another user has a bucket of their own
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(reverse('transaction-list')).status_code, status.HTTP_200_OK)
+
+    def test_full_history_reports_ignore_range(self):
+        url = reverse('transaction-by-account')
+        yesterday = {'start_date': '2024-03-04', 'end_date': '2024-03-05'}
+        for _ in range(2):
+            self.assertEqual(self.client.get(url, yesterday).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url, yesterday).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_report_cost_follows_range(self):
+        cost = report_cost()
+        factory = APIRequestFactory()
+        self.assertEqual(cost(Request(factory.get('/'))), 20)
+        request = Request(factory.get('/', {'start_date': '2023-01-01', 'end_date': '2023-12-31'}))
+        self.assertEqual(cost(request), 4)
+        request = Request(factory.get('/', {'start_date': '2023-06-01', 'end_date': '2023-06-02'}))
+        self.assertEqual(cost(request), 1)
+
+    @override_settings(THROTTLE_SYNC_SECONDS=1)
+    def test_processes_share_spending_through_cache(self):
+        first, second = BucketRegistry(), BucketRegistry()
+        self.assertEqual(first.spend('user', 30, now=0), 0)
+        self.assertEqual(second.spend('user', 30, now=0), 0)
+        # After syncing, each process has learned what the other one spent
+        self.assertEqual(first.spend('user', 1, now=1), 0)
+        self.assertGreater(second.spend('user', 1, now=1), 0)
+
+    def test_idle_buckets_are_dropped(self):
+        registry = BucketRegistry()
+        registry.spend('anon:10.0.0.1', 1, now=0)
+        registry.spend('anon:10.0.0.2', 39, now=0)
+        # After a sweep interval the first client has refilled; the second is still paying off
+        registry.spend('user', 1, now=100)
+        self.assertEqual(len(registry), 2)
+        self.assertGreater(registry.spend('anon:10.0.0.2', 39, now=100), 0)
+
+    @override_settings(THROTTLE_MAX_BUCKETS=2)
+    def test_bucket_count_is_bounded(self):
+        registry = BucketRegistry()
+        for address in range(5):
+            registry.spend(f'anon:10.0.0.{address}', 40, now=0)
+        self.assertEqual(len(registry), 2)
+
+    @override_settings(THROTTLE_SYNC_SECONDS=1)
+    def test_recreated_bucket_ignores_earlier_spending(self):
+        registry = BucketRegistry()
+        registry.spend('user', 30, now=0)
+        registry.spend('user', 1, now=1)
+        registry.clear()
+        # Spending synced before the bucket was dropped is not charged again
+        self.assertEqual(registry.spend('user', 30, now=2), 0)
+        self.assertEqual(registry.spend('user', 1, now=3), 0)
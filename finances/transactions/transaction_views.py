@@ -2,19 +2,60 @@ from rest_framework import viewsets, filters, mixins
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django_filters.rest_framework import DjangoFilterBackend
+from finances.transactions.transaction_filters import TransactionFilterBackend, date_bounds
 from finances.transactions.transaction_serializers import TransactionSerializer
-from finances.models import Transaction
+from finances.transactions.transaction_ingest import StatementError, ingest_transactions, read_statement
+from finances.categories.category_tree import category_totals
+from finances.currencies.currency_rates import MixedCurrencies, RateNotFound, convert_grouped, single_currency
+from finances.archive.archive_queries import ArchiveUnion, archived_totals, merge_totals, needs_archive
+from finances.exports.columnar_export import FORMATS, export_querysets, record_batches, stream_export
+from finances.reports.pivot_report import PERIODS, pivot_report
+from finances.tags.tag_filters import TagFilterBackend
+from finances.tags.tag_serializers import TransactionTagsSerializer
+from finances.tags.tag_store import attach_tag_names, set_tags, tag_totals
+from finances.receipts.receipt_processing import store_receipt
+from finances.receipts.receipt_serializers import ReceiptSerializer, ReceiptUploadSerializer
+from finances.models import Account, ArchivedTransaction, Category, Receipt, Transaction
+from finances.tasks import process_receipt
+from django.db import router, transaction as db_transaction
 from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from rest_framework import status
+from core.db_routers import ReadReplicaMixin
+from finances.sharding.owner_shards import OwnerShardMixin
+from core.throttles import full_history_cost, report_cost
+from core.idempotency import IdempotencyMixin
 
-class TransactionViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin):
+
+def ingest_cost(request):
+    # A list of transactions is a bulk import
+    return 100 if isinstance(request.data, list) else 1
+
+
+def receipt_cost(request):
+    # Polling the status is cheap; an upload is stored and queued for processing
+    return 1 if request.method == 'GET' else 5
+
+
+class TransactionViewSet(IdempotencyMixin, OwnerShardMixin, ReadReplicaMixin, viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
-    filterset_fields = ['kind_of_transaction', 'category', 'account', 'date']
+    throttle_costs = {
+        'create': ingest_cost,
+        'import_transactions': 100,
+        'export': 50,
+        'summary': report_cost(),
+        # These always total the whole hot history and archive, whatever the range
+        'by_category': full_history_cost(),
+        'by_account': full_history_cost(),
+        'pivot': report_cost(),
+        'by_tag': report_cost(),
+        'receipt': receipt_cost,
+    }
+    filter_backends = [TransactionFilterBackend, TagFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     ordering_fields = ['date', 'amount', 'created_at']
     ordering = ['-date']  # Default ordering
     search_fields = ['description']
@@ -23,6 +64,136 @@ class TransactionViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.
     def get_queryset(self):
         return Transaction.objects.filter(owner=self.request.user)
 
+    def get_archive_queryset(self):
+        return ArchivedTransaction.objects.filter(owner=self.request.user)
+
+    def ingest(self, data, many):
+        """Validate and store transactions; return their serialized rows and how many were new."""
+        serializer = self.get_serializer(data=data, many=many)
+        serializer.is_valid(raise_exception=True)
+        rows = serializer.validated_data if many else [serializer.validated_data]
+        results = ingest_transactions(self.request.user, rows)
+        transactions = [transaction for transaction, _ in results]
+        attach_tag_names(transactions)
+        data = self.get_serializer(transactions, many=True).data
+        return data, sum(created for _, created in results)
+
+    def create(self, request, *args, **kwargs):
+        # A JSON list is a bulk create; duplicates are answered with the stored rows
+        many = isinstance(request.data, list)
+        data, created = self.ingest(request.data, many)
+        return Response(
+            data if many else data[0],
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_transactions(self, request):
+        statement = request.FILES.get('file')
+        if statement is None:
+            return Response({"error": "Upload a CSV statement as 'file'"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rows = read_statement(request.user, statement)
+        except (StatementError, UnicodeDecodeError) as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        data, created = self.ingest(rows, many=True)
+        return Response(
+            {'created': created, 'duplicates': len(data) - created, 'transactions': data},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """All hot and archived transactions as an Arrow IPC stream or Parquet file, for pandas or DuckDB."""
+        export_format = request.query_params.get('export_format', 'parquet')
+        if export_format not in FORMATS:
+            return Response(
+                {"error": f"Invalid export_format. Use one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # The body streams after dispatch has reset the request's shard and replica routing
+        using = router.db_for_read(Transaction)
+        batches = record_batches(export_querysets(request.user, using))
+        response = StreamingHttpResponse(stream_export(batches, export_format), content_type=FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="transactions.{export_format}"'
+        return response
+
+    def get_date_param(self, request, name):
+        """Return the ``name`` query parameter as a date, or an error response if it is malformed."""
+        value = request.query_params.get(name)
+        if not value:
+            return None, None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date(), None
+        except ValueError:
+            return None, Response(
+                {"error": f"Invalid {name} format. Use YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # Unbounded listings show recent activity; a date range reaching past the archive
+        # horizon (an upper bound alone starts at the beginning of time) reads the archive too
+        first_day, last_day = date_bounds(request.query_params)
+        if (first_day or last_day) and needs_archive(first_day):
+            archived = self.filter_queryset(self.get_archive_queryset())
+            queryset = ArchiveUnion(queryset, archived, queryset.query.order_by or Transaction._meta.ordering)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            attach_tag_names(page)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        queryset = list(queryset)
+        attach_tag_names(queryset)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def mixed_currency_error(self, request):
+        """An error response when the user's accounts use several currencies, ``None`` otherwise."""
+        try:
+            single_currency(Account.objects.filter(owner=request.user))
+        except MixedCurrencies as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return None
+
+    def get_report_currency(self, request, check_accounts=True):
+        """Return the ``currency`` query parameter, or an error response if it is malformed.
+
+        Without one, totals cannot be converted, so accounts in several
+        currencies are an error too unless ``check_accounts`` is off.
+        """
+        currency = request.query_params.get('currency')
+        if currency is None:
+            return None, self.mixed_currency_error(request) if check_accounts else None
+        currency = currency.upper()
+        if len(currency) != 3 or not currency.isalpha():
+            return None, Response(
+                {"error": "Invalid currency. Use a 3-letter ISO 4217 code"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return currency, None
+
+    def grouped_report(self, request, queryset, fields):
+        currency, error = self.get_report_currency(request)
+        if error:
+            return error
+        if currency:
+            try:
+                return Response(merge_totals(
+                    fields,
+                    convert_grouped(queryset, fields, currency),
+                    convert_grouped(self.get_archive_queryset(), fields, currency)
+                ))
+            except RateNotFound as error:
+                return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        summary = queryset.values(*fields)\
+            .annotate(total=Sum('amount'))\
+            .order_by(*fields)
+        return Response(merge_totals(fields, summary, archived_totals(request.user, fields)))
+
     @action(detail=False, methods=['get'])
     def summary(self, request):
         # Get query parameters for date filtering
@@ -31,6 +202,10 @@ class TransactionViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.
         
         # Base queryset
         queryset = self.get_queryset()
+
+        currency, error = self.get_report_currency(request)
+        if error:
+            return error
         
         # Apply date filtering if provided
         if start_date:
@@ -52,38 +227,157 @@ class TransactionViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Archived rows only matter when the range starts before the archive horizon
+        archived = []
+        transaction_count = queryset.count()
+        if needs_archive(start_date):
+            archived = list(archived_totals(request.user, ['kind_of_transaction'], start_date, end_date))
+            transaction_count += sum(row['count'] for row in archived)
+
         # Calculate summary
-        income = queryset.filter(kind_of_transaction='INCOME').aggregate(
-            total=Sum('amount'))['total'] or 0
-        expenses = queryset.filter(kind_of_transaction='EXPENSE').aggregate(
-            total=Sum('amount'))['total'] or 0
+        if currency:
+            try:
+                rows = [convert_grouped(queryset, ['kind_of_transaction'], currency)]
+                if archived:
+                    archive = self.get_archive_queryset()
+                    if start_date:
+                        archive = archive.filter(date__gte=start_date)
+                    rows.append(convert_grouped(archive.filter(date__lte=end_date), ['kind_of_transaction'], currency))
+            except RateNotFound as error:
+                return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            rows = [
+                queryset.values('kind_of_transaction').annotate(total=Sum('amount')).order_by(),
+                archived
+            ]
+        totals = {row['kind_of_transaction']: row['total'] for row in merge_totals(['kind_of_transaction'], *rows)}
+        income = totals.get('INCOME', 0)
+        expenses = totals.get('EXPENSE', 0)
         
         return Response({
             'period': {
                 'start_date': start_date.isoformat() if start_date else None,
                 'end_date': end_date.isoformat(),
             },
+            'currency': currency,
             'total_income': income,
             'total_expenses': expenses,
             'balance': income - expenses,
-            'transaction_count': queryset.count()
+            'transaction_count': transaction_count
         })
 
     @action(detail=False, methods=['get'])
     def by_category(self, request):
+        if request.query_params.get('rollup') in ('1', 'true', 'True'):
+            if 'currency' in request.query_params:
+                return Response(
+                    {"error": "Currency conversion is not available for rolled-up totals"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            error = self.mixed_currency_error(request)
+            if error:
+                return error
+            # Totals of each category include all of its subcategories
+            rows = category_totals(Category.objects.filter(owner=request.user))
+            summary = [
+                {
+                    'category__id': row['id'],
+                    'category__name': row['name'],
+                    'category__path': row['path'],
+                    'kind_of_transaction': kind,
+                    'total': row[total],
+                }
+                for row in rows
+                for kind, total in (('EXPENSE', 'total_expenses'), ('INCOME', 'total_income'))
+                if row[total]
+            ]
+            return Response(summary)
+
         queryset = self.get_queryset()
-        summary = queryset.values('category__name', 'kind_of_transaction')\
-            .annotate(total=Sum('amount'))\
-            .order_by('category__name', 'kind_of_transaction')
-        
-        return Response(summary)
+        return self.grouped_report(request, queryset, ['category__name', 'kind_of_transaction'])
 
     @action(detail=False, methods=['get'])
     def by_account(self, request):
         queryset = self.get_queryset()
-        summary = queryset.values('account__name', 'kind_of_transaction')\
-            .annotate(total=Sum('amount'))\
-            .order_by('account__name', 'kind_of_transaction')
-        
-        return Response(summary) 
+        return self.grouped_report(request, queryset, ['account__name', 'kind_of_transaction'])
+
+    @action(detail=True, methods=['put'])
+    def tags(self, request, pk=None):
+        transaction = self.get_object()
+        serializer = TransactionTagsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        set_tags(transaction, serializer.validated_data['tags'])
+        return Response(self.get_serializer(transaction).data)
+
+    @action(detail=True, methods=['get', 'post'])
+    def receipt(self, request, pk=None):
+        transaction = self.get_object()
+        if request.method == 'GET':
+            receipt = get_object_or_404(Receipt, transaction_id=transaction.pk)
+            return Response(ReceiptSerializer(receipt, context=self.get_serializer_context()).data)
+        serializer = ReceiptUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        receipt = store_receipt(transaction, serializer.validated_data['file'])
+        # Thumbnails and text extraction run on the receipts queue, never in the web worker
+        db_transaction.on_commit(
+            lambda: process_receipt.delay(transaction.pk, transaction.owner_id), using=receipt._state.db
+        )
+        return Response(
+            ReceiptSerializer(receipt, context=self.get_serializer_context()).data, status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=False, methods=['get'])
+    def by_tag(self, request):
+        if 'currency' in request.query_params:
+            return Response(
+                {"error": "Currency conversion is not available for tag totals"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        error = self.mixed_currency_error(request)
+        if error:
+            return error
+        start_date, error = self.get_date_param(request, 'start_date')
+        if error:
+            return error
+        end_date, error = self.get_date_param(request, 'end_date')
+        if error:
+            return error
+        return Response(tag_totals(
+            request.user,
+            start=start_date and timezone.make_aware(datetime.combine(start_date, time.min)),
+            end=end_date and timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min)),
+            archived=needs_archive(start_date),
+        ))
+
+    @action(detail=False, methods=['get'])
+    def pivot(self, request):
+        rows = request.query_params.get('rows', 'category')
+        if rows not in ('category', 'account', 'supplier'):
+            return Response(
+                {"error": "Invalid rows. Use category, account or supplier"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        period = request.query_params.get('period', 'month')
+        if period not in PERIODS:
+            return Response(
+                {"error": f"Invalid period. Use one of: {', '.join(PERIODS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start_date, error = self.get_date_param(request, 'start_date')
+        if error:
+            return error
+        end_date, error = self.get_date_param(request, 'end_date')
+        if error:
+            return error
+
+        # pivot_report refuses mixed currencies among the rows it actually totals
+        currency, error = self.get_report_currency(request, check_accounts=False)
+        if error:
+            return error
+
+        archived = self.get_archive_queryset() if needs_archive(start_date) else None
+        try:
+            return Response(pivot_report(self.get_queryset(), archived, rows, period, start_date, end_date, currency))
+        except (MixedCurrencies, RateNotFound) as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
 
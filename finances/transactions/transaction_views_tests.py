@@ -1,11 +1,14 @@
 from django.test import TestCase
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
-from finances.models import Transaction, Category, Account
+from finances.models import Transaction, Category, Account, ExchangeRate
+from finances.currencies.currency_rates import RateCache, rate_cache
+from finances.live.live_events import ledger_snapshot
 from django.urls import reverse
 from rest_framework import status
 from decimal import Decimal
 from django.utils import timezone
+from datetime import timedelta
 
 class TransactionViewSetTest(TestCase):
     def tearDown(self):
@@ -120,4 +123,95 @@ class TransactionViewSetTest(TestCase):
         }
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('category', response.data) 
\ No newline at end of file
+        self.assertIn('category', response.data) 
+
+class TransactionCurrencyReportTest(TestCase):
+    def setUp(self):
+        rate_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        self.category = Category.objects.create(name='Travel', slug='travel', owner=self.user)
+        self.usd = Account.objects.create(name='Checking', slug='checking', currency='USD', owner=self.user)
+        self.eur = Account.objects.create(name='Euro', slug='euro', currency='EUR', owner=self.user)
+        self.day = timezone.now() - timedelta(days=1)
+        ExchangeRate.objects.create(currency='EUR', date=self.day.date() - timedelta(days=1), rate=Decimal('1.10'))
+        ExchangeRate.objects.create(currency='BRL', date=self.day.date(), rate=Decimal('0.20'))
+
+        for account, amount in ((self.usd, '110.00'), (self.eur, '100.00')):
+            Transaction.objects.create(
+                kind_of_transaction='EXPENSE',
+                amount=Decimal(amount),
+                date=self.day,
+                description='Hotel',
+                category=self.category,
+                account=account,
+                owner=self.user
+            )
+
+    def test_summary_in_base_currency(self):
+        response = self.client.get(reverse('transaction-summary'), {'currency': 'usd'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['currency'], 'USD')
+        self.assertEqual(response.data['total_expenses'], Decimal('220.00'))
+
+    def test_by_account_in_cross_currency(self):
+        response = self.client.get(reverse('transaction-by-account'), {'currency': 'BRL'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        totals = {row['account__name']: row['total'] for row in response.data}
+        self.assertEqual(totals, {'Checking': Decimal('550.00'), 'Euro': Decimal('550.00')})
+
+    def test_by_category_uses_cached_rates(self):
+        self.client.get(reverse('transaction-by-category'), {'currency': 'EUR'})
+        # One grouped query for the hot table and one for the archive; rates come from the cache
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('transaction-by-category'), {'currency': 'EUR'})
+        self.assertEqual(response.data[0]['total'], Decimal('200.00'))
+
+    def test_missing_rate(self):
+        response = self.client.get(reverse('transaction-by-category'), {'currency': 'JPY'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('JPY', response.data['error'])
+
+    def test_mixed_currencies_are_not_added_up(self):
+        for name in ('transaction-summary', 'transaction-by-account', 'transaction-by-category', 'transaction-by-tag'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, name)
+            self.assertIn('EUR, USD', response.data['error'])
+        response = self.client.get(reverse('transaction-by-category'), {'rollup': '1'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ledger_snapshot_totals_each_currency(self):
+        totals = ledger_snapshot(self.user.pk)['totals']
+        self.assertEqual(totals['EUR']['total_expenses'], Decimal('100.00'))
+        self.assertEqual(totals['USD']['total_expenses'], Decimal('110.00'))
+
+    def test_same_currency_needs_no_rate(self):
+        # No BRL-to-JPY path is needed for amounts already in JPY
+        account = Account.objects.create(name='Yen', slug='yen', currency='JPY', owner=self.user)
+        Transaction.objects.filter(account=self.usd).update(account=account)
+        Transaction.objects.filter(account=self.eur).delete()
+        response = self.client.get(reverse('transaction-by-account'), {'currency': 'JPY'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data[0]['total'], Decimal('110.00'))
+
+    def test_borrowed_rates_expire(self):
+        url = reverse('transaction-by-account')
+        with self.settings(FX_FALLBACK_RATE_SECONDS=0):
+            self.client.get(url, {'currency': 'USD'})
+            # Published by another process, so this one's cache is not cleared
+            ExchangeRate.objects.bulk_create([ExchangeRate(currency='EUR', date=self.day.date(), rate=Decimal('1.20'))])
+            response = self.client.get(url, {'currency': 'USD'})
+        totals = {row['account__name']: row['total'] for row in response.data}
+        self.assertEqual(totals['Euro'], Decimal('120.00'))
+
+    def test_rate_cache_is_bounded(self):
+        cache = RateCache(maxsize=2)
+        cache.set(('EUR', 1), Decimal('1'))
+        cache.set(('EUR', 2), Decimal('2'))
+        cache.get(('EUR', 1))
+        cache.set(('EUR', 3), Decimal('3'))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(('EUR', 2)))
+        self.assertEqual(cache.get(('EUR', 1)), Decimal('1'))
@@ -4,12 +4,26 @@ from rest_framework import routers
 from finances.categories.category_views import CategoryViewSet
 from finances.accounts.account_views import AccountViewSet
 from finances.transactions.transaction_views import TransactionViewSet
+from finances.budgets.budget_views import BudgetViewSet
+from finances.recurring.recurring_views import RecurringTransactionViewSet
+from finances.reconciliation.reconciliation_views import AccountReconciliationViewSet
+from finances.reports.report_views import ReportJobViewSet
+from finances.sync.sync_views import SyncViewSet
+from finances.anomalies.anomaly_views import SpendingAnomalyViewSet
+from finances.live.live_views import live_events
 
 router = routers.DefaultRouter()
 router.register(r'categories', CategoryViewSet)
 router.register(r'accounts', AccountViewSet)
 router.register(r'transactions', TransactionViewSet)
+router.register(r'budgets', BudgetViewSet)
+router.register(r'recurring-transactions', RecurringTransactionViewSet)
+router.register(r'reconciliations', AccountReconciliationViewSet)
+router.register(r'reports', ReportJobViewSet)
+router.register(r'sync', SyncViewSet, basename='sync')
+router.register(r'anomalies', SpendingAnomalyViewSet)
 
 urlpatterns = [
+    path('live/', live_events, name='live-events'),
     path('', include(router.urls)),
 ]
\ No newline at end of file